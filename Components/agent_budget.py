@@ -0,0 +1,146 @@
+import math
+import os
+import time
+from functools import lru_cache
+
+from Components.metrics import token_usage
+
+# Per-run budgets for the ReAct agents: tool steps, wall-clock seconds and
+# LLM tokens. Steps and the deadline are enforced by AgentExecutor
+# (max_iterations / max_execution_time, stopping with "force"). Tokens are
+# counted by BudgetTracker, which stops the run before the next tool step once
+# the budget is spent. The tracker also records per-step timing and the
+# observations gathered so far, so a stopped run can still be turned into a
+# best-effort answer.
+AGENT_MAX_STEPS = int(os.environ.get("STARTUP_MATE_AGENT_MAX_STEPS", "8"))
+AGENT_DEADLINE_SECONDS = float(os.environ.get("STARTUP_MATE_AGENT_DEADLINE", "90"))
+AGENT_MAX_TOKENS = int(os.environ.get("STARTUP_MATE_AGENT_MAX_TOKENS", "30000"))
+
+# Output AgentExecutor returns when it stops on max_iterations or max_execution_time
+FORCED_STOP_PREFIX = "Agent stopped due to"
+
+
+class BudgetExceeded(Exception):
+    """The agent's token budget ran out."""
+
+
+class AgentBudget:
+    def __init__(self, max_steps: int = AGENT_MAX_STEPS, deadline_seconds: float = AGENT_DEADLINE_SECONDS,
+                 max_tokens: int = AGENT_MAX_TOKENS):
+        self.max_steps = max_steps
+        self.deadline_seconds = deadline_seconds
+        self.max_tokens = max_tokens
+
+    @classmethod
+    def from_request(cls, data) -> "AgentBudget":
+        """Budget from a request's `budget` object; missing fields keep the defaults. Raises ValueError.
+
+        A request may lower the configured limits, never raise them.
+        """
+        data = data or {}
+        if not isinstance(data, dict):
+            raise ValueError("budget must be an object")
+        budget = cls(
+            max_steps=int(data.get("max_steps", AGENT_MAX_STEPS)),
+            deadline_seconds=float(data.get("deadline_seconds", AGENT_DEADLINE_SECONDS)),
+            max_tokens=int(data.get("max_tokens", AGENT_MAX_TOKENS)),
+        )
+        if not math.isfinite(budget.deadline_seconds):
+            raise ValueError("deadline_seconds must be a finite number")
+        if budget.max_steps < 1 or budget.deadline_seconds <= 0 or budget.max_tokens < 1:
+            raise ValueError("budget values must be positive")
+        if (budget.max_steps > AGENT_MAX_STEPS or budget.deadline_seconds > AGENT_DEADLINE_SECONDS
+                or budget.max_tokens > AGENT_MAX_TOKENS):
+            raise ValueError(f"budget values must not exceed {cls().as_dict()}")
+        return budget
+
+    def executor_kwargs(self) -> dict:
+        return {
+            "max_iterations": self.max_steps,
+            "max_execution_time": self.deadline_seconds,
+            "early_stopping_method": "force",
+        }
+
+    def as_dict(self) -> dict:
+        return {"max_steps": self.max_steps, "deadline_seconds": self.deadline_seconds, "max_tokens": self.max_tokens}
+
+
+@lru_cache(maxsize=None)
+def _tracker_class():
+    """Built lazily so langchain is not imported early."""
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class BudgetTracker(BaseCallbackHandler):
+        # Raise BudgetExceeded into the agent run, in order with the agent's own steps
+        raise_error = True
+        run_inline = True
+
+        def __init__(self, budget: AgentBudget):
+            self.budget = budget
+            self.started = self._last = time.perf_counter()
+            self.tokens = 0
+            self.steps = []
+            self.observations = []
+            self.stopped = None
+            self._pending = None
+
+        def on_llm_end(self, response, **kwargs):
+            prompt_tokens, completion_tokens, _ = token_usage(response)
+            self.tokens += prompt_tokens + completion_tokens
+
+        def on_agent_action(self, action, **kwargs):
+            if self.tokens >= self.budget.max_tokens:
+                self.stopped = "max_tokens"
+                raise BudgetExceeded(f"Agent used {self.tokens} of {self.budget.max_tokens} tokens")
+            now = time.perf_counter()
+            self._pending = {
+                "step": len(self.steps) + 1,
+                "tool": action.tool,
+                "input": str(action.tool_input)[:200],
+                "llm_seconds": round(now - self._last, 3),
+            }
+            self._last = now
+
+        def _end_step(self, output: str, error: bool):
+            if self._pending is None:
+                return
+            now = time.perf_counter()
+            step, self._pending = self._pending, None
+            step["tool_seconds"] = round(now - self._last, 3)
+            if error:
+                step["error"] = True
+            self.steps.append(step)
+            # "_Exception" steps are the agent's own parse errors, not findings
+            if not error and not step["tool"].startswith("_"):
+                self.observations.append((step["tool"], step["input"], output))
+            self._last = now
+
+        def on_tool_end(self, output, **kwargs):
+            self._end_step(str(output), error=False)
+
+        def on_tool_error(self, error, **kwargs):
+            self._end_step(str(error), error=True)
+
+        def stop_reason(self, output) -> str:
+            """Returns "completed", or the budget that stopped the run."""
+            if self.stopped:
+                return self.stopped
+            if str(output).startswith(FORCED_STOP_PREFIX):
+                return "max_steps" if len(self.steps) >= self.budget.max_steps else "deadline"
+            return "completed"
+
+        def trace(self, output) -> dict:
+            return {
+                "stopped": self.stop_reason(output),
+                "steps": self.steps,
+                "tokens": self.tokens,
+                "seconds": round(time.perf_counter() - self.started, 3),
+                "budget": self.budget.as_dict(),
+            }
+
+    return BudgetTracker
+
+
+def budget_tracker(budget: AgentBudget):
+    """A fresh BudgetTracker callback handler for one agent run."""
+    return _tracker_class()(budget)
@@ -0,0 +1,228 @@
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from Components.pipeline import run_pipeline
+
+# Bulk runs of the full pipeline over a CSV or JSONL file of ideas (see
+# batch.py). Records are read lazily and run on a bounded worker pool. Every
+# stage result is checkpointed in SQLite as soon as it finishes, so a run that
+# crashed or was interrupted resumes at the first unfinished stage of each
+# record. Finished records are appended to the output JSONL one by one.
+BATCH_WORKERS = int(os.environ.get("STARTUP_MATE_BATCH_WORKERS", "4"))
+PROGRESS_SECONDS = 5.0
+
+
+def record_id(record: dict, idea: str) -> str:
+    """The record's own `id`, else a hash of the idea, so reordered or extended input files resume cleanly."""
+    if record.get("id") not in (None, ""):
+        return str(record["id"])
+    return hashlib.sha256(idea.strip().lower().encode("utf-8")).hexdigest()[:16]
+
+
+def read_records(path: str, idea_field: str = "idea"):
+    """Yields (record_id, record) from a .csv (header row) or .jsonl file without loading it whole.
+
+    JSONL lines may be objects or plain strings. Rows without an idea are skipped.
+    A line that is not valid JSON yields (`line-<number>`, the ValueError), so
+    the run records it as a failed item and carries on.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = csv.DictReader(f) if path.lower().endswith(".csv") else _jsonl_rows(f)
+        for row in rows:
+            if isinstance(row, tuple):
+                yield row
+                continue
+            record = row if isinstance(row, dict) else {idea_field: row}
+            idea = str(record.get(idea_field) or "").strip()
+            if idea:
+                yield record_id(record, idea), dict(record, **{idea_field: idea})
+
+
+def _jsonl_rows(lines):
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield f"line-{number}", ValueError(f"Invalid JSON on line {number}: {e}")
+
+
+def count_records(path: str, idea_field: str = "idea") -> int:
+    return sum(1 for _ in read_records(path, idea_field))
+
+
+class CheckpointStore:
+    """Per-record, per-stage results of a batch run, and which records were written out."""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS stages (
+                    record_id TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    finished_at REAL NOT NULL,
+                    PRIMARY KEY (record_id, stage)
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS records (
+                    record_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    written_at REAL NOT NULL
+                )
+            """)
+
+    def stages(self, record_id: str) -> dict:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT stage, result FROM stages WHERE record_id = ?", (record_id,)
+            ).fetchall()
+        return {stage: json.loads(result) for stage, result in rows}
+
+    def save_stage(self, record_id: str, stage: str, result):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO stages (record_id, stage, result, finished_at) VALUES (?, ?, ?, ?)",
+                (record_id, stage, json.dumps(result), time.time()),
+            )
+
+    def status(self, record_id: str):
+        with self._lock:
+            row = self._conn.execute("SELECT status FROM records WHERE record_id = ?", (record_id,)).fetchone()
+        return row[0] if row else None
+
+    def mark_written(self, record_id: str, status: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO records (record_id, status, written_at) VALUES (?, ?, ?)",
+                (record_id, status, time.time()),
+            )
+
+
+def _duration(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    return f"{seconds // 60}m{seconds % 60:02d}s"
+
+
+class Progress:
+    """Throughput and ETA lines on stderr, at most every PROGRESS_SECONDS."""
+
+    def __init__(self, total: int, stream=sys.stderr):
+        self.total = total
+        self.stream = stream
+        self.started = time.perf_counter()
+        self.counts = {"done": 0, "failed": 0, "skipped": 0}
+        self._last = 0.0
+
+    def update(self, result: str):
+        self.counts[result] += 1
+        if time.perf_counter() - self._last >= PROGRESS_SECONDS:
+            self.report()
+
+    def report(self):
+        now = self._last = time.perf_counter()
+        processed = self.counts["done"] + self.counts["failed"]
+        elapsed = now - self.started
+        rate = processed / elapsed if elapsed else 0.0
+        finished = processed + self.counts["skipped"]
+        line = f"[{finished}/{self.total or '?'}] {rate * 60:.1f} records/min"
+        if rate and self.total:
+            line += f", ETA {_duration(max(self.total - finished, 0) / rate)}"
+        line += f" (done {self.counts['done']}, failed {self.counts['failed']}, already written {self.counts['skipped']})"
+        print(line, file=self.stream, flush=True)
+
+
+def _process(record_id: str, record: dict, checkpoints: CheckpointStore, options: dict) -> dict:
+    if isinstance(record, Exception):
+        raise record
+    completed = checkpoints.stages(record_id)
+    if completed.get("pitch_deck") and not os.path.exists(completed["pitch_deck"]):
+        # The deck file was deleted or the run moved: build it again
+        del completed["pitch_deck"]
+    deck_path = os.path.join(options["decks_dir"], f"{record_id}.pptx") if options["decks_dir"] else None
+    result = run_pipeline(
+        record[options["idea_field"]],
+        startup_name=record.get("name") or None,
+        research_mode=options["research_mode"],
+        refine_idea=options["refine_idea"],
+        bypass_cache=options["bypass_cache"],
+        allow_similar=options["allow_similar"],
+        max_workers=options["stage_workers"],
+        deck_path=deck_path,
+        render_deck=False,
+        completed=completed,
+        on_stage=lambda stage, value: checkpoints.save_stage(record_id, stage, value),
+    )
+    result["resumed_stages"] = sorted(completed)
+    return {"id": record_id, "input": record, **result}
+
+
+def run_batch(input_path: str, output_path: str, checkpoint_path: str = None, decks_dir: str = None,
+              workers: int = BATCH_WORKERS, stage_workers: int = 4, research_mode: str = "agent",
+              idea_field: str = "idea", refine_idea: bool = True, bypass_cache: bool = False,
+              allow_similar: bool = True, retry_failed: bool = False, limit: int = None) -> dict:
+    """Runs every input record through the pipeline and appends one JSON line per record to `output_path`.
+
+    Records already written by an earlier run are skipped. With `retry_failed`,
+    records that had stage errors run again, reusing their successful stages.
+    """
+    checkpoints = CheckpointStore(checkpoint_path or output_path + ".checkpoint.sqlite3")
+    options = {
+        "decks_dir": decks_dir, "research_mode": research_mode, "idea_field": idea_field,
+        "refine_idea": refine_idea, "bypass_cache": bypass_cache, "allow_similar": allow_similar,
+        "stage_workers": stage_workers,
+    }
+    total = count_records(input_path, idea_field)
+    if limit is not None:
+        total = min(total, limit)
+    progress = Progress(total)
+    records = read_records(input_path, idea_field)
+    if limit is not None:
+        records = (record for _, record in zip(range(limit), records))
+    running, seen = {}, set()
+
+    with open(output_path, "a", encoding="utf-8") as output, ThreadPoolExecutor(max_workers=workers) as pool:
+        def finish(done):
+            for future in done:
+                record_id = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"id": record_id, "errors": {"record": str(e)}}
+                status = "failed" if result.get("errors") else "done"
+                output.write(json.dumps(result) + "\n")
+                output.flush()
+                checkpoints.mark_written(record_id, status)
+                progress.update(status)
+
+        for record_id, record in records:
+            status = checkpoints.status(record_id)
+            if record_id in seen or status == "done" or (status == "failed" and not retry_failed):
+                progress.update("skipped")
+                continue
+            seen.add(record_id)
+            # Keep at most two records per worker in flight, so the input streams
+            while len(running) >= workers * 2:
+                finish(wait(running, return_when=FIRST_COMPLETED)[0])
+            running[pool.submit(_process, record_id, record, checkpoints, options)] = record_id
+        while running:
+            finish(wait(running, return_when=FIRST_COMPLETED)[0])
+    progress.report()
+    return dict(progress.counts, seconds=round(time.perf_counter() - progress.started, 3))
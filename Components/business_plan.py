@@ -1,32 +1,20 @@
-from langchain_core.prompts import PromptTemplate
-from langchain_groq import ChatGroq
 import os
-from pptx import Presentation
-from pptx.util import Inches
-from openai import OpenAI
-from langchain.chat_models import ChatOpenAI
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+from Components.llm import make_chain
+from Components.cache import acached_invoke, cached_invoke, fused_item_key, response_cache
+from Components.json_stream import ObjectStreamParser
+from Components.report import parse_report, report_context
 
 # Initialize LLM
 # llm = ChatGroq(
 #     groq_api_key=os.environ["GROQ_API_KEY"],
 #     model_name="meta-llama/llama-4-scout-17b-16e-instruct"
 # )
-client = OpenAI(
-    base_url="https://api.novita.ai/v3/openai",
-    api_key=os.environ["NOVITA_API_KEY"],
-)
-
-# LangChain-compatible wrapper using Novita model
-llm = ChatOpenAI(
-    openai_api_base="https://api.novita.ai/v3/openai",
-    openai_api_key=os.environ["NOVITA_API_KEY"],
-    model="meta-llama/llama-4-maverick-17b-128e-instruct-fp8",
-    temperature=0.7
-)
-
-problem_prompt = PromptTemplate(
-    input_variables=["report"],
-    template="""
+# LangChain-compatible wrapper using Novita model (shared connection pool).
+# Chains are built on first use so importing this module stays cheap.
+PROBLEM_TEMPLATE = """
 You are a startup consultant. Based on the following market research report, generate 3 clear and concise problem statements that highlight real market pain points:
 
 Market Research Report:
@@ -43,19 +31,98 @@ Format:
 2. ...
 3. ...
 """
-)
 
-problem_chain = problem_prompt | llm
+@lru_cache(maxsize=None)
+def _problem_chain():
+    return make_chain(PROBLEM_TEMPLATE, temperature=0.7, name="problem_chain")
 
-def generate_problem_statements(report_text: str) -> list:
-    result = problem_chain.invoke({"report": report_text})
-    lines = result.content.strip().splitlines()
+def _parse_problem_statements(text: str) -> list:
+    lines = text.strip().splitlines()
     return [line.strip()[3:].strip() for line in lines if line.strip().startswith(("1.", "2.", "3."))]
 
+# Report sections the problem prompt needs; the rest of the report is not sent
+PROBLEM_REPORT_SECTIONS = ("market_need", "gaps", "competitors")
+
+# Fused generation: all problems with their solutions in one round trip.
+# Each solution is stored under its problem, so generate_solution() answers
+# a problem that came from here without another call (on every page and in
+# every process). STARTUP_MATE_FUSED_CHAINS=0 restores one call per stage.
+FUSED_CHAINS = os.environ.get("STARTUP_MATE_FUSED_CHAINS", "1") == "1"
+
+PROBLEM_SOLUTION_TEMPLATE = """
+You are a startup consultant. Based on the following market research report, generate 3 clear and concise problem statements that highlight real market pain points, and a clear and innovative solution for each.
+
+Market Research Report:
+-------------------------
+{report}
+
+Each problem should be:
+- One to two sentences max
+- Focused on gaps or challenges users face
+- Actionable and startup-worthy
+
+Each solution should be 3-4 lines of simple bullet points ("- ...").
+
+Respond with JSON only: an array of 3 objects with exactly these string fields, no comments or trailing text.
+[
+    {{"problem": "...", "solution": "- ...\\n- ..."}}
+]
+"""
+
+@lru_cache(maxsize=None)
+def _problem_solution_chain():
+    return make_chain(PROBLEM_SOLUTION_TEMPLATE, temperature=0.7, name="problem_solution_chain")
+
+def _solution_key(problem_statement: str) -> str:
+    return fused_item_key("solution", {"problem": problem_statement.strip()}, _problem_solution_chain(), _solution_chain())
+
+def _parse_problems_with_solutions(text: str) -> list:
+    """[{"problem", "solution"}, ...] from the fused response; stores each solution for generate_solution()."""
+    pairs = []
+    for record in ObjectStreamParser().feed(text):
+        problem = str(record.get("problem") or "").strip()
+        solution = record.get("solution") or ""
+        if isinstance(solution, list):
+            solution = "\n".join(f"- {line}" for line in solution)
+        solution = str(solution).strip()
+        if not problem:
+            continue
+        pairs.append({"problem": problem, "solution": solution})
+        if solution:
+            response_cache.set(_solution_key(problem), solution)
+    return pairs
+
+def generate_problems_with_solutions(report_text: str, bypass_cache: bool = False) -> list:
+    """Problem statements and a solution for each, from one LLM call."""
+    report = report_context(report_text, PROBLEM_REPORT_SECTIONS)
+    result = cached_invoke(_problem_solution_chain(), {"report": report}, bypass_cache=bypass_cache)
+    return _parse_problems_with_solutions(result)
+
+async def agenerate_problems_with_solutions(report_text: str, bypass_cache: bool = False) -> list:
+    report = report_context(report_text, PROBLEM_REPORT_SECTIONS)
+    result = await acached_invoke(_problem_solution_chain(), {"report": report}, bypass_cache=bypass_cache)
+    return _parse_problems_with_solutions(result)
+
+def generate_problem_statements(report_text: str, bypass_cache: bool = False) -> list:
+    if FUSED_CHAINS:
+        pairs = generate_problems_with_solutions(report_text, bypass_cache=bypass_cache)
+        if pairs:
+            return [pair["problem"] for pair in pairs]
+    report = report_context(report_text, PROBLEM_REPORT_SECTIONS)
+    result = cached_invoke(_problem_chain(), {"report": report}, bypass_cache=bypass_cache)
+    return _parse_problem_statements(result)
+
+async def agenerate_problem_statements(report_text: str, bypass_cache: bool = False) -> list:
+    if FUSED_CHAINS:
+        pairs = await agenerate_problems_with_solutions(report_text, bypass_cache=bypass_cache)
+        if pairs:
+            return [pair["problem"] for pair in pairs]
+    report = report_context(report_text, PROBLEM_REPORT_SECTIONS)
+    result = await acached_invoke(_problem_chain(), {"report": report}, bypass_cache=bypass_cache)
+    return _parse_problem_statements(result)
+
 # Solution generator
-solution_prompt = PromptTemplate(
-    input_variables=["problem"],
-    template="""
+SOLUTION_TEMPLATE = """
 You are a startup expert. Based on the following problem statement, suggest a clear and innovative solution in 3-4 lines.
 
 Problem:
@@ -65,17 +132,56 @@ Respond in simple bullet points like:
 - ...
 - ...
 """
-)
 
-solution_chain = solution_prompt | llm
+@lru_cache(maxsize=None)
+def _solution_chain():
+    return make_chain(SOLUTION_TEMPLATE, temperature=0.7, name="solution_chain")
 
-def generate_solution(problem_statement: str) -> str:
-    response = solution_chain.invoke({"problem": problem_statement})
-    return response.content.strip()
+# Chains stay reachable as module attributes, built on first access
+_LAZY_ATTRIBUTES = {
+    "problem_chain": _problem_chain,
+    "solution_chain": _solution_chain,
+    "problem_solution_chain": _problem_solution_chain,
+}
 
-# Generate pitch deck PPT
-def create_pitch_deck(startup_name: str, problem: str, solution: str, report: str):
-    prs = Presentation()
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def generate_solution(problem_statement: str, bypass_cache: bool = False) -> str:
+    """The solution stored by the fused problem call, else one solution call for this problem."""
+    stored = None if bypass_cache else response_cache.get(_solution_key(problem_statement))
+    if stored is not None:
+        return stored
+    response = cached_invoke(_solution_chain(), {"problem": problem_statement}, bypass_cache=bypass_cache)
+    return response.strip()
+
+async def agenerate_solution(problem_statement: str, bypass_cache: bool = False) -> str:
+    stored = None if bypass_cache else response_cache.get(_solution_key(problem_statement))
+    if stored is not None:
+        return stored
+    response = await acached_invoke(_solution_chain(), {"problem": problem_statement}, bypass_cache=bypass_cache)
+    return response.strip()
+
+# Pitch deck template, read once per process; every deck is opened from this in-memory copy.
+# Set STARTUP_MATE_DECK_TEMPLATE to a .pptx file to use a branded template.
+DECK_TEMPLATE_PATH = os.environ.get("STARTUP_MATE_DECK_TEMPLATE")
+
+@lru_cache(maxsize=1)
+def _template_bytes() -> bytes:
+    from pptx import Presentation
+    if DECK_TEMPLATE_PATH:
+        with open(DECK_TEMPLATE_PATH, "rb") as f:
+            return f.read()
+    buffer = BytesIO()
+    Presentation().save(buffer)
+    return buffer.getvalue()
+
+def _build_pitch_deck(startup_name: str, problem: str, solution: str, report: str):
+    from pptx import Presentation
+    prs = Presentation(BytesIO(_template_bytes()))
+    parsed = parse_report(report)
     
     # Slide 1 - Startup Name
     slide = prs.slides.add_slide(prs.slide_layouts[5])
@@ -94,31 +200,58 @@ def create_pitch_deck(startup_name: str, problem: str, solution: str, report: st
     # Slide 4 - Market Gap
     slide = prs.slides.add_slide(prs.slide_layouts[1])
     slide.shapes.title.text = "Market Gap"
-    slide.placeholders[1].text = "\n".join([
-        line.strip()
-        for line in report.splitlines()
-        if "market" in line.lower() or "gap" in line.lower() or "need" in line.lower()
-    ][:10])
+    market_gap = parsed.market_need + parsed.gaps
+    if not market_gap:
+        market_gap = [
+            line.strip()
+            for line in report.splitlines()
+            if "market" in line.lower() or "gap" in line.lower() or "need" in line.lower()
+        ]
+    slide.placeholders[1].text = "\n".join(market_gap[:10])
 
     # Slide 5 - Competitors
     slide = prs.slides.add_slide(prs.slide_layouts[1])
     slide.shapes.title.text = "Competitors"
-    slide.placeholders[1].text = "\n".join([
-        line.strip()
-        for line in report.splitlines()
-        if "|" in line and not line.startswith("|------")
-    ][:5])
+    competitors = parsed.competitor_lines()
+    if not competitors:
+        competitors = [
+            line.strip()
+            for line in report.splitlines()
+            if "|" in line and not line.startswith("|------")
+        ]
+    slide.placeholders[1].text = "\n".join(competitors[:5])
 
     # # Slide 6 - Unique Angle
     # slide = prs.slides.add_slide(prs.slide_layouts[1])
     # slide.shapes.title.text = "Unique Angle"
     # slide.placeholders[1].text = unique_angle
+    return prs
+
+def render_pitch_deck(startup_name: str, problem: str, solution: str, report: str) -> bytes:
+    """Renders the pitch deck in memory and returns the .pptx bytes."""
+    buffer = BytesIO()
+    _build_pitch_deck(startup_name, problem, solution, report).save(buffer)
+    return buffer.getvalue()
+
+def _render_pitch_deck_kwargs(deck: dict) -> bytes:
+    return render_pitch_deck(**deck)
+
+def render_pitch_decks(decks: list, max_workers: int = None) -> list:
+    """Renders many decks in parallel worker processes; `decks` holds render_pitch_deck kwargs."""
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_render_pitch_deck_kwargs, decks))
+
+# Generate pitch deck PPT
+def create_pitch_deck(startup_name: str, problem: str, solution: str, report: str, output_path: str = None):
+    data = render_pitch_deck(startup_name, problem, solution, report)
 
-        # ✅ Ensure folder exists
-    output_dir = "./presentations"
-    os.makedirs(output_dir, exist_ok=True)
+    # ✅ Ensure folder exists
+    output_path = output_path or os.path.join("./presentations", "pitch_deck.pptx")
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
 
     # ✅ Save presentation safely
-    output_path = os.path.join(output_dir, "pitch_deck.pptx")
-    prs.save(output_path)
-    return output_path
\ No newline at end of file
+    with open(output_path, "wb") as f:
+        f.write(data)
+    return output_path
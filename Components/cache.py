@@ -0,0 +1,218 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+
+from Components.llm import chain_model, route_chain
+from Components.metrics import registry, run_config
+from Components.settings import cache_path
+from Components.singleflight import single_flight
+from Components.store import SQLiteStore
+
+# Persistent response cache shared by every chain in Components/.
+# Entries are keyed by prompt template, inputs, model name and temperature,
+# so the Flask API and the Streamlit UI reuse each other's completions.
+# Concurrent misses for the same key are coalesced into one call
+# (Components/singleflight.py).
+CACHE_PATH = os.environ.get("STARTUP_MATE_CACHE_PATH") or cache_path("responses.sqlite3")
+CACHE_MAX_ENTRIES = int(os.environ.get("STARTUP_MATE_CACHE_MAX_ENTRIES", "5000"))
+CACHE_TTL_SECONDS = float(os.environ.get("STARTUP_MATE_CACHE_TTL", str(7 * 24 * 3600)))
+
+
+class ResponseCache(SQLiteStore):
+    """SQLite-backed key/value store with LRU eviction and a TTL."""
+
+    def __init__(self, path: str, max_entries: int, ttl_seconds: float):
+        super().__init__(path)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+    def _setup(self, conn):
+        with conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)"
+            )
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            return value
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            # Evict least recently used entries beyond the size bound
+            self._conn.execute("""
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+
+response_cache = ResponseCache(CACHE_PATH, CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS)
+
+
+def make_key(namespace: str, parts: dict) -> str:
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return namespace + ":" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _flight(key: str, bypass_cache: bool):
+    """(single-flight key, lookup) for a cache miss.
+
+    Fresh (bypass) generations only coalesce with each other, and never wait
+    on another process, whose stored result could be the stale entry.
+    """
+    if bypass_cache:
+        return key + ":fresh", None
+    return key, lambda: response_cache.get(key)
+
+
+def cached_call(namespace: str, parts: dict, compute, bypass_cache: bool = False) -> str:
+    """Returns the cached string for `parts`, calling `compute()` on a miss.
+
+    With `bypass_cache=True` the cache is not read, but the fresh result
+    still replaces the stored entry.
+    """
+    key = make_key(namespace, parts)
+    if not bypass_cache:
+        cached = response_cache.get(key)
+        if cached is not None:
+            registry.inc("startup_mate_cache_requests_total", {"result": "hit"})
+            return cached
+    registry.inc("startup_mate_cache_requests_total", {"result": "bypass" if bypass_cache else "miss"})
+
+    def compute_and_store():
+        value = compute()
+        response_cache.set(key, value)
+        return value
+
+    flight_key, lookup = _flight(key, bypass_cache)
+    return single_flight.do(flight_key, compute_and_store, lookup)
+
+
+async def acached_call(namespace: str, parts: dict, acompute, bypass_cache: bool = False) -> str:
+    """Async variant of `cached_call`; `acompute` is a coroutine function.
+
+    SQLite reads and writes run on a worker thread, off the event loop.
+    """
+    key = make_key(namespace, parts)
+    if not bypass_cache:
+        cached = await asyncio.to_thread(response_cache.get, key)
+        if cached is not None:
+            registry.inc("startup_mate_cache_requests_total", {"result": "hit"})
+            return cached
+    registry.inc("startup_mate_cache_requests_total", {"result": "bypass" if bypass_cache else "miss"})
+
+    async def acompute_and_store():
+        value = await acompute()
+        await asyncio.to_thread(response_cache.set, key, value)
+        return value
+
+    flight_key, lookup = _flight(key, bypass_cache)
+    return await single_flight.ado(flight_key, acompute_and_store, lookup)
+
+
+def chain_cache_parts(chain, inputs: dict) -> dict:
+    """Cache key parts for a `prompt | llm` chain; a fallback model's answer is stored under the primary model."""
+    prompt, llm = chain.first, chain_model(chain.last)
+    return {
+        "template": prompt.template,
+        "inputs": inputs,
+        "model": getattr(llm, "model_name", None) or getattr(llm, "model", None),
+        "temperature": getattr(llm, "temperature", None),
+    }
+
+
+def fused_item_key(namespace: str, item: dict, fused_chain, single_chain) -> str:
+    """Key for one item of a fused call's answer that is served in place of `single_chain`'s call.
+
+    Like a chain key, it covers the fused chain's template, model and
+    temperature, plus the model `single_chain` would run on, both under the
+    current request's routing. Another prompt, model or override misses.
+    """
+    fused = chain_cache_parts(route_chain(fused_chain), item)
+    single = chain_model(route_chain(single_chain).last)
+    return make_key(namespace, dict(fused, served_as=getattr(single, "model_name", None)))
+
+
+def cached_invoke(chain, inputs: dict, bypass_cache: bool = False) -> str:
+    """Invokes a `prompt | llm` chain through the response cache and returns the message content."""
+    chain = route_chain(chain)
+    return cached_call(
+        "chain",
+        chain_cache_parts(chain, inputs),
+        lambda: chain.invoke(inputs, config=run_config()).content,
+        bypass_cache=bypass_cache,
+    )
+
+
+async def acached_invoke(chain, inputs: dict, bypass_cache: bool = False) -> str:
+    """Async variant of `cached_invoke` built on `chain.ainvoke`."""
+    chain = route_chain(chain)
+
+    async def acompute():
+        return (await chain.ainvoke(inputs, config=run_config())).content
+
+    return await acached_call(
+        "chain", chain_cache_parts(chain, inputs), acompute, bypass_cache=bypass_cache
+    )
+
+
+def cached_stream(chain, inputs: dict, bypass_cache: bool = False):
+    """Streams a `prompt | llm` chain's content chunks; cache hits arrive as a single chunk.
+
+    The assembled text is stored only once the stream has completed.
+    """
+    chain = route_chain(chain)
+    key = make_key("chain", chain_cache_parts(chain, inputs))
+    if not bypass_cache:
+        cached = response_cache.get(key)
+        if cached is not None:
+            registry.inc("startup_mate_cache_requests_total", {"result": "hit"})
+            yield cached
+            return
+    registry.inc("startup_mate_cache_requests_total", {"result": "bypass" if bypass_cache else "miss"})
+
+    def iterate():
+        chunks = []
+        for chunk in chain.stream(inputs, config=run_config()):
+            if chunk.content:
+                chunks.append(chunk.content)
+                yield chunk.content
+        response_cache.set(key, "".join(chunks))
+
+    flight_key, lookup = _flight(key, bypass_cache)
+    yield from single_flight.stream(flight_key, iterate, lookup)
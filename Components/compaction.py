@@ -0,0 +1,156 @@
+import math
+import os
+import re
+from urllib.parse import urlparse
+
+# Compacts structured Serper results before they go into a prompt. Results are
+# flattened to (title, link, snippet) items from the answer box, knowledge
+# graph, organic hits and "people also ask". Then the compactor:
+#   - drops repeated URLs and near-duplicate snippets (word Jaccard >= threshold)
+#   - drops low-value domains (STARTUP_MATE_SEARCH_SKIP_DOMAINS)
+#   - strips snippet boilerplate ("Missing: ...", "Read more", ellipses)
+#   - ranks items by keyword overlap with the idea/domain context, with
+#     Serper's own rank as a tie-breaker
+#   - keeps the best items that fit STARTUP_MATE_SEARCH_TOKEN_BUDGET
+# Tokens are estimated at 4 characters per token, like the rate limiter.
+SEARCH_COMPACTION = os.environ.get("STARTUP_MATE_SEARCH_COMPACTION", "1") == "1"
+SEARCH_TOKEN_BUDGET = int(os.environ.get("STARTUP_MATE_SEARCH_TOKEN_BUDGET", "500"))
+DUPLICATE_THRESHOLD = float(os.environ.get("STARTUP_MATE_SEARCH_DUPLICATE_THRESHOLD", "0.8"))
+SKIP_DOMAINS = {
+    domain.strip().lower()
+    for domain in os.environ.get(
+        "STARTUP_MATE_SEARCH_SKIP_DOMAINS", "pinterest.com,instagram.com,tiktok.com,youtube.com"
+    ).split(",")
+    if domain.strip()
+}
+
+NO_RESULTS = "No good search results found."
+
+_BOILERPLATE = re.compile(
+    r"(Missing|Must include):.*$|Show results with:.*$|\b(Read|Learn|See) more\b\.?|\.{3}|…",
+    re.IGNORECASE,
+)
+_STOP_WORDS = {
+    "the", "and", "for", "with", "that", "which", "who", "from", "our", "your", "their", "are", "can",
+    "will", "this", "its", "has", "have", "was", "were", "not", "all", "into", "about", "more",
+}
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / 4)
+
+
+def _keywords(text: str) -> set:
+    return {word for word in re.findall(r"[a-z0-9]+", (text or "").lower()) if len(word) > 2} - _STOP_WORDS
+
+
+def _url_key(link: str) -> str:
+    if not link:
+        return ""
+    parsed = urlparse(link if "://" in link else "http://" + link)
+    host = parsed.netloc.lower()
+    host = host[4:] if host.startswith("www.") else host
+    return host + parsed.path.rstrip("/")
+
+
+def _skipped_domain(link: str) -> bool:
+    host = _url_key(link).split("/", 1)[0]
+    return any(host == domain or host.endswith("." + domain) for domain in SKIP_DOMAINS)
+
+
+def _clean(text) -> str:
+    text = _BOILERPLATE.sub(" ", str(text or ""))
+    return re.sub(r"\s+", " ", text).strip(" -–—|·")
+
+
+def result_items(results: dict) -> list:
+    """Flattens a Serper response into (title, link, snippet) dicts, in Serper's order."""
+    items = []
+    box = results.get("answerBox") or {}
+    if box:
+        items.append({"title": box.get("title", ""), "link": box.get("link", ""),
+                      "snippet": box.get("answer") or box.get("snippet") or ""})
+    graph = results.get("knowledgeGraph") or {}
+    if graph:
+        attributes = "; ".join(f"{key}: {value}" for key, value in (graph.get("attributes") or {}).items())
+        items.append({"title": graph.get("title", ""), "link": graph.get("website") or graph.get("descriptionLink", ""),
+                      "snippet": " ".join(part for part in (graph.get("description", ""), attributes) if part)})
+    for hit in results.get("organic") or results.get("news") or []:
+        snippet = hit.get("snippet", "")
+        if hit.get("date"):
+            snippet = f"{hit['date']}: {snippet}"
+        items.append({"title": hit.get("title", ""), "link": hit.get("link", ""), "snippet": snippet})
+    for question in results.get("peopleAlsoAsk") or []:
+        items.append({"title": question.get("question", ""), "link": question.get("link", ""),
+                      "snippet": question.get("snippet", "")})
+    return items
+
+
+def format_item(item: dict) -> str:
+    head = item["title"] or item["link"]
+    if item["title"] and item["link"]:
+        head += f" ({item['link']})"
+    return f"- {head}: {item['snippet']}" if item["snippet"] else f"- {head}"
+
+
+def _similar(words: set, kept: list) -> bool:
+    for other in kept:
+        union = words | other
+        if union and len(words & other) / len(union) >= DUPLICATE_THRESHOLD:
+            return True
+    return False
+
+
+def compact_results(results: dict, context: str = "", token_budget: int = SEARCH_TOKEN_BUDGET) -> tuple:
+    """Returns (text, stats) for a Serper response, most relevant results first, within `token_budget`.
+
+    `stats` counts the raw and compacted tokens and why results were dropped.
+    """
+    items = result_items(results or {})
+    raw_tokens = estimate_tokens("\n".join(format_item(item) for item in items))
+    stats = {"results": len(items), "kept": 0, "duplicates": 0, "skipped_domains": 0, "over_budget": 0}
+
+    seen_urls, seen_words, candidates = set(), [], []
+    for position, item in enumerate(items):
+        if item["link"] and _skipped_domain(item["link"]):
+            stats["skipped_domains"] += 1
+            continue
+        item = {"title": _clean(item["title"]), "link": item["link"], "snippet": _clean(item["snippet"])}
+        url = _url_key(item["link"])
+        words = _keywords(item["snippet"])
+        if (url and url in seen_urls) or (len(words) >= 3 and _similar(words, seen_words)):
+            stats["duplicates"] += 1
+            continue
+        if url:
+            seen_urls.add(url)
+        if len(words) >= 3:
+            seen_words.append(words)
+        candidates.append((position, item))
+
+    terms = _keywords(context)
+
+    def relevance(candidate):
+        position, item = candidate
+        overlap = len(terms & _keywords(item["title"] + " " + item["snippet"])) / len(terms) if terms else 0.0
+        return overlap + 0.5 / (position + 1)
+
+    lines, used = [], 0
+    for _, item in sorted(candidates, key=relevance, reverse=True):
+        line = format_item(item)
+        cost = estimate_tokens(line) + 1
+        if used + cost > token_budget:
+            if lines:
+                stats["over_budget"] += 1
+                continue
+            # Always keep something: the best result, cut to the budget
+            line = line[:max(token_budget * 4 - 4, 0)].rstrip() + "…"
+            cost = estimate_tokens(line) + 1
+        lines.append(line)
+        used += cost
+    stats["kept"] = len(lines)
+
+    text = "\n".join(lines) if lines else NO_RESULTS
+    stats["raw_tokens"] = raw_tokens
+    stats["tokens"] = estimate_tokens(text)
+    stats["saved_tokens"] = max(raw_tokens - stats["tokens"], 0)
+    return text, stats
@@ -1,102 +1,103 @@
-import streamlit as st
+import asyncio
+import contextvars
 import os
 import ast
+import json
+import logging
 import re
-from dotenv import load_dotenv
-from langchain_groq import ChatGroq
-from langchain_community.utilities import GoogleSerperAPIWrapper
-from langchain.agents import initialize_agent, Tool, AgentType
-from langchain_core.prompts import PromptTemplate
-from openai import OpenAI
-from langchain.chat_models import ChatOpenAI
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from Components.llm import get_llm, make_chain, resolve_model
+from Components.cache import acached_invoke, cached_invoke, cached_stream, fused_item_key, response_cache
+from Components.search import search_service
+from Components.metrics import registry
+from Components.semantic_cache import semantic_cache, use_semantic_cache
+from Components.investor_directory import investor_directory, normalize_domain
+from Components.json_stream import ObjectStreamParser
+from Components.agent_budget import AgentBudget
 
 
-# Load environment variables
-load_dotenv()
-os.environ["SERPER_API_KEY"] = st.secrets["SERPER_API_KEY"]
-os.environ["GROQ_API_KEY"] = st.secrets["GROQ_API_KEY"]
-os.environ["NOVITA_API_KEY"] = st.secrets["NOVITA_API_KEY"]
+logger = logging.getLogger(__name__)
+
+# API keys are loaded by Components.settings on first use, without importing Streamlit.
+# LLM, chains and the agent are built lazily on first use and memoized.
 
 # Initialize LLM
 # llm = ChatGroq(
 #     groq_api_key=os.environ["GROQ_API_KEY"],
 #     model_name="meta-llama/llama-4-scout-17b-16e-instruct"
 # )
-client = OpenAI(
-    base_url="https://api.novita.ai/v3/openai",
-    api_key=os.environ["NOVITA_API_KEY"],
-)
-
-# LangChain-compatible wrapper using Novita model
-llm = ChatOpenAI(
-    openai_api_base="https://api.novita.ai/v3/openai",
-    openai_api_key=os.environ["NOVITA_API_KEY"],
-    model="meta-llama/llama-4-maverick-17b-128e-instruct-fp8",
-    temperature=0.7
-)
-
-# Setup search tool
-search_tool = GoogleSerperAPIWrapper()
-tools = [
-    Tool(
-        name="Google Search",
-        func=search_tool.run,
-        description="Use to find investors, funding agencies, or pitch submission portals"
+# LangChain-compatible wrapper using Novita model (shared connection pool)
+def _llm():
+    tier, model = resolve_model("investor_agent")
+    return get_llm(temperature=0.7, model=model, tier=tier)
+
+# Setup search tool (shared, cached and deduplicated)
+search_tool = search_service
+
+def _agent():
+    """The agent on the model the current request routes it to (see resolve_model)."""
+    return _agent_for(*resolve_model("investor_agent"))
+
+@lru_cache(maxsize=8)
+def _agent_for(tier: str, model: str):
+    from langchain.agents import initialize_agent, Tool, AgentType
+    tools = [
+        Tool(
+            name="Google Search",
+            func=search_tool.compact,
+            coroutine=search_tool.acompact,
+            description="Use to find investors, funding agencies, or pitch submission portals"
+        )
+    ]
+    return initialize_agent(
+        tools=tools,
+        llm=get_llm(temperature=0.7, model=model, tier=tier),
+        agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+        handle_parsing_errors=True,
+        verbose=False,
+        **AgentBudget().executor_kwargs()
     )
-]
-agent = initialize_agent(
-    tools=tools,
-    llm=llm,
-    agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-    handle_parsing_errors=True,
-    verbose=False
-)
 
 # Extract main domain of startup idea
-domain_extraction_prompt = PromptTemplate(
-    input_variables=["idea"],
-    template="Given this startup idea: {idea}\nWhat is its main domain or industry in one word? E.g. EdTech, FinTech, HealthTech"
-)
-domain_chain = domain_extraction_prompt | llm
+DOMAIN_TEMPLATE = "Given this startup idea: {idea}\nWhat is its main domain or industry in one word? E.g. EdTech, FinTech, HealthTech"
+
+@lru_cache(maxsize=None)
+def _domain_chain():
+    return make_chain(DOMAIN_TEMPLATE, temperature=0.7, name="domain_chain")
 
-def extract_domain(startup_idea: str) -> str:
-    result = domain_chain.invoke({"idea": startup_idea})
-    return result.content.strip()
+def extract_domain(startup_idea: str, bypass_cache: bool = False) -> str:
+    result = cached_invoke(_domain_chain(), {"idea": startup_idea}, bypass_cache=bypass_cache)
+    return result.strip()
+
+async def aextract_domain(startup_idea: str, bypass_cache: bool = False) -> str:
+    result = await acached_invoke(_domain_chain(), {"idea": startup_idea}, bypass_cache=bypass_cache)
+    return result.strip()
 
 # Optional: Extract ideal investor persona
-investor_persona_prompt = PromptTemplate(
-    input_variables=["idea"],
-    template="""
+INVESTOR_PERSONA_TEMPLATE = """
 You are an investment analyst. Given the startup idea below, what type of investors would be ideal (e.g., Seed-stage AI-focused, HealthTech impact investors)?
 
 Startup Idea: {idea}
 
 Output just one short sentence describing the ideal investor type.
 """
-)
-investor_persona_chain = investor_persona_prompt | llm
 
-def extract_investor_persona(startup_idea: str) -> str:
-    result = investor_persona_chain.invoke({"idea": startup_idea})
-    return result.content.strip()
+@lru_cache(maxsize=None)
+def _investor_persona_chain():
+    return make_chain(INVESTOR_PERSONA_TEMPLATE, temperature=0.7, name="investor_persona_chain")
 
-# === Main Investor Search Function ===
-def find_investors(startup_idea: str, domain: str, mode: str = "vc_firms") -> list:
-    
-    # if mode == "vc_firms":
-    query = f"{domain} startup investors and funding opportunities 2024 / 2025"
-    # elif mode == "accelerators":
-    #     query = f"{domain} startup accelerator 2025 application site:techstars.com OR site:ycombinator.com"
-    # elif mode == "pitch_links":
-    #     query = f"submit pitch deck {domain} site:vcfirm.com OR site:crunchbase.com"
-    # else:
-    #     query = f"{domain} startup investor contacts"
+def extract_investor_persona(startup_idea: str, bypass_cache: bool = False) -> str:
+    result = cached_invoke(_investor_persona_chain(), {"idea": startup_idea}, bypass_cache=bypass_cache)
+    return result.strip()
 
-    raw_results = search_tool.run(query)
+async def aextract_investor_persona(startup_idea: str, bypass_cache: bool = False) -> str:
+    result = await acached_invoke(_investor_persona_chain(), {"idea": startup_idea}, bypass_cache=bypass_cache)
+    return result.strip()
 
-    extract_prompt = PromptTemplate(
-        input_variables=["results"],
-        template="""
+# === Main Investor Search Function ===
+EXTRACT_TEMPLATE = """
 Extract up to 5 entities with name, short description, and relevant link from the result:
 
 {results}
@@ -112,28 +113,252 @@ Format:
     ...
 ]
 """
-    )
-    extract_chain = extract_prompt | llm
-    parsed = extract_chain.invoke({"results": raw_results})
 
+# Structured extraction: strict JSON, validated record by record and parsed
+# incrementally so each investor is usable as soon as the model finishes it.
+#   json        - JSON requested in the prompt (default)
+#   json_schema - also ask the provider to enforce INVESTOR_SCHEMA
+#   legacy      - the original free-form prompt above
+INVESTOR_EXTRACTION_MODE = os.environ.get("STARTUP_MATE_INVESTOR_EXTRACTION", "json")
+
+EXTRACT_JSON_TEMPLATE = """
+Extract up to 5 entities (investors, funds, accelerators or funding programs) with name, short description, and relevant link from the search results below.
+
+{results}
+
+Respond with JSON only: an array of objects with exactly these string fields, no comments or trailing text.
+Use "N/A" for a link or contact that is not in the results.
+[
+    {{"name": "...", "intro": "...", "Website-link": "...", "Contact": "..."}}
+]
+"""
+
+INVESTOR_FIELDS = ("name", "intro", "Website-link", "Contact")
+
+INVESTOR_SCHEMA = {
+    "name": "investor_list",
+    "schema": {
+        "type": "object",
+        "properties": {
+            "investors": {
+                "type": "array",
+                "maxItems": 5,
+                "items": {
+                    "type": "object",
+                    "properties": {field: {"type": "string"} for field in INVESTOR_FIELDS},
+                    "required": list(INVESTOR_FIELDS),
+                },
+            }
+        },
+        "required": ["investors"],
+    },
+}
+
+@lru_cache(maxsize=None)
+def _extract_chain():
+    if INVESTOR_EXTRACTION_MODE == "legacy":
+        return make_chain(EXTRACT_TEMPLATE, temperature=0.7, name="extract_chain")
+    llm_kwargs = None
+    if INVESTOR_EXTRACTION_MODE == "json_schema":
+        llm_kwargs = {"response_format": {"type": "json_schema", "json_schema": INVESTOR_SCHEMA}}
+    return make_chain(EXTRACT_JSON_TEMPLATE, temperature=0.2, name="extract_chain", llm_kwargs=llm_kwargs)
+
+def validate_investor(record) -> dict:
+    """The record in the investor schema, or None when it has no usable name."""
+    if not isinstance(record, dict):
+        return None
+    name = str(record.get("name") or "").strip()
+    if not name or name == "...":
+        return None
+    return {
+        "name": name,
+        "intro": str(record.get("intro") or record.get("description") or "").strip(),
+        "Website-link": str(record.get("Website-link") or record.get("website") or record.get("link") or "N/A").strip(),
+        "Contact": str(record.get("Contact") or record.get("contact") or "N/A").strip(),
+    }
+
+class InvestorStreamParser:
+    """Feeds extraction output in chunks and returns validated investors as they complete."""
+
+    def __init__(self):
+        self._parser = ObjectStreamParser()
+        self._seen = set()
+
+    def feed(self, chunk: str) -> list:
+        investors = []
+        for record in self._parser.feed(chunk):
+            investor = validate_investor(record)
+            if investor is None:
+                registry.inc("startup_mate_investor_records_dropped_total", {})
+            elif investor["name"].lower() not in self._seen:
+                self._seen.add(investor["name"].lower())
+                investors.append(investor)
+        return investors
+
+    def finish(self, found: list) -> list:
+        """Investors recovered by the legacy parser when streaming found none."""
+        if found:
+            if self._parser.dropped:
+                logger.info("Salvaged %d investors; %d malformed records dropped", len(found), self._parser.dropped)
+            return []
+        return [investor for investor in map(validate_investor, _legacy_parse(self._parser.text)) if investor]
+
+def _investor_query(domain: str, mode: str = "vc_firms") -> str:
+    # if mode == "vc_firms":
+    query = f"{domain} startup investors and funding opportunities 2024 / 2025"
+    # elif mode == "accelerators":
+    #     query = f"{domain} startup accelerator 2025 application site:techstars.com OR site:ycombinator.com"
+    # elif mode == "pitch_links":
+    #     query = f"submit pitch deck {domain} site:vcfirm.com OR site:crunchbase.com"
+    # else:
+    #     query = f"{domain} startup investor contacts"
+    return query
+
+def _legacy_parse(parsed: str) -> list:
     try:
-        match = re.search(r"```(?:json)?\s*(\[.*?\])\s*```", parsed.content, re.DOTALL)
-        content_to_parse = match.group(1) if match else parsed.content
+        match = re.search(r"```(?:json)?\s*(\[.*?\])\s*```", parsed, re.DOTALL)
+        content_to_parse = match.group(1) if match else parsed
         if not match:
-            match = re.search(r"(\[\s*{.*?}\s*\])", parsed.content, re.DOTALL)
+            match = re.search(r"(\[\s*{.*?}\s*\])", parsed, re.DOTALL)
             if match:
                 content_to_parse = match.group(1)
 
         investor_list = ast.literal_eval(content_to_parse)
     except Exception as e:
-        print("Parsing failed:", e)
+        logger.warning("Parsing investor list failed: %s", e)
+        registry.inc("startup_mate_investor_parse_failures_total", {})
         investor_list = []
-    return investor_list
+    return investor_list if isinstance(investor_list, list) else []
+
+def _parse_investor_list(parsed: str) -> list:
+    parser = InvestorStreamParser()
+    investors = parser.feed(parsed)
+    return investors + parser.finish(investors)
+
+def _similar_namespace(domain: str, mode: str) -> str:
+    # Near-duplicate ideas only share investors within the same domain
+    return f"investors:{mode}:{normalize_domain(domain)}"
+
+def _similar_investors(startup_idea: str, domain: str, mode: str):
+    """(investors, similar_to, similarity) stored for a near-duplicate idea in the same domain, or None."""
+    match = semantic_cache.lookup(_similar_namespace(domain, mode), startup_idea)
+    if match is None:
+        return None
+    value, similar_to, score = match
+    return json.loads(value), similar_to, score
+
+def _remember_investors(startup_idea: str, domain: str, mode: str, investors: list):
+    if investors:
+        semantic_cache.add(_similar_namespace(domain, mode), startup_idea, json.dumps(investors))
+
+def _search_and_extract(domain: str, mode: str, bypass_cache: bool = False) -> list:
+    raw_results = search_tool.compact(_investor_query(domain, mode), context=domain)
+    parsed = cached_invoke(_extract_chain(), {"results": raw_results}, bypass_cache=bypass_cache)
+    investors = _parse_investor_list(parsed)
+    investor_directory.add(investors, domain, mode)
+    return investors
+
+async def _asearch_and_extract(domain: str, mode: str, bypass_cache: bool = False) -> list:
+    raw_results = await search_tool.acompact(_investor_query(domain, mode), context=domain)
+    parsed = await acached_invoke(_extract_chain(), {"results": raw_results}, bypass_cache=bypass_cache)
+    investors = _parse_investor_list(parsed)
+    await asyncio.to_thread(investor_directory.add, investors, domain, mode)
+    return investors
+
+# Stale directory entries are served at once and refreshed here, one search per (domain, mode)
+_refresh_lock = threading.Lock()
+_refreshing = set()
+_refresh_pool = None
+
+def _schedule_refresh(domain: str, mode: str):
+    global _refresh_pool
+    key = (normalize_domain(domain), mode)
+    with _refresh_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+        if _refresh_pool is None:
+            _refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="investor-refresh")
+
+    def refresh():
+        try:
+            _search_and_extract(domain, mode)
+        except Exception as e:
+            logger.warning("Refreshing investors for %s failed: %s", domain, e)
+        finally:
+            with _refresh_lock:
+                _refreshing.discard(key)
+
+    _refresh_pool.submit(refresh)
+
+def _directory_investors(startup_idea: str, domain: str, mode: str):
+    """Investors from the local directory (refreshing stale ones in the background), or None on a miss."""
+    investors, stale = investor_directory.lookup(domain, mode, idea=startup_idea)
+    if not investors:
+        return None
+    if stale:
+        _schedule_refresh(domain, mode)
+    return investors
+
+def _known_investors(startup_idea: str, domain: str, mode: str, bypass_cache: bool, allow_similar: bool,
+                     match: dict = None):
+    """Investors from the near-duplicate cache or the directory, or None when a search is needed.
+
+    When a near-duplicate idea's list is served, `match` gets its `similar_to` and `similarity`.
+    """
+    investors = None
+    similar = _similar_investors(startup_idea, domain, mode) if use_semantic_cache(allow_similar, bypass_cache) else None
+    if similar is not None:
+        investors, similar_to, score = similar
+        if match is not None:
+            match.update(similar_to=similar_to, similarity=score)
+    if investors is None and not bypass_cache:
+        investors = _directory_investors(startup_idea, domain, mode)
+    return investors
+
+def find_investors(startup_idea: str, domain: str, mode: str = "vc_firms", bypass_cache: bool = False,
+                   allow_similar: bool = True, match: dict = None) -> list:
+    investors = _known_investors(startup_idea, domain, mode, bypass_cache, allow_similar, match)
+    if investors is None:
+        investors = _search_and_extract(domain, mode, bypass_cache=bypass_cache)
+        if use_semantic_cache(allow_similar, bypass_cache):
+            _remember_investors(startup_idea, domain, mode, investors)
+    return investors
+
+async def afind_investors(startup_idea: str, domain: str, mode: str = "vc_firms", bypass_cache: bool = False,
+                          allow_similar: bool = True, match: dict = None) -> list:
+    # The semantic cache and the directory are SQLite: query them off the event loop
+    investors = await asyncio.to_thread(_known_investors, startup_idea, domain, mode, bypass_cache, allow_similar,
+                                        match)
+    if investors is None:
+        investors = await _asearch_and_extract(domain, mode, bypass_cache=bypass_cache)
+        if use_semantic_cache(allow_similar, bypass_cache):
+            await asyncio.to_thread(_remember_investors, startup_idea, domain, mode, investors)
+    return investors
+
+def stream_investors(startup_idea: str, domain: str, mode: str = "vc_firms", bypass_cache: bool = False,
+                     allow_similar: bool = True):
+    """Yields investors one at a time, each as soon as the extraction has written it out."""
+    investors = _known_investors(startup_idea, domain, mode, bypass_cache, allow_similar)
+    if investors is not None:
+        yield from investors
+        return
+    raw_results = search_tool.compact(_investor_query(domain, mode), context=domain)
+    parser = InvestorStreamParser()
+    investors = []
+    for chunk in cached_stream(_extract_chain(), {"results": raw_results}, bypass_cache=bypass_cache):
+        for investor in parser.feed(chunk):
+            investors.append(investor)
+            yield investor
+    for investor in parser.finish(investors):
+        investors.append(investor)
+        yield investor
+    investor_directory.add(investors, domain, mode)
+    if use_semantic_cache(allow_similar, bypass_cache):
+        _remember_investors(startup_idea, domain, mode, investors)
 
 # === Email Generation ===
-email_prompt = PromptTemplate(
-    input_variables=["idea", "investor"],
-    template="""
+EMAIL_TEMPLATE = """
 You are a startup founder writing to an investor.
 
 Startup Idea: {idea}
@@ -146,8 +371,171 @@ Write a short and compelling cold email with:
 
 Keep it under 6 lines.
 """
-)
-email_chain = email_prompt | llm
 
-def generate_investor_email(idea: str, investor_name: str) -> str:
-    return email_chain.invoke({"idea": idea, "investor": investor_name}).content.strip()
+@lru_cache(maxsize=None)
+def _email_chain():
+    return make_chain(EMAIL_TEMPLATE, temperature=0.7, name="email_chain")
+
+# Chains and the agent stay reachable as module attributes, built on first access
+_LAZY_ATTRIBUTES = {
+    "llm": _llm,
+    "agent": _agent,
+    "tools": lambda: _agent().tools,
+    "domain_chain": _domain_chain,
+    "investor_persona_chain": _investor_persona_chain,
+    "extract_chain": _extract_chain,
+    "email_chain": _email_chain,
+    "emails_chain": lambda: _emails_chain(),
+}
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _email_key(idea: str, investor_name: str) -> str:
+    return fused_item_key("investor_email", {"idea": idea, "investor": investor_name.strip()}, _emails_chain(), _email_chain())
+
+def generate_investor_email(idea: str, investor_name: str, bypass_cache: bool = False) -> str:
+    """The email stored by a fused batch, else one email call for this investor."""
+    stored = None if bypass_cache else response_cache.get(_email_key(idea, investor_name))
+    if stored is not None:
+        return stored
+    return cached_invoke(_email_chain(), {"idea": idea, "investor": investor_name}, bypass_cache=bypass_cache).strip()
+
+async def agenerate_investor_email(idea: str, investor_name: str, bypass_cache: bool = False) -> str:
+    stored = None if bypass_cache else await asyncio.to_thread(response_cache.get, _email_key(idea, investor_name))
+    if stored is not None:
+        return stored
+    return (await acached_invoke(_email_chain(), {"idea": idea, "investor": investor_name}, bypass_cache=bypass_cache)).strip()
+
+# Fused batch: every investor's email from one call, parsed as each object
+# completes. Each email is stored under (idea, investor) for
+# generate_investor_email(); investors the response missed fall back to
+# one call each. STARTUP_MATE_FUSED_CHAINS=0 always uses one call each.
+FUSED_CHAINS = os.environ.get("STARTUP_MATE_FUSED_CHAINS", "1") == "1"
+
+EMAILS_TEMPLATE = """
+You are a startup founder writing to investors.
+
+Startup Idea: {idea}
+Investors:
+{investors}
+
+Write one short and compelling cold email per investor, each with:
+- Warm intro line (not fake flattery)
+- Clear pitch (1-2 lines)
+- Call to action to connect or meet
+
+Keep each email under 6 lines.
+
+Respond with JSON only: an array with one object per investor, in the order given, with exactly these string fields, no comments or trailing text.
+[
+    {{"investor": "...", "email": "..."}}
+]
+"""
+
+@lru_cache(maxsize=None)
+def _emails_chain():
+    return make_chain(EMAILS_TEMPLATE, temperature=0.7, name="emails_chain")
+
+def _emails_inputs(idea: str, investor_names: list) -> dict:
+    return {"idea": idea, "investors": "\n".join(f"- {name}" for name in investor_names)}
+
+def _matched_emails(idea: str, records: list, pending: dict) -> list:
+    """Results for the records that name a pending investor; stores each email and removes it from `pending`."""
+    results = []
+    for record in records:
+        name = pending.pop(str(record.get("investor") or "").strip().lower(), None)
+        email = str(record.get("email") or "").strip()
+        if name is None or not email:
+            continue
+        response_cache.set(_email_key(idea, name), email)
+        results.append({"investor_name": name, "email": email})
+    return results
+
+# === Batch Email Generation ===
+EMAIL_BATCH_CONCURRENCY = int(os.environ.get("STARTUP_MATE_EMAIL_CONCURRENCY", "5"))
+
+def investor_names(investors: list) -> list:
+    """Names from a list of names or investor objects (as returned by find_investors). Raises ValueError."""
+    if not isinstance(investors, list):
+        raise ValueError("investors must be a list")
+    names = []
+    for investor in investors:
+        name = investor.get("name") if isinstance(investor, dict) else investor
+        if not isinstance(name, str) or not name.strip():
+            raise ValueError("Every investor needs a name")
+        names.append(name.strip())
+    if len(_unique_names(names)) < len(names):
+        raise ValueError("Investor names must be unique")
+    return names
+
+def _unique_names(investor_names: list) -> dict:
+    """Names keyed by their case-insensitive form, first spelling kept; one email is written per key."""
+    unique = {}
+    for name in investor_names:
+        unique.setdefault(name.strip().lower(), name)
+    return unique
+
+def generate_investor_emails(idea: str, investor_names: list, max_concurrency: int = EMAIL_BATCH_CONCURRENCY, bypass_cache: bool = False):
+    """Generates one email per investor, yielding each result as soon as it finishes.
+
+    With fused chains all emails come from one streamed call; investors it
+    misses are generated concurrently one call each. Names that differ only
+    in case or spacing get one email.
+    """
+    pending = _unique_names(investor_names)
+    investor_names = list(pending.values())
+    if not investor_names:
+        return
+    if FUSED_CHAINS and len(investor_names) > 1:
+        parser = ObjectStreamParser()
+        try:
+            for chunk in cached_stream(_emails_chain(), _emails_inputs(idea, investor_names), bypass_cache=bypass_cache):
+                yield from _matched_emails(idea, parser.feed(chunk), pending)
+        except Exception as e:
+            logger.warning("Fused email generation failed: %s", e)
+        investor_names = list(pending.values())
+    yield from _generate_each(idea, investor_names, max_concurrency, bypass_cache)
+
+def _generate_each(idea: str, investor_names: list, max_concurrency: int, bypass_cache: bool):
+    if not investor_names:
+        return
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(investor_names)))) as pool:
+        futures = {
+            # Each worker keeps the caller's per-request model overrides
+            pool.submit(contextvars.copy_context().run, generate_investor_email, idea, name, bypass_cache): name
+            for name in investor_names
+        }
+        for future in as_completed(futures):
+            try:
+                yield {"investor_name": futures[future], "email": future.result()}
+            except Exception as e:
+                yield {"investor_name": futures[future], "error": str(e)}
+
+async def agenerate_investor_emails(idea: str, investor_names: list, max_concurrency: int = EMAIL_BATCH_CONCURRENCY, bypass_cache: bool = False):
+    """Async variant of generate_investor_emails."""
+    pending = _unique_names(investor_names)
+    investor_names = list(pending.values())
+    if not investor_names:
+        return
+    if FUSED_CHAINS and len(investor_names) > 1:
+        try:
+            text = await acached_invoke(_emails_chain(), _emails_inputs(idea, investor_names), bypass_cache=bypass_cache)
+            for result in await asyncio.to_thread(_matched_emails, idea, ObjectStreamParser().feed(text), pending):
+                yield result
+        except Exception as e:
+            logger.warning("Fused email generation failed: %s", e)
+        investor_names = list(pending.values())
+    slots = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def generate(name):
+        async with slots:
+            try:
+                return {"investor_name": name, "email": await agenerate_investor_email(idea, name, bypass_cache)}
+            except Exception as e:
+                return {"investor_name": name, "error": str(e)}
+
+    for next_done in asyncio.as_completed([generate(name) for name in investor_names]):
+        yield await next_done
@@ -0,0 +1,208 @@
+import os
+import re
+import threading
+import time
+from urllib.parse import urlparse
+
+from Components.metrics import registry
+from Components.settings import cache_path
+from Components.store import SQLiteStore
+
+# Persistent investor directory, filled from every successful extraction in
+# find_investors. Investors are deduplicated by normalized name or website
+# and tagged with every domain (EdTech, FinTech, ...) they were found for.
+# An FTS5 index over name, intro and domain tags answers lookups in
+# milliseconds. Each (domain, mode) remembers when it was last searched, so
+# callers can tell a fresh answer from one that needs a background refresh.
+DIRECTORY_PATH = os.environ.get("STARTUP_MATE_INVESTOR_DIRECTORY_PATH") or cache_path("investors.sqlite3")
+DIRECTORY_STALE_SECONDS = float(os.environ.get("STARTUP_MATE_INVESTOR_DIRECTORY_TTL", str(7 * 24 * 3600)))
+DIRECTORY_LIMIT = int(os.environ.get("STARTUP_MATE_INVESTOR_DIRECTORY_LIMIT", "5"))
+
+# Placeholder values the extraction prompt produces when a field is unknown
+EMPTY_VALUES = {"", "...", "n/a", "na", "none", "null", "unknown", "-"}
+
+
+def normalize_domain(domain: str) -> str:
+    """'**Ed Tech.**' -> 'edtech'."""
+    return re.sub(r"[^a-z0-9]", "", (domain or "").lower())
+
+
+def _clean(value) -> str:
+    value = str(value or "").strip()
+    return "" if value.lower() in EMPTY_VALUES else value
+
+
+def _name_key(name: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def _website_key(website: str) -> str:
+    if not website:
+        return ""
+    host = urlparse(website if "://" in website else "http://" + website).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _keywords(text: str) -> set:
+    return {word for word in re.findall(r"[a-z0-9]+", (text or "").lower()) if len(word) > 2}
+
+
+class InvestorDirectory(SQLiteStore):
+    def __init__(self, path: str, stale_seconds: float):
+        super().__init__(path)
+        self.stale_seconds = stale_seconds
+        self._lock = threading.Lock()
+        self._stats = {"fresh": 0, "stale": 0, "misses": 0, "added": 0, "merged": 0}
+
+    def _setup(self, conn):
+        with conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS investors (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    name_key TEXT NOT NULL,
+                    website TEXT NOT NULL DEFAULT '',
+                    website_key TEXT NOT NULL DEFAULT '',
+                    intro TEXT NOT NULL DEFAULT '',
+                    contact TEXT NOT NULL DEFAULT '',
+                    domains TEXT NOT NULL DEFAULT '',
+                    updated_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS investors_name_key ON investors (name_key);
+                CREATE INDEX IF NOT EXISTS investors_website_key ON investors (website_key);
+                CREATE VIRTUAL TABLE IF NOT EXISTS investors_fts USING fts5(
+                    name, intro, domains, content='investors', content_rowid='id'
+                );
+                CREATE TRIGGER IF NOT EXISTS investors_ai AFTER INSERT ON investors BEGIN
+                    INSERT INTO investors_fts (rowid, name, intro, domains) VALUES (new.id, new.name, new.intro, new.domains);
+                END;
+                CREATE TRIGGER IF NOT EXISTS investors_au AFTER UPDATE ON investors BEGIN
+                    INSERT INTO investors_fts (investors_fts, rowid, name, intro, domains)
+                        VALUES ('delete', old.id, old.name, old.intro, old.domains);
+                    INSERT INTO investors_fts (rowid, name, intro, domains) VALUES (new.id, new.name, new.intro, new.domains);
+                END;
+                CREATE TRIGGER IF NOT EXISTS investors_ad AFTER DELETE ON investors BEGIN
+                    INSERT INTO investors_fts (investors_fts, rowid, name, intro, domains)
+                        VALUES ('delete', old.id, old.name, old.intro, old.domains);
+                END;
+                CREATE TABLE IF NOT EXISTS refreshes (
+                    domain TEXT NOT NULL,
+                    mode TEXT NOT NULL,
+                    refreshed_at REAL NOT NULL,
+                    PRIMARY KEY (domain, mode)
+                );
+            """)
+
+    def _count(self, name: str, value: int = 1):
+        self._stats[name] += value
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+    def _upsert(self, investor: dict, domain: str, now: float) -> bool:
+        """Adds or merges one investor; False when it has no usable name."""
+        name = _clean(investor.get("name"))
+        if not name:
+            return False
+        website = _clean(investor.get("Website-link") or investor.get("website"))
+        intro = _clean(investor.get("intro"))
+        contact = _clean(investor.get("Contact") or investor.get("contact"))
+        name_key, website_key = _name_key(name), _website_key(website)
+        row = self._conn.execute(
+            "SELECT id, website, intro, contact, domains FROM investors "
+            "WHERE name_key = ? OR (website_key != '' AND website_key = ?) LIMIT 1",
+            (name_key, website_key),
+        ).fetchone()
+        if row is None:
+            self._conn.execute(
+                "INSERT INTO investors (name, name_key, website, website_key, intro, contact, domains, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (name, name_key, website, website_key, intro, contact, domain, now),
+            )
+            self._count("added")
+            return True
+        row_id, old_website, old_intro, old_contact, domains = row
+        tags = domains.split()
+        if domain and domain not in tags:
+            tags.append(domain)
+        # Fresh values win; keep the old ones where the new extraction had none
+        self._conn.execute(
+            "UPDATE investors SET website = ?, website_key = ?, intro = ?, contact = ?, domains = ?, updated_at = ? "
+            "WHERE id = ?",
+            (website or old_website, website_key or _website_key(old_website), intro or old_intro,
+             contact or old_contact, " ".join(tags), now, row_id),
+        )
+        self._count("merged")
+        return True
+
+    def add(self, investors: list, domain: str, mode: str):
+        """Stores an extraction result for `domain` and marks the (domain, mode) as refreshed."""
+        domain = normalize_domain(domain)
+        now = time.time()
+        with self._lock, self._conn:
+            stored = sum(self._upsert(investor, domain, now) for investor in investors if isinstance(investor, dict))
+            if stored and domain:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO refreshes (domain, mode, refreshed_at) VALUES (?, ?, ?)",
+                    (domain, mode, now),
+                )
+
+    def lookup(self, domain: str, mode: str, idea: str = "", limit: int = DIRECTORY_LIMIT):
+        """(investors, stale) for a domain; investors is empty on a miss.
+
+        Matches are ranked by how many of the idea's keywords their name and
+        intro share, then by recency.
+        """
+        domain = normalize_domain(domain)
+        if not domain:
+            return [], True
+        with self._lock:
+            refreshed = self._conn.execute(
+                "SELECT refreshed_at FROM refreshes WHERE domain = ? AND mode = ?", (domain, mode)
+            ).fetchone()
+            rows = self._conn.execute(
+                "SELECT investors.name, investors.intro, investors.website, investors.contact, investors.updated_at "
+                "FROM investors_fts JOIN investors ON investors.id = investors_fts.rowid "
+                "WHERE investors_fts MATCH ?",
+                (f'domains:"{domain}"',),
+            ).fetchall()
+            if refreshed is None or not rows:
+                self._count("misses")
+                return [], True
+            stale = time.time() - refreshed[0] > self.stale_seconds
+            self._count("stale" if stale else "fresh")
+        keywords = _keywords(idea)
+        rows.sort(key=lambda row: (len(keywords & _keywords(f"{row[0]} {row[1]}")), row[4]), reverse=True)
+        investors = [
+            {"name": name, "intro": intro, "Website-link": website or "N/A", "Contact": contact or "N/A"}
+            for name, intro, website, contact, _ in rows[:limit]
+        ]
+        return investors, stale
+
+    def search(self, query: str, limit: int = 20) -> list:
+        """Full-text search over names, intros and domain tags."""
+        terms = " OR ".join(f'"{word}"' for word in _keywords(query))
+        if not terms:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT investors.name, investors.intro, investors.website, investors.contact, investors.domains "
+                "FROM investors_fts JOIN investors ON investors.id = investors_fts.rowid "
+                "WHERE investors_fts MATCH ? ORDER BY bm25(investors_fts) LIMIT ?",
+                (terms, limit),
+            ).fetchall()
+        return [
+            {"name": name, "intro": intro, "Website-link": website or "N/A", "Contact": contact or "N/A",
+             "domains": domains.split()}
+            for name, intro, website, contact, domains in rows
+        ]
+
+
+investor_directory = InvestorDirectory(DIRECTORY_PATH, DIRECTORY_STALE_SECONDS)
+
+registry.register_collector(lambda: [
+    ("startup_mate_investor_directory_total", {"result": result}, count)
+    for result, count in investor_directory.stats().items()
+])
@@ -0,0 +1,259 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+
+from Components.validator import research_idea, RESEARCH_MODES
+from Components.funding_advisor import extract_domain, find_investors
+from Components.pipeline import pipeline_options, run_pipeline
+from Components.agent_budget import AgentBudget
+from Components.settings import cache_path
+from Components.store import SQLiteStore
+
+# Background jobs for stages that can outlive an HTTP request (agent research,
+# investor search, the full pipeline). Submitting returns a job id at once; a
+# local worker pool runs the job and its status/result are kept in SQLite, so
+# any worker process can answer polls and unfinished jobs resume after a restart.
+# A running job holds a lease that its process renews every third of
+# STARTUP_MATE_JOB_LEASE seconds; a job whose lease ran out (its process died)
+# is queued again by whichever process notices first.
+JOBS_PATH = os.environ.get("STARTUP_MATE_JOBS_PATH") or cache_path("jobs.sqlite3")
+JOB_WORKERS = int(os.environ.get("STARTUP_MATE_JOB_WORKERS", "4"))
+JOB_LEASE_SECONDS = float(os.environ.get("STARTUP_MATE_JOB_LEASE", "60"))
+
+FINAL_STATUSES = ("done", "failed", "cancelled")
+
+# Set while a job runs: returns True once the job has been cancelled
+_job_cancelled = ContextVar("job_cancelled", default=None)
+
+
+def _run_research(params: dict):
+    return research_idea(params["idea"], mode=params.get("mode", "agent"),
+                         bypass_cache=bool(params.get("bypass_cache")),
+                         allow_similar=params.get("allow_similar", True),
+                         budget=AgentBudget.from_request(params.get("budget")))
+
+
+def _run_investors(params: dict):
+    bypass_cache = bool(params.get("bypass_cache"))
+    domain = extract_domain(params["idea"], bypass_cache=bypass_cache)
+    match = {}
+    investors = find_investors(params["idea"], domain, bypass_cache=bypass_cache,
+                               allow_similar=params.get("allow_similar", True), match=match)
+    return {"domain": domain, "investors": investors, **match}
+
+
+def _run_pipeline(params: dict):
+    # Same options as POST /pipeline; a cancelled job stops before its next stage
+    return run_pipeline(**pipeline_options(params), cancelled=_job_cancelled.get())
+
+
+JOB_KINDS = {
+    "research": _run_research,
+    "investors": _run_investors,
+    "pipeline": _run_pipeline,
+}
+
+
+def check_job(kind: str, params) -> None:
+    """Rejects a job that would only fail once a worker runs it. Raises ValueError."""
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown kind, expected one of {list(JOB_KINDS)}")
+    if not isinstance(params, dict) or not params.get("idea") or not isinstance(params["idea"], str):
+        raise ValueError("Missing idea")
+    if kind == "pipeline":
+        pipeline_options(params)
+    elif kind == "research":
+        if params.get("mode", "agent") not in RESEARCH_MODES:
+            raise ValueError(f"Unknown mode, expected one of {list(RESEARCH_MODES)}")
+        try:
+            AgentBudget.from_request(params.get("budget"))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid budget: {e}")
+
+
+def _owner() -> str:
+    # Unique per process: a restarted container reuses its hostname and pid
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:12]}"
+
+
+class JobQueue(SQLiteStore):
+    def __init__(self, path: str, workers: int, kinds: dict, lease_seconds: float = JOB_LEASE_SECONDS):
+        super().__init__(path)
+        self.kinds = kinds
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.owner = _owner()
+        self._pool = None
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._changed = threading.Condition()
+
+    def _setup(self, conn):
+        conn.row_factory = sqlite3.Row
+        with conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    owner TEXT,
+                    lease_expires_at REAL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "lease_expires_at" not in columns:
+                # Databases from before leases: their running jobs count as expired
+                conn.execute("ALTER TABLE jobs ADD COLUMN lease_expires_at REAL")
+
+    def _execute(self, sql: str, args: tuple = ()) -> int:
+        with self._lock, self._conn:
+            rowcount = self._conn.execute(sql, args).rowcount
+        with self._changed:
+            self._changed.notify_all()
+        return rowcount
+
+    def start(self):
+        """Starts the worker pool and the lease heartbeat, and resumes jobs whose process died."""
+        with self._lock:
+            if self._pool is not None:
+                return
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+        with self._lock:
+            queued = [row["id"] for row in self._conn.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at").fetchall()]
+        for job_id in queued:
+            self._pool.submit(self._work, job_id)
+        self.requeue_expired()
+        threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True).start()
+
+    def stop(self):
+        """Stops the heartbeat and waits for running jobs (used by tests and shutdown)."""
+        self._stopped.set()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+
+    def _heartbeat(self):
+        while not self._stopped.wait(self.lease_seconds / 3):
+            self._execute("UPDATE jobs SET lease_expires_at = ? WHERE owner = ? AND status = 'running'",
+                          (time.time() + self.lease_seconds, self.owner))
+            self.requeue_expired()
+
+    def requeue_expired(self) -> int:
+        """Queues running jobs whose lease expired (their process is gone) and runs them here."""
+        with self._lock:
+            expired = [row["id"] for row in self._conn.execute(
+                "SELECT id FROM jobs WHERE status = 'running' AND (lease_expires_at IS NULL OR lease_expires_at < ?)",
+                (time.time(),)).fetchall()]
+        requeued = 0
+        for job_id in expired:
+            if self._execute(
+                "UPDATE jobs SET status = 'queued', owner = NULL, lease_expires_at = NULL, updated_at = ? "
+                "WHERE id = ? AND status = 'running' AND (lease_expires_at IS NULL OR lease_expires_at < ?)",
+                (time.time(), job_id, time.time()),
+            ):
+                requeued += 1
+                self._pool.submit(self._work, job_id)
+        return requeued
+
+    def submit(self, kind: str, params: dict) -> str:
+        if kind not in self.kinds:
+            raise ValueError(f"Unknown job kind: {kind}")
+        self.start()
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._execute(
+            "INSERT INTO jobs (id, kind, params, status, created_at, updated_at) VALUES (?, ?, ?, 'queued', ?, ?)",
+            (job_id, kind, json.dumps(params), now, now),
+        )
+        self._pool.submit(self._work, job_id)
+        return job_id
+
+    def _work(self, job_id: str):
+        # Claim the job; another process or a cancellation may have got there first
+        now = time.time()
+        claimed = self._execute(
+            "UPDATE jobs SET status = 'running', owner = ?, lease_expires_at = ?, updated_at = ? "
+            "WHERE id = ? AND status = 'queued'",
+            (self.owner, now + self.lease_seconds, now, job_id),
+        )
+        if not claimed:
+            return
+        # Results of a job whose lease was lost to another process are dropped
+        job = self.get(job_id)
+        token = _job_cancelled.set(lambda: self._status(job_id) == "cancelled")
+        try:
+            result = self.kinds[job["kind"]](job["params"])
+            self._execute(
+                "UPDATE jobs SET status = 'done', result = ?, updated_at = ? "
+                "WHERE id = ? AND status = 'running' AND owner = ?",
+                (json.dumps(result), time.time(), job_id, self.owner),
+            )
+        except Exception as e:
+            self._execute(
+                "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? "
+                "WHERE id = ? AND status = 'running' AND owner = ?",
+                (str(e), time.time(), job_id, self.owner),
+            )
+        finally:
+            _job_cancelled.reset(token)
+
+    def _status(self, job_id: str):
+        with self._lock:
+            row = self._conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row["status"] if row else None
+
+    def get(self, job_id: str):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row["id"],
+            "kind": row["kind"],
+            "params": json.loads(row["params"]),
+            "status": row["status"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+
+    def wait(self, job_id: str, timeout: float):
+        """Long-polls until the job reaches a final status or `timeout` seconds pass."""
+        deadline = time.monotonic() + timeout
+        job = self.get(job_id)
+        while job is not None and job["status"] not in FINAL_STATUSES:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            # Woken by local updates; the short cap also catches updates from other processes
+            with self._changed:
+                self._changed.wait(min(remaining, 1.0))
+            job = self.get(job_id)
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancels a queued or running job.
+
+        A running pipeline job starts no further stages. Other running jobs are
+        single calls: they finish in the background but their result is dropped.
+        """
+        return bool(self._execute(
+            "UPDATE jobs SET status = 'cancelled', updated_at = ? WHERE id = ? AND status IN ('queued', 'running')",
+            (time.time(), job_id),
+        ))
+
+
+job_queue = JobQueue(JOBS_PATH, JOB_WORKERS, JOB_KINDS)
@@ -0,0 +1,70 @@
+import ast
+import json
+
+
+class ObjectStreamParser:
+    """Incremental parser for a JSON array of objects in streamed LLM output.
+
+    `feed()` takes text chunks as they arrive and returns every object that
+    has just been closed, so records can be used before the array ends. Text
+    before the first `[` (prose, code fences) is skipped. Objects written with
+    Python-style single quotes are accepted too. If the output is cut off,
+    the objects completed so far have still been returned.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.dropped = 0
+        self._in_array = False
+        self._depth = 0
+        self._object = []
+        self._quote = None
+        self._escaped = False
+
+    def feed(self, chunk: str) -> list:
+        self.text += chunk
+        records = []
+        for char in chunk:
+            if not self._in_array:
+                self._in_array = char == "["
+                continue
+            if self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                    self._object = [char]
+                elif char == "]":
+                    self._in_array = False
+                continue
+            self._object.append(char)
+            if self._quote:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == self._quote:
+                    self._quote = None
+            elif char in "\"'":
+                self._quote = char
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    record = self._load("".join(self._object))
+                    if record is None:
+                        self.dropped += 1
+                    else:
+                        records.append(record)
+        return records
+
+    @staticmethod
+    def _load(text: str):
+        try:
+            return json.loads(text)
+        except ValueError:
+            pass
+        try:
+            value = ast.literal_eval(text)
+        except (ValueError, SyntaxError):
+            return None
+        return value if isinstance(value, dict) else None
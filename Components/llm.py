@@ -0,0 +1,230 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+
+from Components.ratelimit import NO_TIMEOUT_RETRY_HEADER, llm_limiter, rate_limited_transports
+from Components.settings import load_secrets
+
+# Single LLM provider for every chain. All ChatOpenAI instances share one
+# keep-alive, connection-pooled HTTP transport (sync and async), so a
+# multi-step session reuses sockets and TLS sessions instead of opening new
+# ones per module. Per-chain temperature and model are still configurable.
+# Heavy imports (httpx, langchain_openai) happen on first use, not at import.
+# Requests go through the shared rate limiter (Components/ratelimit.py), which
+# also owns retries, so the OpenAI client's own retries are turned off.
+NOVITA_BASE_URL = os.environ.get("NOVITA_BASE_URL", "https://api.novita.ai/v3/openai")
+DEFAULT_MODEL = os.environ.get("STARTUP_MATE_MODEL", "meta-llama/llama-4-maverick-17b-128e-instruct-fp8")
+HTTP_POOL_SIZE = int(os.environ.get("STARTUP_MATE_HTTP_POOL_SIZE", "20"))
+HTTP_KEEPALIVE_CONNECTIONS = int(os.environ.get("STARTUP_MATE_HTTP_KEEPALIVE", "10"))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("STARTUP_MATE_HTTP_CONNECT_TIMEOUT", "10"))
+HTTP_TIMEOUT = float(os.environ.get("STARTUP_MATE_HTTP_TIMEOUT", "120"))
+
+# Model routing: each chain runs on a tier picked by its name. One-line
+# stages (domain, investor persona, single emails) use a small fast model;
+# the report synthesis and the research agent can use a larger one.
+# STARTUP_MATE_CHAIN_TIERS='{"email_chain": "default"}' remaps chains, and a
+# request can override tiers for its own calls (see model_overrides).
+# A call that times out (per-tier timeout) is retried once on
+# STARTUP_MATE_FALLBACK_MODEL. Models with a fallback skip the transport's
+# timeout retries, so the fallback starts right after the tier timeout.
+MODEL_TIERS = {
+    "fast": os.environ.get("STARTUP_MATE_MODEL_FAST", "meta-llama/llama-3.1-8b-instruct"),
+    "default": DEFAULT_MODEL,
+    "heavy": os.environ.get("STARTUP_MATE_MODEL_HEAVY", DEFAULT_MODEL),
+}
+CHAIN_TIERS = {
+    "domain_chain": "fast",
+    "investor_persona_chain": "fast",
+    "email_chain": "fast",
+    "synthesis_chain": "heavy",
+    "research_agent": "heavy",
+    **json.loads(os.environ.get("STARTUP_MATE_CHAIN_TIERS", "{}")),
+}
+TIER_TIMEOUTS = {
+    "fast": 20.0,
+    "default": HTTP_TIMEOUT,
+    "heavy": HTTP_TIMEOUT,
+    **json.loads(os.environ.get("STARTUP_MATE_TIER_TIMEOUTS", "{}")),
+}
+FALLBACK_MODEL = os.environ.get("STARTUP_MATE_FALLBACK_MODEL", DEFAULT_MODEL)
+
+# What a request's "models" override may name: these chains (or "*"), routed
+# to a tier or to a model id from STARTUP_MATE_ALLOWED_MODELS (comma-separated;
+# the tier models are always allowed). Clients cannot pick arbitrary models.
+ROUTABLE_CHAINS = frozenset({
+    "idea_chain", "synthesis_chain", "problem_chain", "solution_chain", "problem_solution_chain",
+    "mvp_chain", "domain_chain", "extract_chain", "investor_persona_chain", "email_chain",
+    "emails_chain", "research_agent", "investor_agent", *CHAIN_TIERS,
+})
+ALLOWED_MODELS = frozenset(
+    [model.strip() for model in os.environ.get("STARTUP_MATE_ALLOWED_MODELS", "").split(",") if model.strip()]
+    + list(MODEL_TIERS.values()) + [FALLBACK_MODEL]
+)
+
+# Per-request overrides: chain name (or "*") -> tier name or model id
+_overrides = ContextVar("model_overrides", default={})
+
+_lock = threading.Lock()
+_http_client = None
+_async_http_client = None
+_transports = None
+
+
+def _limits():
+    import httpx
+    return httpx.Limits(
+        max_connections=HTTP_POOL_SIZE,
+        max_keepalive_connections=HTTP_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=60,
+    )
+
+
+def _timeout():
+    import httpx
+    return httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+
+
+def _rate_limited_transports():
+    global _transports
+    if _transports is None:
+        _transports = rate_limited_transports(llm_limiter, _limits())
+    return _transports
+
+
+def http_client():
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            import httpx
+            _http_client = httpx.Client(transport=_rate_limited_transports()[0], timeout=_timeout())
+        return _http_client
+
+
+def async_http_client():
+    global _async_http_client
+    with _lock:
+        if _async_http_client is None:
+            import httpx
+            _async_http_client = httpx.AsyncClient(transport=_rate_limited_transports()[1], timeout=_timeout())
+        return _async_http_client
+
+
+@lru_cache(maxsize=64)
+def get_llm(temperature: float = 0.7, model: str = None, tier: str = "default", has_fallback: bool = False):
+    """Returns the shared chat model for a (temperature, model, tier) triple.
+
+    The tier sets the request timeout and labels the model's calls in metrics.
+    With `has_fallback`, timed-out requests are not retried by the transport.
+    """
+    from langchain_openai import ChatOpenAI
+    load_secrets()
+    return ChatOpenAI(
+        base_url=NOVITA_BASE_URL,
+        api_key=os.environ["NOVITA_API_KEY"],
+        model=model or DEFAULT_MODEL,
+        temperature=temperature,
+        stream_usage=True,
+        max_retries=0,
+        timeout=TIER_TIMEOUTS.get(tier, HTTP_TIMEOUT),
+        metadata={"model_tier": tier},
+        default_headers={NO_TIMEOUT_RETRY_HEADER: "1"} if has_fallback else None,
+        http_client=http_client(),
+        http_async_client=async_http_client(),
+    )
+
+
+def check_overrides(overrides) -> dict:
+    """`overrides` if every entry is a routable chain (or "*") mapped to a tier or allowed model; else ValueError."""
+    if overrides is None:
+        return {}
+    if not isinstance(overrides, dict):
+        raise ValueError("models must be an object")
+    for name, choice in overrides.items():
+        if name != "*" and name not in ROUTABLE_CHAINS:
+            raise ValueError(f"Unknown chain in models: {name}")
+        if not isinstance(choice, str) or (choice not in MODEL_TIERS and choice not in ALLOWED_MODELS):
+            raise ValueError(f"models values must be one of {sorted(MODEL_TIERS)} or an allowed model id")
+    return overrides
+
+
+@contextmanager
+def model_overrides(overrides: dict):
+    """Routes chains to other tiers or models for the calls made inside the block.
+
+    `overrides` maps a chain name, or "*" for every chain, to a tier name
+    ("fast", "default", "heavy") or an allowed model id (see check_overrides,
+    which raises ValueError for anything else). Asyncio tasks and the
+    pipeline's stage threads inherit the overrides.
+    """
+    token = _overrides.set({**_overrides.get(), **check_overrides(overrides)})
+    try:
+        yield
+    finally:
+        _overrides.reset(token)
+
+
+def resolve_model(name: str):
+    """(tier, model) a chain runs on, after per-request overrides."""
+    overrides = _overrides.get()
+    choice = overrides.get(name) or overrides.get("*") or CHAIN_TIERS.get(name, "default")
+    if choice in MODEL_TIERS:
+        return choice, MODEL_TIERS[choice]
+    return "custom", choice
+
+
+def _timeout_errors() -> tuple:
+    import httpx
+    import openai
+    return openai.APITimeoutError, httpx.TimeoutException
+
+
+def routed_llm(name: str, temperature: float = 0.7, llm_kwargs: dict = None):
+    """The chat model for chain `name`, falling back to FALLBACK_MODEL when a call times out."""
+    tier, model = resolve_model(name)
+    llm = get_llm(temperature, model, tier, has_fallback=FALLBACK_MODEL != model)
+    fallback = get_llm(temperature, FALLBACK_MODEL, "fallback") if FALLBACK_MODEL != model else None
+    if llm_kwargs:
+        llm = llm.bind(**llm_kwargs)
+        fallback = fallback.bind(**llm_kwargs) if fallback is not None else None
+    if fallback is not None:
+        llm = llm.with_fallbacks([fallback], exceptions_to_handle=_timeout_errors())
+    return llm
+
+
+def chain_model(llm):
+    """The primary chat model under `.bind()` and `.with_fallbacks()` wrappers."""
+    llm = getattr(llm, "runnable", llm)
+    return getattr(llm, "bound", llm)
+
+
+def make_chain(template: str, temperature: float = 0.7, model: str = None, name: str = None, llm_kwargs: dict = None):
+    """Builds a `prompt | llm` chain from a template string; `name` labels its runs in metrics.
+
+    Without an explicit `model` the chain is routed by `name` (see CHAIN_TIERS).
+    `llm_kwargs` are bound to the model call (e.g. `response_format`).
+    """
+    from langchain_core.prompts import PromptTemplate
+    from langchain_core.runnables import RunnableSequence
+    if model:
+        llm = get_llm(temperature, model)
+        if llm_kwargs:
+            llm = llm.bind(**llm_kwargs)
+    else:
+        llm = routed_llm(name, temperature, llm_kwargs)
+    return RunnableSequence(PromptTemplate.from_template(template), llm, name=name)
+
+
+def route_chain(chain):
+    """`chain` rebuilt on the model the current request's overrides pick, or `chain` itself."""
+    if not _overrides.get() or not chain.name:
+        return chain
+    from langchain_core.runnables import RunnableSequence
+    llm = chain_model(chain.last)
+    if resolve_model(chain.name)[1] == llm.model_name:
+        return chain
+    bound = getattr(chain.last, "runnable", chain.last)
+    llm_kwargs = getattr(bound, "kwargs", None) if bound is not llm else None
+    return RunnableSequence(chain.first, routed_llm(chain.name, llm.temperature, llm_kwargs), name=chain.name)
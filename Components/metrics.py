@@ -0,0 +1,256 @@
+import json
+import os
+import threading
+import time
+from functools import lru_cache
+
+# In-process metrics: per-chain and per-endpoint latency histograms, token
+# usage, estimated cost, agent iterations, search calls and cache hits.
+# LLM-side numbers come from a LangChain callback handler passed to every
+# chain/agent invocation; render_prometheus() exports everything as text.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+# USD per 1M (prompt, completion) tokens; override with STARTUP_MATE_PRICES='{"model": [in, out]}'
+DEFAULT_PRICES = {
+    "meta-llama/llama-4-maverick-17b-128e-instruct-fp8": (0.17, 0.85),
+    "meta-llama/llama-3.1-8b-instruct": (0.02, 0.05),
+}
+PRICES = {**DEFAULT_PRICES, **json.loads(os.environ.get("STARTUP_MATE_PRICES", "{}"))}
+
+HELP = {
+    "startup_mate_chain_latency_seconds": ("histogram", "Latency of top-level chain and agent runs"),
+    "startup_mate_endpoint_latency_seconds": ("histogram", "Latency of HTTP endpoints"),
+    "startup_mate_llm_calls_total": ("counter", "LLM calls per chain"),
+    "startup_mate_llm_tokens_total": ("counter", "LLM tokens per chain and kind"),
+    "startup_mate_llm_cost_usd_total": ("counter", "Estimated LLM cost in USD per chain"),
+    "startup_mate_agent_iterations_total": ("counter", "ReAct agent tool steps"),
+    "startup_mate_agent_stops_total": ("counter", "Agent runs by stop reason (completed or the budget that ran out)"),
+    "startup_mate_chain_errors_total": ("counter", "Failed chain and agent runs"),
+    "startup_mate_cache_requests_total": ("counter", "Response cache lookups by result"),
+    "startup_mate_search_requests_total": ("counter", "Google searches by result"),
+    "startup_mate_search_compactions_total": ("counter", "Search results compacted before going into a prompt"),
+    "startup_mate_search_prompt_tokens_total": ("counter", "Estimated search result tokens before (raw) and after (sent) compaction, and saved"),
+    "startup_mate_search_results_total": ("counter", "Compacted search results kept or dropped, by reason"),
+    "startup_mate_investor_parse_failures_total": ("counter", "Investor lists the parser could not read"),
+    "startup_mate_investor_records_dropped_total": ("counter", "Malformed investor records skipped while parsing"),
+    "startup_mate_rate_limited_total": ("counter", "Provider 429 responses by service"),
+    "startup_mate_retries_total": ("counter", "Retried provider calls by service and reason"),
+    "startup_mate_concurrency_limit": ("gauge", "Current adaptive concurrency limit by service"),
+    "startup_mate_rate_limit_wait_seconds_total": ("counter", "Time spent waiting for rate limit quota"),
+    "startup_mate_semantic_cache_total": ("counter", "Near-duplicate idea lookups by result"),
+    "startup_mate_investor_directory_total": ("counter", "Investor directory lookups and writes by result"),
+    "startup_mate_singleflight_total": ("counter", "Cache misses by coalescing result (leader, coalesced, remote)"),
+    "startup_mate_prefetch_total": ("counter", "Speculative Streamlit prefetches by stage and result"),
+    "startup_mate_model_latency_seconds": ("histogram", "Latency of single model calls by routing tier"),
+    "startup_mate_model_errors_total": ("counter", "Failed model calls (including timeouts) by routing tier"),
+}
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: tuple, extra: tuple = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._collectors = []
+
+    def inc(self, name: str, labels: dict, value: float = 1):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, labels: dict, value: float):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.setdefault(key, {"buckets": [0] * len(LATENCY_BUCKETS), "sum": 0.0, "count": 0})
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if value <= bound:
+                    histogram["buckets"][i] += 1
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+    def register_collector(self, collect):
+        """`collect()` returns (name, labels, value) counters read at export time."""
+        self._collectors.append(collect)
+
+    def _collected(self) -> dict:
+        counters = {}
+        for collect in self._collectors:
+            for name, labels, value in collect():
+                counters[(name, _label_key(labels))] = value
+        return counters
+
+    def render_prometheus(self) -> str:
+        with self._lock:
+            counters = {**dict(self._counters), **self._collected()}
+            histograms = {key: dict(value, buckets=list(value["buckets"])) for key, value in self._histograms.items()}
+        lines = []
+        names = sorted({name for name, _ in counters} | {name for name, _ in histograms})
+        for name in names:
+            kind, help_text = HELP.get(name, ("counter", name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+            for (metric, labels), histogram in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                for bound, count in zip(LATENCY_BUCKETS, histogram["buckets"]):
+                    lines.append(f"{name}_bucket{_format_labels(labels, (('le', bound),))} {count}")
+                lines.append(f"{name}_bucket{_format_labels(labels, (('le', '+Inf'),))} {histogram['count']}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {histogram['sum']}")
+                lines.append(f"{name}_count{_format_labels(labels)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict:
+        """Human-friendly summary for debug views."""
+        with self._lock:
+            counters = {**dict(self._counters), **self._collected()}
+            histograms = dict(self._histograms)
+        latency = {}
+        for (name, labels), histogram in histograms.items():
+            label = ",".join(str(v) for _, v in labels)
+            latency.setdefault(name.replace("startup_mate_", ""), {})[label] = {
+                "count": histogram["count"],
+                "avg_seconds": round(histogram["sum"] / histogram["count"], 3) if histogram["count"] else 0,
+            }
+        totals = {}
+        for (name, labels), value in counters.items():
+            label = ",".join(str(v) for _, v in labels)
+            totals.setdefault(name.replace("startup_mate_", ""), {})[label] = round(value, 6)
+        return {"latency": latency, "counters": totals}
+
+
+registry = Registry()
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    prompt_price, completion_price = PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+def token_usage(response):
+    """(prompt, completion, model) from an LLMResult, streamed or not."""
+    llm_output = response.llm_output or {}
+    usage = llm_output.get("token_usage") or {}
+    model = llm_output.get("model_name", "")
+    if usage:
+        return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0), model
+    for generations in response.generations:
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            metadata = getattr(message, "usage_metadata", None)
+            if metadata:
+                model = model or (message.response_metadata or {}).get("model_name", "")
+                return metadata.get("input_tokens", 0), metadata.get("output_tokens", 0), model
+    return 0, 0, model
+
+
+@lru_cache(maxsize=None)
+def callback_handler():
+    """The shared LangChain callback handler; built lazily so langchain is not imported early."""
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class MetricsCallbackHandler(BaseCallbackHandler):
+        def __init__(self):
+            self._lock = threading.Lock()
+            self._roots = {}   # run_id -> name of the top-level run it belongs to
+            self._started = {}  # top-level run_id -> start time
+            self._models = {}   # model run_id -> (routing tier, start time)
+
+        def _root(self, run_id, parent_run_id, name):
+            with self._lock:
+                root = self._roots.get(parent_run_id) if parent_run_id else None
+                if root is None:
+                    root = name or "unknown"
+                    self._started[run_id] = time.perf_counter()
+                self._roots[run_id] = root
+                return root
+
+        def _finish(self, run_id, failed: bool):
+            with self._lock:
+                root = self._roots.pop(run_id, None)
+                started = self._started.pop(run_id, None)
+            if started is not None:
+                registry.observe("startup_mate_chain_latency_seconds", {"chain": root}, time.perf_counter() - started)
+                if failed:
+                    registry.inc("startup_mate_chain_errors_total", {"chain": root})
+
+        def _start_model(self, run_id, metadata):
+            tier = (metadata or {}).get("model_tier")
+            if tier:
+                with self._lock:
+                    self._models[run_id] = (tier, time.perf_counter())
+
+        def _finish_model(self, run_id, failed: bool):
+            with self._lock:
+                entry = self._models.pop(run_id, None)
+            if entry is not None:
+                tier, started = entry
+                registry.observe("startup_mate_model_latency_seconds", {"tier": tier}, time.perf_counter() - started)
+                if failed:
+                    registry.inc("startup_mate_model_errors_total", {"tier": tier})
+
+        def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs):
+            name = kwargs.get("name") or (serialized or {}).get("name")
+            self._root(run_id, parent_run_id, name)
+
+        def on_chain_end(self, outputs, *, run_id, **kwargs):
+            self._finish(run_id, failed=False)
+
+        def on_chain_error(self, error, *, run_id, **kwargs):
+            self._finish(run_id, failed=True)
+
+        def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, **kwargs):
+            self._root(run_id, parent_run_id, kwargs.get("name"))
+            self._start_model(run_id, kwargs.get("metadata"))
+
+        def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, **kwargs):
+            self._root(run_id, parent_run_id, kwargs.get("name"))
+            self._start_model(run_id, kwargs.get("metadata"))
+
+        def on_llm_end(self, response, *, run_id, **kwargs):
+            with self._lock:
+                chain = self._roots.get(run_id, "unknown")
+            prompt_tokens, completion_tokens, model = token_usage(response)
+            registry.inc("startup_mate_llm_calls_total", {"chain": chain})
+            registry.inc("startup_mate_llm_tokens_total", {"chain": chain, "kind": "prompt"}, prompt_tokens)
+            registry.inc("startup_mate_llm_tokens_total", {"chain": chain, "kind": "completion"}, completion_tokens)
+            registry.inc("startup_mate_llm_cost_usd_total", {"chain": chain},
+                         estimate_cost(model, prompt_tokens, completion_tokens))
+            self._finish_model(run_id, failed=False)
+            self._finish(run_id, failed=False)
+
+        def on_llm_error(self, error, *, run_id, **kwargs):
+            self._finish_model(run_id, failed=True)
+            self._finish(run_id, failed=True)
+
+        def on_agent_action(self, action, *, run_id, **kwargs):
+            with self._lock:
+                agent = self._roots.get(run_id, "agent")
+            registry.inc("startup_mate_agent_iterations_total", {"agent": agent})
+
+    return MetricsCallbackHandler()
+
+
+def run_config(run_name: str = None) -> dict:
+    """LangChain `config` that reports the run to the metrics handler."""
+    config = {"callbacks": [callback_handler()]}
+    if run_name:
+        config["run_name"] = run_name
+    return config
@@ -1,29 +1,15 @@
-from langchain_core.prompts import PromptTemplate
-from langchain_groq import ChatGroq
-import os
-from openai import OpenAI
-from langchain.chat_models import ChatOpenAI
+from functools import lru_cache
+from Components.llm import make_chain
+from Components.cache import acached_invoke, cached_invoke, cached_stream
+from Components.report import report_context
 
 # llm = ChatGroq(
 #     groq_api_key=os.environ["GROQ_API_KEY"],
 #     model_name="meta-llama/llama-4-scout-17b-16e-instruct"
 # )
-client = OpenAI(
-    base_url="https://api.novita.ai/v3/openai",
-    api_key=os.environ["NOVITA_API_KEY"],
-)
-
-# LangChain-compatible wrapper using Novita model
-llm = ChatOpenAI(
-    openai_api_base="https://api.novita.ai/v3/openai",
-    openai_api_key=os.environ["NOVITA_API_KEY"],
-    model="meta-llama/llama-4-maverick-17b-128e-instruct-fp8",
-    temperature=0.7
-)
-
-mvp_prompt = PromptTemplate(
-    input_variables=["startup_name", "problem", "solution","report"],
-    template="""
+# LangChain-compatible wrapper using Novita model (shared connection pool).
+# The chain is built on first use so importing this module stays cheap.
+MVP_TEMPLATE = """
 You are a technical cofounder. Based on the following startup idea, generate a complete MVP plan.
 
 Startup Name: {startup_name}
@@ -55,14 +41,39 @@ Return the plan in the following format in markdown:
 ### 🧱 Architecture Diagram (Text-based)
 - Describe system components and how they interact
 """
-)
 
-mvp_chain = mvp_prompt | llm
+@lru_cache(maxsize=None)
+def _mvp_chain():
+    return make_chain(MVP_TEMPLATE, temperature=0.7, name="mvp_chain")
+
+def __getattr__(name):
+    if name == "mvp_chain":
+        return _mvp_chain()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Report sections the MVP prompt needs; the rest of the report is not sent
+MVP_REPORT_SECTIONS = ("summary", "competitors", "gaps")
+
+def generate_mvp_plan(startup_name: str, problem: str, solution: str, report: str, bypass_cache: bool = False) -> str:
+    return cached_invoke(_mvp_chain(), {
+        "startup_name": startup_name,
+        "problem": problem,
+        "solution": solution,
+        "report": report_context(report, MVP_REPORT_SECTIONS)
+    }, bypass_cache=bypass_cache).strip()
+
+async def agenerate_mvp_plan(startup_name: str, problem: str, solution: str, report: str, bypass_cache: bool = False) -> str:
+    return (await acached_invoke(_mvp_chain(), {
+        "startup_name": startup_name,
+        "problem": problem,
+        "solution": solution,
+        "report": report_context(report, MVP_REPORT_SECTIONS)
+    }, bypass_cache=bypass_cache)).strip()
 
-def generate_mvp_plan(startup_name: str, problem: str, solution: str, report: str) -> str:
-    return mvp_chain.invoke({
+def stream_mvp_plan(startup_name: str, problem: str, solution: str, report: str, bypass_cache: bool = False):
+    yield from cached_stream(_mvp_chain(), {
         "startup_name": startup_name,
         "problem": problem,
         "solution": solution,
-        "report": report
-    }).content.strip()
+        "report": report_context(report, MVP_REPORT_SECTIONS)
+    }, bypass_cache=bypass_cache)
@@ -0,0 +1,221 @@
+import base64
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from Components.validator import generate_ideas, extract_idea_names, research_idea, RESEARCH_MODES
+from Components.business_plan import generate_problem_statements, generate_solution, create_pitch_deck, render_pitch_deck
+from Components.funding_advisor import extract_domain, find_investors
+from Components.mvp_builder import generate_mvp_plan
+
+# Full idea-to-deck workflow as a dependency graph. Each stage starts as soon
+# as the stages it depends on have finished, so independent branches overlap:
+#
+#   ideas ─┬─ research ── problems ── solution ─┬─ pitch_deck
+#          │                                    └─ mvp
+#          └─ domain ── investors
+
+
+class Stage:
+    def __init__(self, name: str, deps: tuple, func):
+        self.name = name
+        self.deps = deps
+        self.func = func  # called with the dict of finished stage results
+
+
+def run_stages(stages: list, max_workers: int = 4, completed: dict = None, on_result=None, cancelled=None) -> dict:
+    """Runs stages concurrently in dependency order and records per-stage timings.
+
+    Stages found in `completed` (name -> result, e.g. from a checkpoint) are
+    not run again. `on_result(name, result)` is called as each stage succeeds.
+    Once `cancelled()` returns True no further stage starts; running ones finish.
+    """
+    names = {stage.name for stage in stages}
+    completed = {name: value for name, value in (completed or {}).items() if name in names}
+    pending = {stage.name: stage for stage in stages if stage.name not in completed}
+    results, errors, timings = dict(completed), {}, {}
+    running = {}
+    started = time.perf_counter()
+
+    def timed(stage, inputs):
+        begin = time.perf_counter()
+        try:
+            return stage.func(inputs)
+        finally:
+            timings[stage.name] = {
+                "start": round(begin - started, 3),
+                "end": round(time.perf_counter() - started, 3),
+                "seconds": round(time.perf_counter() - begin, 3),
+            }
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            if pending and cancelled is not None and cancelled():
+                for name in pending:
+                    errors[name] = "skipped: cancelled"
+                pending.clear()
+            for name, stage in list(pending.items()):
+                if any(dep in errors for dep in stage.deps):
+                    errors[name] = "skipped: a dependency failed"
+                    del pending[name]
+                elif all(dep in results for dep in stage.deps):
+                    future = pool.submit(contextvars.copy_context().run, timed, stage, dict(results))
+                    running[future] = name
+                    del pending[name]
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    errors[name] = str(e)
+                    continue
+                if on_result is not None:
+                    on_result(name, results[name])
+
+    return {
+        "results": results,
+        "errors": errors,
+        "timings": timings,
+        "critical_path": critical_path(stages, timings),
+        "total_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def critical_path(stages: list, timings: dict) -> list:
+    """Walks back from the last stage to finish through its latest-finishing dependency."""
+    deps = {stage.name: stage.deps for stage in stages}
+    finished = [name for name in timings if name in deps]
+    if not finished:
+        return []
+    path = [max(finished, key=lambda name: timings[name]["end"])]
+    while True:
+        ran = [dep for dep in deps[path[-1]] if dep in timings]
+        if not ran:
+            break
+        path.append(max(ran, key=lambda name: timings[name]["end"]))
+    return path[::-1]
+
+
+def pipeline_options(data: dict) -> dict:
+    """run_pipeline keyword arguments from a /pipeline body or pipeline job params. Raises ValueError.
+
+    Only client-facing options are taken; file paths, checkpoints and worker
+    counts are for trusted callers (batch.py) only.
+    """
+    idea = data.get("idea")
+    if not idea or not isinstance(idea, str):
+        raise ValueError("Missing idea")
+    mode = data.get("mode", "parallel")
+    if mode not in RESEARCH_MODES:
+        raise ValueError(f"Unknown mode, expected one of {list(RESEARCH_MODES)}")
+    try:
+        idea_index = int(data.get("idea_index", 0))
+        problem_index = int(data.get("problem_index", 0))
+    except (TypeError, ValueError):
+        raise ValueError("idea_index and problem_index must be integers")
+    if idea_index < 0 or problem_index < 0:
+        raise ValueError("idea_index and problem_index must not be negative")
+    startup_name = data.get("startup_name")
+    return {
+        "idea": idea,
+        "startup_name": str(startup_name) if startup_name else None,
+        "research_mode": mode,
+        "idea_index": idea_index,
+        "problem_index": problem_index,
+        "refine_idea": bool(data.get("refine_idea", True)),
+        "bypass_cache": bool(data.get("bypass_cache")),
+        "allow_similar": bool(data.get("allow_similar", True)),
+    }
+
+
+def run_pipeline(idea: str, startup_name: str = None, research_mode: str = "parallel",
+                 idea_index: int = 0, problem_index: int = 0, refine_idea: bool = True,
+                 bypass_cache: bool = False, max_workers: int = 4, allow_similar: bool = True,
+                 deck_path: str = None, render_deck: bool = True, completed: dict = None, on_stage=None,
+                 cancelled=None) -> dict:
+    """Runs generate-ideas → research → problems → solution → deck/MVP, with domain and investors alongside.
+
+    The deck is written to `deck_path` when given; otherwise it is returned
+    in memory as `pitch_deck_base64` and nothing touches the disk.
+    `render_deck=False` skips the deck. `completed` and `on_stage` let a
+    caller resume from and checkpoint stage results (see run_stages).
+    `cancelled()` stops the run before its next stage.
+    """
+
+    def ideas(_):
+        if not refine_idea:
+            return {"refined": "", "idea_names": [idea], "selected_idea": idea}
+        refined = generate_ideas(idea, bypass_cache=bypass_cache)
+        names = extract_idea_names(refined) or [idea]
+        return {"refined": refined, "idea_names": names, "selected_idea": names[min(idea_index, len(names) - 1)]}
+
+    def research(done):
+        return research_idea(done["ideas"]["selected_idea"], mode=research_mode, bypass_cache=bypass_cache,
+                             allow_similar=allow_similar)["report"]
+
+    def problems(done):
+        found = generate_problem_statements(done["research"], bypass_cache=bypass_cache)
+        if not found:
+            raise ValueError("No problem statements could be parsed from the report")
+        return found
+
+    def solution(done):
+        problem = done["problems"][min(problem_index, len(done["problems"]) - 1)]
+        return {"problem": problem, "solution": generate_solution(problem, bypass_cache=bypass_cache)}
+
+    def name(done):
+        return startup_name or done["ideas"]["selected_idea"] or "My Startup"
+
+    def pitch_deck(done):
+        deck = (name(done), done["solution"]["problem"], done["solution"]["solution"], done["research"])
+        if deck_path:
+            return create_pitch_deck(*deck, output_path=deck_path)
+        return base64.b64encode(render_pitch_deck(*deck)).decode("ascii")
+
+    def mvp(done):
+        return generate_mvp_plan(name(done), done["solution"]["problem"], done["solution"]["solution"],
+                                 done["research"], bypass_cache=bypass_cache)
+
+    def domain(done):
+        return extract_domain(done["ideas"]["selected_idea"], bypass_cache=bypass_cache)
+
+    def investors(done):
+        return find_investors(done["ideas"]["selected_idea"], done["domain"], bypass_cache=bypass_cache,
+                              allow_similar=allow_similar)
+
+    stages = [
+        Stage("ideas", (), ideas),
+        Stage("research", ("ideas",), research),
+        Stage("domain", ("ideas",), domain),
+        Stage("investors", ("ideas", "domain"), investors),
+        Stage("problems", ("research",), problems),
+        Stage("solution", ("problems",), solution),
+        Stage("mvp", ("ideas", "research", "solution"), mvp),
+    ]
+    if render_deck or deck_path:
+        stages.append(Stage("pitch_deck", ("ideas", "research", "solution"), pitch_deck))
+    run = run_stages(stages, max_workers=max_workers, completed=completed, on_result=on_stage, cancelled=cancelled)
+    done = run["results"]
+    ideas_result = done.get("ideas", {})
+    solution_result = done.get("solution", {})
+    return {
+        "refined": ideas_result.get("refined"),
+        "idea_names": ideas_result.get("idea_names"),
+        "selected_idea": ideas_result.get("selected_idea"),
+        "report": done.get("research"),
+        "problems": done.get("problems"),
+        "selected_problem": solution_result.get("problem"),
+        "solution": solution_result.get("solution"),
+        "pitch_deck_path": done.get("pitch_deck") if deck_path else None,
+        "pitch_deck_base64": None if deck_path else done.get("pitch_deck"),
+        "mvp_plan": done.get("mvp"),
+        "domain": done.get("domain"),
+        "investors": done.get("investors"),
+        "errors": run["errors"],
+        "timings": run["timings"],
+        "critical_path": run["critical_path"],
+        "total_seconds": run["total_seconds"],
+    }
@@ -0,0 +1,105 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from Components.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Speculative prefetch for the Streamlit workflow. While the user reads the
+# candidate ideas or problem statements, the stages they are likely to run
+# next already run in the background. Results land in the response cache,
+# and work still in flight is joined through single flight, so the option
+# the user finally picks usually answers at once.
+# Each session may start at most STARTUP_MATE_PREFETCH_BUDGET speculative
+# tasks. One shared pool of STARTUP_MATE_PREFETCH_WORKERS threads bounds the
+# load across all sessions.
+PREFETCH_BUDGET = int(os.environ.get("STARTUP_MATE_PREFETCH_BUDGET", "8"))
+PREFETCH_WORKERS = int(os.environ.get("STARTUP_MATE_PREFETCH_WORKERS", "2"))
+
+_pool_lock = threading.Lock()
+_pool = None
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+        return _pool
+
+
+def consume(stream, *args, **kwargs) -> str:
+    """Runs a streaming stage to the end, so its result is cached like a clicked one."""
+    return "".join(stream(*args, **kwargs))
+
+
+class Prefetcher:
+    """One session's speculative tasks, keyed by (stage, input).
+
+    A key is speculated at most once per session, even after it was claimed
+    or cancelled, so Streamlit reruns do not spend the budget again.
+    """
+
+    def __init__(self, budget: int = PREFETCH_BUDGET):
+        self.budget = budget
+        self.started = 0
+        self._lock = threading.Lock()
+        self._tasks = {}
+
+    def remaining(self) -> int:
+        with self._lock:
+            return max(self.budget - self.started, 0)
+
+    def speculate(self, stage: str, value: str, fn, *args, **kwargs) -> bool:
+        """Starts `fn(*args, **kwargs)` in the background unless it already runs or the budget is spent."""
+        key = (stage, value)
+        with self._lock:
+            if key in self._tasks:
+                return True
+            if self.started >= self.budget:
+                result = "over_budget"
+            else:
+                self.started += 1
+                self._tasks[key] = _executor().submit(self._run, key, fn, args, kwargs)
+                result = "started"
+        registry.inc("startup_mate_prefetch_total", {"stage": stage, "result": result})
+        return result == "started"
+
+    def _run(self, key: tuple, fn, args: tuple, kwargs: dict):
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            # The real call runs the stage again and reports the error
+            logger.info("Prefetch of %s failed: %s", key[0], e)
+            registry.inc("startup_mate_prefetch_total", {"stage": key[0], "result": "failed"})
+            raise
+
+    def claim(self, stage: str, value: str):
+        """Records whether the path the user chose was prefetched. The caller then runs the stage as usual."""
+        with self._lock:
+            future = self._tasks.get((stage, value))
+        if future is None or future.cancelled():
+            result = "miss"
+        elif future.done():
+            result = "miss" if future.exception() else "hit"
+        else:
+            result = "joined"
+        registry.inc("startup_mate_prefetch_total", {"stage": stage, "result": result})
+
+    def cancel(self, stage: str = None):
+        """Drops speculation for `stage` (or every stage).
+
+        Tasks still queued never run and their budget is returned. Tasks
+        already running finish in the background, and their results stay
+        cached.
+        """
+        with self._lock:
+            cancelled = 0
+            for key, future in self._tasks.items():
+                if (stage is None or key[0] == stage) and future.cancel():
+                    cancelled += 1
+                    self.started -= 1
+        if cancelled:
+            registry.inc("startup_mate_prefetch_total", {"stage": stage or "all", "result": "cancelled"}, cancelled)
@@ -0,0 +1,485 @@
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+
+from Components.metrics import registry
+from Components.settings import cache_path
+from Components.store import SQLiteStore
+
+# Provider rate limiting shared by every chain and search call.
+# Each service ("llm" for Novita, "search" for Serper) has:
+#   - token buckets for requests/minute and tokens/minute, kept in SQLite so
+#     every Flask/Streamlit/worker process on the host draws from one quota;
+#   - an AIMD concurrency limit (additive increase on fast successes,
+#     multiplicative decrease on 429s and slow responses), per process;
+#   - retries with full-jitter exponential backoff inside a deadline, honouring
+#     Retry-After. A 429 also drains the shared bucket so other processes back off.
+# Buckets refill at STARTUP_MATE_RATE_HEADROOM of the quota, so sustained
+# throughput settles just below it instead of bouncing off it.
+RATELIMIT_PATH = os.environ.get("STARTUP_MATE_RATELIMIT_PATH") or cache_path("ratelimit.sqlite3")
+RATE_HEADROOM = float(os.environ.get("STARTUP_MATE_RATE_HEADROOM", "0.9"))
+BURST_SECONDS = float(os.environ.get("STARTUP_MATE_RATE_BURST_SECONDS", "5"))
+RETRY_DEADLINE_SECONDS = float(os.environ.get("STARTUP_MATE_RETRY_DEADLINE", "60"))
+MAX_RETRIES = int(os.environ.get("STARTUP_MATE_MAX_RETRIES", "5"))
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 20.0
+
+# Expected completion size reserved up front when a request sets no max_tokens
+COMPLETION_TOKEN_ESTIMATE = int(os.environ.get("STARTUP_MATE_COMPLETION_TOKEN_ESTIMATE", "800"))
+
+RETRYABLE_ERROR_NAMES = {
+    "ConnectError", "ConnectTimeout", "ReadTimeout", "WriteTimeout", "PoolTimeout", "ReadError",
+    "RemoteProtocolError", "ClientConnectionError", "ServerDisconnectedError",
+}
+TIMEOUT_ERROR_NAMES = {"ConnectTimeout", "ReadTimeout", "WriteTimeout", "PoolTimeout"}
+
+# Set by Components.llm on requests to a model that has a fallback. The
+# transport strips it and does not retry their timeouts, so the caller's
+# fallback model takes over at once instead of after the whole retry deadline.
+NO_TIMEOUT_RETRY_HEADER = "X-Startup-Mate-No-Timeout-Retry"
+
+
+class RateLimitExceeded(RuntimeError):
+    """The provider quota could not be met before the retry deadline."""
+
+    def __init__(self, service: str, retry_after: float = None):
+        super().__init__(f"{service} rate limit exceeded; retry later")
+        self.service = service
+        self.retry_after = retry_after
+
+
+class BucketStore(SQLiteStore):
+    """Token bucket levels in SQLite, updated atomically across processes."""
+
+    def __init__(self, path: str):
+        super().__init__(path, isolation_level=None)
+        self._lock = threading.Lock()
+
+    def _setup(self, conn):
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS buckets (
+                name TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+
+    def update(self, name: str, capacity: float, rate: float, change) -> float:
+        """Refills the bucket, applies `change(tokens) -> (new_tokens, result)` and returns `result`."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._conn.execute("SELECT tokens, updated_at FROM buckets WHERE name = ?", (name,)).fetchone()
+                tokens = capacity if row is None else min(capacity, row[0] + max(0.0, now - row[1]) * rate)
+                tokens, result = change(tokens)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+                    (name, tokens, now),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return result
+
+
+class TokenBucket:
+    """A per-minute quota; `per_minute <= 0` disables it."""
+
+    def __init__(self, store: BucketStore, name: str, per_minute: float):
+        self.store = store
+        self.name = name
+        self.enabled = per_minute > 0
+        self.rate = per_minute * RATE_HEADROOM / 60
+        self.capacity = max(1.0, self.rate * BURST_SECONDS)
+
+    def take(self, amount: float) -> float:
+        """Takes `amount` and returns 0, or returns the seconds until it could be taken.
+
+        Requests larger than the burst size wait for a full bucket and then
+        drive it negative, so they are still admitted at the sustained rate.
+        """
+        if not self.enabled or amount <= 0:
+            return 0.0
+        needed = min(amount, self.capacity)
+
+        def change(tokens):
+            if tokens >= needed:
+                return tokens - amount, 0.0
+            return tokens, (needed - tokens) / self.rate
+
+        return self.store.update(self.name, self.capacity, self.rate, change)
+
+    def give_back(self, amount: float):
+        """Returns unused reservation (or charges extra usage when `amount` is negative)."""
+        if self.enabled and amount:
+            self.store.update(self.name, self.capacity, self.rate, lambda tokens: (min(self.capacity, tokens + amount), None))
+
+    def pause(self, seconds: float):
+        """Empties the bucket so that every process waits about `seconds` before the next call."""
+        if self.enabled and seconds > 0:
+            self.store.update(self.name, self.capacity, self.rate, lambda tokens: (min(tokens, -seconds * self.rate), None))
+
+
+class AdaptiveConcurrency:
+    """AIMD limit on in-flight calls within this process."""
+
+    def __init__(self, max_limit: int, latency_target: float, min_limit: int = 1):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.latency_target = latency_target
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def try_acquire(self) -> bool:
+        with self._condition:
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return True
+            return False
+
+    def acquire(self, deadline: float) -> bool:
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            self.in_flight += 1
+            return True
+
+    async def aacquire(self, deadline: float) -> bool:
+        while not self.try_acquire():
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(0.02)
+        return True
+
+    def release(self, outcome: str, latency: float):
+        with self._condition:
+            self.in_flight -= 1
+            now = time.monotonic()
+            # Decrease at most once per window so one burst of 429s does not collapse the limit
+            can_decrease = now - self._last_decrease > min(1.0, self.latency_target)
+            if outcome == "throttled":
+                if can_decrease:
+                    self.limit = max(self.min_limit, self.limit * 0.5)
+                    self._last_decrease = now
+            elif outcome == "ok" and latency > self.latency_target:
+                if can_decrease:
+                    self.limit = max(self.min_limit, self.limit * 0.9)
+                    self._last_decrease = now
+            elif outcome == "ok":
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+
+def _status_of(error) -> int:
+    status = getattr(error, "status_code", None) or getattr(error, "status", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def _retry_after(headers) -> float:
+    try:
+        return float((headers or {}).get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_error(error) -> tuple:
+    """(outcome, retry_after) for an exception raised by a provider call."""
+    status = _status_of(error)
+    headers = getattr(error, "headers", None) or getattr(getattr(error, "response", None), "headers", None)
+    if status == 429:
+        return "throttled", _retry_after(headers)
+    if status is not None:
+        return ("retry", _retry_after(headers)) if status >= 500 else ("fatal", None)
+    if isinstance(error, (OSError, TimeoutError)) or type(error).__name__ in RETRYABLE_ERROR_NAMES:
+        return "retry", None
+    return "fatal", None
+
+
+def is_rate_limit_error(error) -> bool:
+    """True for RateLimitExceeded or a provider 429, also when wrapped in another exception."""
+    while error is not None:
+        if isinstance(error, RateLimitExceeded) or _status_of(error) == 429:
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def retry_after_seconds(error, default: int = 5) -> int:
+    """Whole seconds a client should wait after `error`, for a Retry-After header."""
+    retry_after = getattr(error, "retry_after", None)
+    return max(1, int(retry_after + 0.999)) if retry_after else default
+
+
+class RateLimiter:
+    def __init__(self, service: str, store: BucketStore, rpm: float, tpm: float,
+                 max_concurrency: int, latency_target: float,
+                 retry_deadline: float = RETRY_DEADLINE_SECONDS, max_retries: int = MAX_RETRIES):
+        self.service = service
+        self.requests = TokenBucket(store, f"{service}:requests", rpm)
+        self.tokens = TokenBucket(store, f"{service}:tokens", tpm)
+        self.concurrency = AdaptiveConcurrency(max_concurrency, latency_target)
+        self.retry_deadline = retry_deadline
+        self.max_retries = max_retries
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "throttled": 0, "retries": 0, "exhausted": 0, "wait_seconds": 0.0}
+
+    def _count(self, name: str, value: float = 1):
+        with self._lock:
+            self._stats[name] += value
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["concurrency_limit"] = round(self.concurrency.limit, 2)
+        stats["in_flight"] = self.concurrency.in_flight
+        return stats
+
+    def _quota_wait(self, tokens: int) -> float:
+        wait = self.requests.take(1)
+        if not wait:
+            wait = self.tokens.take(tokens)
+            if wait:
+                self.requests.give_back(1)
+        return wait
+
+    def _next_wait(self, tokens: int, deadline: float) -> float:
+        wait = self._quota_wait(tokens)
+        if wait and time.monotonic() + wait > deadline:
+            self._count("exhausted")
+            raise RateLimitExceeded(self.service, retry_after=wait)
+        if wait:
+            # A little jitter so waiting processes do not all wake at once
+            wait += random.uniform(0, min(0.25, wait))
+            self._count("wait_seconds", wait)
+        return wait
+
+    def _backoff(self, attempt: int, outcome: str, retry_after: float) -> float:
+        delay = random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt))
+        if retry_after:
+            delay = max(delay, retry_after)
+        if outcome == "throttled":
+            self.requests.pause(delay)
+        return delay
+
+    def _settle(self, attempt: int, deadline: float, outcome: str, retry_after: float, result, error):
+        """Returns the retry delay, or None when `result`/`error` is final."""
+        if outcome == "throttled":
+            self._count("throttled")
+            registry.inc("startup_mate_rate_limited_total", {"service": self.service})
+        if outcome in ("ok", "fatal"):
+            return None
+        delay = self._backoff(attempt, outcome, retry_after)
+        if attempt + 1 >= self.max_retries or time.monotonic() + delay > deadline:
+            self._count("exhausted")
+            if outcome == "throttled" and error is not None:
+                raise RateLimitExceeded(self.service, retry_after=retry_after) from error
+            return None
+        self._count("retries")
+        registry.inc("startup_mate_retries_total", {"service": self.service, "reason": outcome})
+        return delay
+
+    def call(self, send, tokens: int = 0, classify=None):
+        """Calls `send()` within the quota, retrying throttled and transient failures.
+
+        `classify(result, error) -> (outcome, retry_after)` decides what a
+        result or exception means; outcomes are ok, throttled, retry and fatal.
+        """
+        classify = classify or (lambda result, error: classify_error(error) if error else ("ok", None))
+        deadline = time.monotonic() + self.retry_deadline
+        self._count("calls")
+        attempt = 0
+        while True:
+            wait = self._next_wait(tokens, deadline)
+            while wait:
+                time.sleep(wait)
+                wait = self._next_wait(tokens, deadline)
+            if not self.concurrency.acquire(deadline):
+                self._count("exhausted")
+                raise RateLimitExceeded(self.service)
+            started = time.monotonic()
+            result = error = None
+            try:
+                result = send()
+            except Exception as e:
+                error = e
+            outcome, retry_after = classify(result, error)
+            self.concurrency.release(outcome, time.monotonic() - started)
+            delay = self._settle(attempt, deadline, outcome, retry_after, result, error)
+            if delay is None:
+                if error is not None:
+                    raise error
+                return result
+            # The retried response is discarded; free its connection
+            close = getattr(result, "close", None)
+            if close:
+                close()
+            time.sleep(delay)
+            attempt += 1
+
+    async def acall(self, asend, tokens: int = 0, classify=None):
+        """Async variant of `call`; `asend` is a coroutine function.
+
+        Bucket updates (blocking SQLite transactions) run in a worker thread,
+        off the event loop.
+        """
+        classify = classify or (lambda result, error: classify_error(error) if error else ("ok", None))
+        deadline = time.monotonic() + self.retry_deadline
+        self._count("calls")
+        attempt = 0
+        while True:
+            wait = await asyncio.to_thread(self._next_wait, tokens, deadline)
+            while wait:
+                await asyncio.sleep(wait)
+                wait = await asyncio.to_thread(self._next_wait, tokens, deadline)
+            if not await self.concurrency.aacquire(deadline):
+                self._count("exhausted")
+                raise RateLimitExceeded(self.service)
+            started = time.monotonic()
+            result = error = None
+            try:
+                result = await asend()
+            except Exception as e:
+                error = e
+            outcome, retry_after = classify(result, error)
+            self.concurrency.release(outcome, time.monotonic() - started)
+            delay = await asyncio.to_thread(self._settle, attempt, deadline, outcome, retry_after, result, error)
+            if delay is None:
+                if error is not None:
+                    raise error
+                return result
+            # httpx async responses only support aclose()
+            aclose = getattr(result, "aclose", None)
+            if aclose:
+                await aclose()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+# === HTTP transport for the shared LLM client ===
+def estimate_request_tokens(content: bytes) -> int:
+    """Rough prompt size (4 characters per token) plus the expected completion."""
+    try:
+        body = json.loads(content or b"{}")
+    except ValueError:
+        return 0
+    if not isinstance(body, dict) or "messages" not in body:
+        return 0
+    prompt_chars = sum(len(str(message.get("content") or "")) for message in body["messages"])
+    return prompt_chars // 4 + int(body.get("max_tokens") or COMPLETION_TOKEN_ESTIMATE)
+
+
+def is_timeout_error(error) -> bool:
+    return isinstance(error, TimeoutError) or type(error).__name__ in TIMEOUT_ERROR_NAMES
+
+
+def _classify_response(response, error, retry_timeouts: bool = True) -> tuple:
+    if error is not None:
+        if not retry_timeouts and is_timeout_error(error):
+            return "fatal", None
+        return classify_error(error)
+    if response.status_code == 429:
+        return "throttled", _retry_after(response.headers)
+    if response.status_code >= 500:
+        return "retry", _retry_after(response.headers)
+    return "ok", None
+
+
+def _used_tokens(response) -> int:
+    """Total tokens reported by a non-streaming JSON completion, else None."""
+    if response.status_code != 200 or "application/json" not in response.headers.get("content-type", ""):
+        return None
+    try:
+        return int(response.json()["usage"]["total_tokens"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def rate_limited_transports(limiter: RateLimiter, limits):
+    """(sync, async) httpx transports that send every request through `limiter`.
+
+    Throttled and 5xx responses are retried inside the transport; once the
+    retries run out the last response is returned for the client to raise.
+    Timeouts are retried too, unless the request carries NO_TIMEOUT_RETRY_HEADER.
+    """
+
+    def classifier(request):
+        retry_timeouts = request.headers.pop(NO_TIMEOUT_RETRY_HEADER, None) is None
+        return lambda response, error: _classify_response(response, error, retry_timeouts)
+
+    import httpx
+
+    class RateLimitedTransport(httpx.BaseTransport):
+        def __init__(self):
+            self._inner = httpx.HTTPTransport(limits=limits)
+
+        def handle_request(self, request):
+            estimate = estimate_request_tokens(request.read())
+            response = limiter.call(lambda: self._inner.handle_request(request), estimate, classifier(request))
+            if estimate and response.status_code == 200 and "application/json" in response.headers.get("content-type", ""):
+                response.read()
+                used = _used_tokens(response)
+                if used is not None:
+                    limiter.tokens.give_back(estimate - used)
+            return response
+
+        def close(self):
+            self._inner.close()
+
+    class AsyncRateLimitedTransport(httpx.AsyncBaseTransport):
+        def __init__(self):
+            self._inner = httpx.AsyncHTTPTransport(limits=limits)
+
+        async def handle_async_request(self, request):
+            estimate = estimate_request_tokens(await request.aread())
+            response = await limiter.acall(lambda: self._inner.handle_async_request(request), estimate, classifier(request))
+            if estimate and response.status_code == 200 and "application/json" in response.headers.get("content-type", ""):
+                await response.aread()
+                used = _used_tokens(response)
+                if used is not None:
+                    await asyncio.to_thread(limiter.tokens.give_back, estimate - used)
+            return response
+
+        async def aclose(self):
+            await self._inner.aclose()
+
+    return RateLimitedTransport(), AsyncRateLimitedTransport()
+
+
+_store = BucketStore(RATELIMIT_PATH)
+
+llm_limiter = RateLimiter(
+    "llm", _store,
+    rpm=float(os.environ.get("STARTUP_MATE_LLM_RPM", "300")),
+    tpm=float(os.environ.get("STARTUP_MATE_LLM_TPM", "0")),
+    max_concurrency=int(os.environ.get("STARTUP_MATE_LLM_MAX_CONCURRENCY", "32")),
+    latency_target=float(os.environ.get("STARTUP_MATE_LLM_LATENCY_TARGET", "30")),
+)
+
+search_limiter = RateLimiter(
+    "search", _store,
+    rpm=float(os.environ.get("STARTUP_MATE_SEARCH_RPM", "300")),
+    tpm=0,
+    max_concurrency=int(os.environ.get("STARTUP_MATE_SEARCH_MAX_CONCURRENCY", "16")),
+    latency_target=float(os.environ.get("STARTUP_MATE_SEARCH_LATENCY_TARGET", "5")),
+)
+
+registry.register_collector(lambda: [
+    ("startup_mate_concurrency_limit", {"service": limiter.service}, limiter.stats()["concurrency_limit"])
+    for limiter in (llm_limiter, search_limiter)
+] + [
+    ("startup_mate_rate_limit_wait_seconds_total", {"service": limiter.service}, round(limiter.stats()["wait_seconds"], 3))
+    for limiter in (llm_limiter, search_limiter)
+])
@@ -0,0 +1,140 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+
+# Structured view of the Markdown research report. The report is scanned once,
+# cached by content hash, and downstream stages (slides, prompts) read only the
+# sections they need instead of rescanning or resending the whole text.
+PARSED_REPORT_CACHE_SIZE = 128
+
+_BULLET = re.compile(r"^\s*(?:[-*•+]|\d+[.)])\s+(.*)$")
+
+
+@dataclass
+class ParsedReport:
+    summary: list = field(default_factory=list)
+    competitors: list = field(default_factory=list)
+    market_need: list = field(default_factory=list)
+    gaps: list = field(default_factory=list)
+    report_hash: str = ""
+
+    def is_empty(self) -> bool:
+        return not (self.competitors or self.market_need or self.gaps)
+
+    def competitor_lines(self) -> list:
+        lines = []
+        for row in self.competitors:
+            line = row.get("name", "")
+            if row.get("description"):
+                line += f" – {row['description']}"
+            if row.get("website"):
+                line += f" ({row['website']})"
+            lines.append(line)
+        return lines
+
+    def context(self, sections: tuple) -> str:
+        """Compact Markdown holding only the requested sections."""
+        titles = {
+            "summary": "Summary",
+            "competitors": "Competitors",
+            "market_need": "Market Need",
+            "gaps": "Unique Angle / Gap",
+        }
+        parts = []
+        for section in sections:
+            items = self.competitor_lines() if section == "competitors" else getattr(self, section)
+            if items:
+                parts.append(f"### {titles[section]}\n" + "\n".join(f"- {item}" for item in items))
+        return "\n\n".join(parts)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _section_for(heading: str):
+    heading = heading.lower()
+    if "competitor" in heading:
+        return "competitors"
+    if "gap" in heading or "unique angle" in heading:
+        return "gaps"
+    if "need" in heading or "market" in heading or "trend" in heading:
+        return "market_need"
+    if "summary" in heading or "overview" in heading:
+        return "summary"
+    return None
+
+
+def _cells(line: str) -> list:
+    return [cell.strip() for cell in line.strip().strip("|").split("|")]
+
+
+def _parse(report_text: str, report_hash: str) -> ParsedReport:
+    parsed = ParsedReport(report_hash=report_hash)
+    section = "summary"
+    seen_section = False
+    header = None
+    for line in report_text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if stripped.startswith("#"):
+            known = _section_for(stripped.lstrip("#"))
+            if known:
+                section, seen_section = known, True
+            elif seen_section:
+                # An unknown section ("Conclusion", "Sources") is skipped, not merged into the previous one;
+                # before the first known heading a title line keeps the summary going
+                section = None
+            header = None
+            continue
+        if stripped.startswith("|"):
+            cells = _cells(stripped)
+            if all(set(cell) <= set("-: ") for cell in cells):
+                continue  # |------|------| separator
+            if header is None:
+                header = [cell.lower() for cell in cells]
+                continue
+            if section == "competitors" or section == "summary":
+                row = dict(zip(header, cells))
+                parsed.competitors.append({
+                    "name": row.get("name", cells[0]),
+                    "description": row.get("description", cells[1] if len(cells) > 1 else ""),
+                    "website": row.get("website", cells[2] if len(cells) > 2 else ""),
+                })
+            continue
+        bullet = _BULLET.match(stripped)
+        text = (bullet.group(1) if bullet else stripped).strip()
+        if section == "summary":
+            parsed.summary.append(text)
+        elif section in ("market_need", "gaps") and text:
+            getattr(parsed, section).append(text)
+    return parsed
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def parse_report(report_text: str) -> ParsedReport:
+    """Parses the report once per distinct content; repeated calls hit an in-process cache."""
+    report_hash = hashlib.sha256(report_text.encode("utf-8")).hexdigest()
+    with _cache_lock:
+        if report_hash in _cache:
+            _cache.move_to_end(report_hash)
+            return _cache[report_hash]
+    parsed = _parse(report_text, report_hash)
+    with _cache_lock:
+        _cache[report_hash] = parsed
+        while len(_cache) > PARSED_REPORT_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return parsed
+
+
+def report_context(report_text: str, sections: tuple) -> str:
+    """The requested sections of a report, or the raw report when it does not follow the usual layout."""
+    parsed = parse_report(report_text)
+    if parsed.is_empty():
+        return report_text
+    return parsed.context(sections)
@@ -0,0 +1,321 @@
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import re
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+from Components.cache import ResponseCache, make_key
+from Components.compaction import SEARCH_COMPACTION, SEARCH_TOKEN_BUDGET, compact_results
+from Components.metrics import registry
+from Components.ratelimit import search_limiter
+from Components.settings import cache_path, load_secrets
+from Components.singleflight import single_flight
+
+logger = logging.getLogger(__name__)
+
+# Shared Google (Serper) search layer used by the research and funding agents.
+#   live   - query Serper, cache results on disk (default)
+#   record - like live, and also append every fetched result to the recordings file
+#   replay - serve only recorded results, never touch the network
+# Results come in two kinds: "text" (the wrapper's plain snippet string) and
+# "results" (Serper's structured JSON, which compact() turns into a ranked,
+# deduplicated list within a token budget; see Components/compaction.py).
+SEARCH_MODE = os.environ.get("STARTUP_MATE_SEARCH_MODE", "live")
+SEARCH_CACHE_PATH = os.environ.get("STARTUP_MATE_SEARCH_CACHE_PATH") or cache_path("search.sqlite3")
+SEARCH_CACHE_MAX_ENTRIES = int(os.environ.get("STARTUP_MATE_SEARCH_CACHE_MAX_ENTRIES", "2000"))
+SEARCH_TTL_SECONDS = float(os.environ.get("STARTUP_MATE_SEARCH_TTL", str(24 * 3600)))
+SEARCH_RECORDINGS_PATH = os.environ.get("STARTUP_MATE_SEARCH_RECORDINGS") or cache_path("search_recordings.jsonl")
+
+# Point at another Serper-compatible server (e.g. benchmarks/mock_server.py)
+SERPER_BASE_URL = os.environ.get("SERPER_BASE_URL")
+
+_current_session = contextvars.ContextVar("search_session", default=None)
+
+
+def _serper_wrapper(base_url: str = None):
+    from langchain_community.utilities import GoogleSerperAPIWrapper
+    if not base_url:
+        return GoogleSerperAPIWrapper()
+
+    import aiohttp
+    import requests
+
+    class LocalSerperAPIWrapper(GoogleSerperAPIWrapper):
+        """GoogleSerperAPIWrapper that sends its requests to `base_url` instead of google.serper.dev."""
+
+        def _request(self, search_term: str, kwargs: dict):
+            headers = {"X-API-KEY": self.serper_api_key or "", "Content-Type": "application/json"}
+            params = {"q": search_term, **{key: value for key, value in kwargs.items() if value is not None}}
+            return headers, params
+
+        def _google_serper_api_results(self, search_term: str, search_type: str = "search", **kwargs) -> dict:
+            headers, params = self._request(search_term, kwargs)
+            response = requests.post(f"{base_url}/{search_type}", headers=headers, params=params)
+            response.raise_for_status()
+            return response.json()
+
+        async def _async_google_serper_search_results(self, search_term: str, search_type: str = "search", **kwargs) -> dict:
+            headers, params = self._request(search_term, kwargs)
+            async with aiohttp.ClientSession() as session:
+                async with session.post(f"{base_url}/{search_type}", headers=headers, params=params) as response:
+                    response.raise_for_status()
+                    return await response.json()
+
+    return LocalSerperAPIWrapper()
+
+
+def normalize_query(query: str) -> str:
+    """Lowercases, strips quotes/trailing punctuation and collapses whitespace."""
+    query = query.strip().strip("\"'").lower()
+    query = re.sub(r"\s+", " ", query)
+    return query.rstrip(" .?!")
+
+
+class SearchService:
+    def __init__(self, mode: str, cache: ResponseCache, recordings_path: str):
+        self.mode = mode
+        self.cache = cache
+        self.recordings_path = recordings_path
+        self._wrapper = None
+        self._lock = threading.Lock()
+        self._recordings = None
+        self._stats = {"hits": 0, "misses": 0, "deduplicated": 0, "replayed": 0, "replay_misses": 0}
+        self._compaction = {
+            "calls": 0, "tokens_raw": 0, "tokens_sent": 0, "tokens_saved": 0,
+            "results_kept": 0, "results_duplicates": 0, "results_skipped_domains": 0, "results_over_budget": 0,
+        }
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+    def _serper(self):
+        if self._wrapper is None:
+            load_secrets()
+            self._wrapper = _serper_wrapper(SERPER_BASE_URL)
+        return self._wrapper
+
+    def _load_recordings(self) -> dict:
+        if self._recordings is None:
+            recordings = {}
+            if os.path.exists(self.recordings_path):
+                with open(self.recordings_path, encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            entry = json.loads(line)
+                            recordings[(entry.get("kind", "text"), entry["query"])] = entry["result"]
+            self._recordings = recordings
+        return self._recordings
+
+    def _record(self, query: str, kind: str, result: str):
+        with self._lock:
+            directory = os.path.dirname(self.recordings_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.recordings_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"query": query, "kind": kind, "result": result}) + "\n")
+
+    @staticmethod
+    def _key(query: str, kind: str) -> str:
+        # Plain-text results keep their original key, so existing caches stay valid
+        return make_key("search", {"query": query} if kind == "text" else {"query": query, "kind": kind})
+
+    def _lookup(self, query: str, kind: str):
+        """Returns a recorded or cached result, or None when a live search is needed.
+
+        A replay miss is "" for structured results, so compact() can fall back to
+        a plain-text recording.
+        """
+        if self.mode == "replay":
+            result = self._load_recordings().get((kind, query))
+            if result is None:
+                self._count("replay_misses")
+                return "No recorded search results for this query." if kind == "text" else ""
+            self._count("replayed")
+            return result
+        cached = self.cache.get(self._key(query, kind))
+        if cached is not None:
+            self._count("hits")
+            return cached
+        self._count("misses")
+        return None
+
+    def _store(self, query: str, kind: str, result: str):
+        self.cache.set(self._key(query, kind), result)
+        if self.mode == "record":
+            self._record(query, kind, result)
+
+    def _fetch(self, query: str, kind: str = "text") -> str:
+        result = self._lookup(query, kind)
+        if result is None:
+            # Identical searches from concurrent requests share one Serper call
+            key = self._key(query, kind)
+
+            def fetch_and_store():
+                if kind == "text":
+                    fetched = search_limiter.call(lambda: self._serper().run(query))
+                else:
+                    fetched = json.dumps(search_limiter.call(lambda: self._serper().results(query)))
+                self._store(query, kind, fetched)
+                return fetched
+
+            result = single_flight.do(key, fetch_and_store, lambda: self.cache.get(key))
+        return result
+
+    async def _afetch(self, query: str, kind: str = "text") -> str:
+        # The search cache is SQLite: read and write it off the event loop
+        result = await asyncio.to_thread(self._lookup, query, kind)
+        if result is None:
+            key = self._key(query, kind)
+
+            async def afetch_and_store():
+                if kind == "text":
+                    fetched = await search_limiter.acall(lambda: self._serper().arun(query))
+                else:
+                    fetched = json.dumps(await search_limiter.acall(lambda: self._serper().aresults(query)))
+                await asyncio.to_thread(self._store, query, kind, fetched)
+                return fetched
+
+            result = await single_flight.ado(key, afetch_and_store, lambda: self.cache.get(key))
+        return result
+
+    def _session_fetch(self, query: str, kind: str) -> str:
+        session = _current_session.get()
+        if session is None:
+            return self._fetch(query, kind)
+
+        with session["lock"]:
+            future = session["queries"].get((kind, query))
+            owner = future is None
+            if owner:
+                future = session["queries"][(kind, query)] = Future()
+        if not owner:
+            self._count("deduplicated")
+            return future.result()
+        try:
+            future.set_result(self._fetch(query, kind))
+        except Exception as e:
+            future.set_exception(e)
+            with session["lock"]:
+                session["queries"].pop((kind, query), None)
+        return future.result()
+
+    async def _asession_fetch(self, query: str, kind: str) -> str:
+        session = _current_session.get()
+        if session is None:
+            return await self._afetch(query, kind)
+        task = session["tasks"].get((kind, query))
+        if task is None:
+            task = session["tasks"][(kind, query)] = asyncio.ensure_future(self._afetch(query, kind))
+        else:
+            self._count("deduplicated")
+        return await task
+
+    def run(self, query: str) -> str:
+        """Runs a Google search, deduplicated within the active session and cached on disk."""
+        return self._session_fetch(normalize_query(query), "text")
+
+    async def arun(self, query: str) -> str:
+        """Async variant of `run`; identical queries in a session await one task."""
+        return await self._asession_fetch(normalize_query(query), "text")
+
+    def _compacted(self, query: str, payload: str, context: str, token_budget: int) -> str:
+        text, stats = compact_results(
+            json.loads(payload),
+            " ".join(part for part in (context, _session_context(), query) if part),
+            token_budget or SEARCH_TOKEN_BUDGET,
+        )
+        with self._lock:
+            self._compaction["calls"] += 1
+            self._compaction["tokens_raw"] += stats["raw_tokens"]
+            self._compaction["tokens_sent"] += stats["tokens"]
+            self._compaction["tokens_saved"] += stats["saved_tokens"]
+            for result in ("kept", "duplicates", "skipped_domains", "over_budget"):
+                self._compaction["results_" + result] += stats[result]
+        logger.debug("Compacted search %r: %d -> %d tokens (%d saved)", query,
+                     stats["raw_tokens"], stats["tokens"], stats["saved_tokens"])
+        return text
+
+    def compact(self, query: str, context: str = "", token_budget: int = None) -> str:
+        """Like `run`, but returns the structured results deduplicated, ranked by relevance to
+        `context` (plus the session's context) and cut to `token_budget` tokens.
+
+        Returns the plain `run` text when compaction is off
+        (STARTUP_MATE_SEARCH_COMPACTION=0) or a replay has no structured recording.
+        """
+        if not SEARCH_COMPACTION:
+            return self.run(query)
+        query = normalize_query(query)
+        payload = self._session_fetch(query, "results")
+        if not payload:
+            return self._session_fetch(query, "text")
+        return self._compacted(query, payload, context, token_budget)
+
+    async def acompact(self, query: str, context: str = "", token_budget: int = None) -> str:
+        """Async variant of `compact`."""
+        if not SEARCH_COMPACTION:
+            return await self.arun(query)
+        query = normalize_query(query)
+        payload = await self._asession_fetch(query, "results")
+        if not payload:
+            return await self._asession_fetch(query, "text")
+        return self._compacted(query, payload, context, token_budget)
+
+    def compaction_stats(self) -> dict:
+        with self._lock:
+            return dict(self._compaction)
+
+    @contextmanager
+    def session(self, context: str = ""):
+        """Deduplicates identical queries issued while the block runs (e.g. one agent run).
+
+        `context` (e.g. the idea) is used to rank results in `compact` calls made
+        inside the block, such as the agent's tool calls.
+        """
+        if _current_session.get() is not None:
+            yield
+            return
+        token = _current_session.set({"lock": threading.Lock(), "queries": {}, "tasks": {}, "context": context})
+        try:
+            yield
+        finally:
+            _current_session.reset(token)
+
+
+def _session_context() -> str:
+    session = _current_session.get()
+    return session["context"] if session else ""
+
+
+search_service = SearchService(
+    SEARCH_MODE,
+    ResponseCache(SEARCH_CACHE_PATH, SEARCH_CACHE_MAX_ENTRIES, SEARCH_TTL_SECONDS),
+    SEARCH_RECORDINGS_PATH,
+)
+
+registry.register_collector(lambda: [
+    ("startup_mate_search_requests_total", {"result": result}, count)
+    for result, count in search_service.stats().items()
+])
+
+
+def _compaction_counters():
+    stats = search_service.compaction_stats()
+    yield "startup_mate_search_compactions_total", {}, stats.pop("calls")
+    for name, value in stats.items():
+        group, _, label = name.partition("_")
+        if group == "tokens":
+            yield "startup_mate_search_prompt_tokens_total", {"kind": label}, value
+        else:
+            yield "startup_mate_search_results_total", {"result": label}, value
+
+
+registry.register_collector(_compaction_counters)
@@ -0,0 +1,217 @@
+import hashlib
+import os
+import re
+import threading
+import time
+
+from Components.metrics import registry
+from Components.settings import cache_path
+from Components.store import SQLiteStore
+
+# Near-duplicate cache for expensive per-idea results (research reports,
+# investor lists). Ideas are embedded locally as signed hashed features
+# (words, word bigrams, character trigrams) in a fixed-size NumPy vector, so
+# "AI tutor for kids" and "AI tutoring for children" land close together
+# without any network call. A lookup is one matrix-vector product over the
+# stored vectors of a namespace. A match at or above the threshold serves
+# the stored value.
+# Entries live in SQLite, shared by every process; each namespace keeps at most
+# STARTUP_MATE_SEMANTIC_MAX_ENTRIES (least recently used are evicted).
+SEMANTIC_CACHE_ENABLED = os.environ.get("STARTUP_MATE_SEMANTIC_CACHE", "1") == "1"
+SEMANTIC_CACHE_PATH = os.environ.get("STARTUP_MATE_SEMANTIC_CACHE_PATH") or cache_path("semantic.sqlite3")
+SEMANTIC_THRESHOLD = float(os.environ.get("STARTUP_MATE_SEMANTIC_THRESHOLD", "0.85"))
+SEMANTIC_MAX_ENTRIES = int(os.environ.get("STARTUP_MATE_SEMANTIC_MAX_ENTRIES", "2000"))
+SEMANTIC_TTL_SECONDS = float(os.environ.get("STARTUP_MATE_SEMANTIC_TTL", str(7 * 24 * 3600)))
+DIMENSIONS = 1024
+
+STOP_WORDS = {
+    "a", "an", "the", "for", "of", "to", "and", "or", "in", "on", "with", "that", "which", "who",
+    "by", "at", "from", "my", "our", "your", "their", "is", "are", "be", "can", "will",
+    "app", "application", "platform", "startup", "service", "tool", "based", "using", "powered",
+}
+
+# Words founders use interchangeably, mapped to one canonical form
+SYNONYMS = {
+    "kid": "child", "children": "child", "toddler": "child",
+    "pupil": "student", "learner": "student",
+    "tutoring": "tutor", "teacher": "tutor", "teaching": "tutor",
+    "physician": "doctor", "clinician": "doctor",
+    "medical": "health", "healthcare": "health",
+    "vehicle": "car", "auto": "car", "automobile": "car",
+    "affordable": "cheap", "inexpensive": "cheap",
+    "senior": "elderly", "aged": "elderly",
+    "online": "digital", "web": "digital", "internet": "digital",
+    "artificial": "ai", "intelligence": "ai", "ml": "ai",
+    "marketplace": "market", "ecommerce": "shop", "store": "shop",
+    "smallholder": "farmer", "farming": "farm", "agriculture": "farm",
+    "money": "finance", "financial": "finance", "fintech": "finance",
+}
+
+SUFFIXES = ("ing", "ers", "er", "es", "s")
+
+
+def _stem(word: str) -> str:
+    for suffix in SUFFIXES:
+        if len(word) - len(suffix) >= 3 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def _words(text: str) -> list:
+    words = []
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        if word in STOP_WORDS:
+            continue
+        word = SYNONYMS.get(word, word)
+        word = SYNONYMS.get(_stem(word), _stem(word))
+        words.append(word)
+    return words
+
+
+def _features(text: str):
+    words = _words(text)
+    for word in words:
+        yield "w:" + word, 1.0
+        padded = f"<{word}>"
+        for i in range(len(padded) - 2):
+            yield "c:" + padded[i:i + 3], 0.3
+    for first, second in zip(words, words[1:]):
+        yield f"b:{first} {second}", 0.7
+
+
+def embed(text: str):
+    """Unit-length float32 vector for `text`; all zeros when it has no content words."""
+    import numpy as np
+    vector = np.zeros(DIMENSIONS, dtype=np.float32)
+    for feature, weight in _features(text):
+        digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        vector[digest % DIMENSIONS] += weight if digest >> 63 else -weight
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class SemanticCache(SQLiteStore):
+    """Namespaced near-duplicate lookup over short texts, with LRU eviction and a TTL."""
+
+    def __init__(self, path: str, max_entries: int, threshold: float, ttl_seconds: float):
+        super().__init__(path)
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._indexes = {}  # namespace -> (version, texts, matrix)
+        self._stats = {"hits": 0, "misses": 0, "stored": 0}
+
+    def _setup(self, conn):
+        with conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS semantic_entries (
+                    namespace TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, text)
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS semantic_entries_accessed_at ON semantic_entries (namespace, accessed_at)"
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+    def _index(self, namespace: str):
+        """The namespace's (texts, matrix), reloaded when another writer changed it."""
+        import numpy as np
+        version = self._conn.execute(
+            "SELECT count(*), max(created_at) FROM semantic_entries WHERE namespace = ? AND created_at >= ?",
+            (namespace, time.time() - self.ttl_seconds),
+        ).fetchone()
+        cached = self._indexes.get(namespace)
+        if cached and cached[0] == version:
+            return cached[1], cached[2]
+        rows = self._conn.execute(
+            "SELECT text, vector FROM semantic_entries WHERE namespace = ? AND created_at >= ?",
+            (namespace, time.time() - self.ttl_seconds),
+        ).fetchall()
+        texts = [text for text, _ in rows]
+        matrix = (np.frombuffer(b"".join(vector for _, vector in rows), dtype=np.float32).reshape(len(rows), DIMENSIONS)
+                  if rows else np.zeros((0, DIMENSIONS), dtype=np.float32))
+        self._indexes[namespace] = (version, texts, matrix)
+        return texts, matrix
+
+    def lookup(self, namespace: str, text: str, threshold: float = None):
+        """(value, matched_text, score) for the most similar stored text, or None below the threshold."""
+        threshold = self.threshold if threshold is None else threshold
+        vector = embed(text)
+        with self._lock:
+            texts, matrix = self._index(namespace)
+            if not texts or not vector.any():
+                self._stats["misses"] += 1
+                return None
+            scores = matrix @ vector
+            best = int(scores.argmax())
+            score = float(scores[best])
+            if score < threshold:
+                self._stats["misses"] += 1
+                return None
+            with self._conn:
+                row = self._conn.execute(
+                    "SELECT value FROM semantic_entries WHERE namespace = ? AND text = ?", (namespace, texts[best])
+                ).fetchone()
+                if row is None:
+                    self._stats["misses"] += 1
+                    return None
+                self._conn.execute(
+                    "UPDATE semantic_entries SET accessed_at = ? WHERE namespace = ? AND text = ?",
+                    (time.time(), namespace, texts[best]),
+                )
+            self._stats["hits"] += 1
+        return row[0], texts[best], round(score, 4)
+
+    def add(self, namespace: str, text: str, value: str):
+        vector = embed(text)
+        if not vector.any() or not value:
+            return
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO semantic_entries (namespace, text, vector, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (namespace, text, vector.tobytes(), value, now, now),
+            )
+            self._conn.execute(
+                "DELETE FROM semantic_entries WHERE namespace = ? AND created_at < ?",
+                (namespace, now - self.ttl_seconds),
+            )
+            # Evict least recently used entries beyond the size bound
+            self._conn.execute("""
+                DELETE FROM semantic_entries WHERE namespace = ? AND text IN (
+                    SELECT text FROM semantic_entries WHERE namespace = ?
+                    ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+            """, (namespace, namespace, self.max_entries))
+            self._stats["stored"] += 1
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM semantic_entries")
+            self._indexes.clear()
+
+
+semantic_cache = SemanticCache(SEMANTIC_CACHE_PATH, SEMANTIC_MAX_ENTRIES, SEMANTIC_THRESHOLD, SEMANTIC_TTL_SECONDS)
+
+
+def use_semantic_cache(allow_similar: bool, bypass_cache: bool) -> bool:
+    """Near-duplicate reuse is on unless disabled globally, per request, or by `bypass_cache`."""
+    return SEMANTIC_CACHE_ENABLED and allow_similar and not bypass_cache
+
+
+registry.register_collector(lambda: [
+    ("startup_mate_semantic_cache_total", {"result": result}, count)
+    for result, count in semantic_cache.stats().items()
+])
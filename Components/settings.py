@@ -0,0 +1,42 @@
+import os
+import sys
+from functools import lru_cache
+
+SECRET_NAMES = ("SERPER_API_KEY", "GROQ_API_KEY", "NOVITA_API_KEY")
+SECRETS_FILE = os.path.join(".streamlit", "secrets.toml")
+# Root of every local store (response, search and semantic caches, investor
+# directory, rate-limit buckets, single-flight leases, jobs). Each store's own
+# STARTUP_MATE_*_PATH still overrides its file.
+CACHE_DIR = os.environ.get("STARTUP_MATE_CACHE_DIR", ".cache")
+
+
+def cache_path(name: str) -> str:
+    return os.path.join(CACHE_DIR, name)
+
+
+@lru_cache(maxsize=1)
+def load_secrets():
+    """Fills missing API keys into os.environ, once per process.
+
+    Order: environment / .env, then .streamlit/secrets.toml, then st.secrets
+    when already running under Streamlit. Streamlit is never imported here,
+    so the Flask app does not pay for it.
+    """
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    missing = [name for name in SECRET_NAMES if not os.environ.get(name)]
+    if missing and os.path.exists(SECRETS_FILE):
+        import tomllib
+        with open(SECRETS_FILE, "rb") as f:
+            secrets = tomllib.load(f)
+        for name in missing:
+            if secrets.get(name):
+                os.environ[name] = secrets[name]
+
+    missing = [name for name in SECRET_NAMES if not os.environ.get(name)]
+    if missing and "streamlit" in sys.modules:
+        st = sys.modules["streamlit"]
+        for name in missing:
+            if name in st.secrets:
+                os.environ[name] = st.secrets[name]
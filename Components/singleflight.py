@@ -0,0 +1,286 @@
+import asyncio
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, InvalidStateError
+
+from Components.metrics import registry
+from Components.settings import cache_path
+from Components.store import SQLiteStore
+
+# Request coalescing ("single flight"): concurrent calls with the same key
+# share one execution instead of each calling the LLM or Serper. Keys are the
+# response-cache keys, i.e. the normalized stage inputs, so two tabs that
+# submit the same idea wait on one agent run.
+#
+# In-process, followers (threads or coroutines) wait on the leader's future.
+# With STARTUP_MATE_SINGLEFLIGHT_SHARED=1, leaders also take a lease in SQLite.
+# Followers in other worker processes then poll the response cache for the
+# leader's result. If the lease expires or is released without a result, a
+# follower takes over.
+SINGLEFLIGHT_SHARED = os.environ.get("STARTUP_MATE_SINGLEFLIGHT_SHARED", "0") == "1"
+SINGLEFLIGHT_PATH = os.environ.get("STARTUP_MATE_SINGLEFLIGHT_PATH") or cache_path("singleflight.sqlite3")
+# Longest a lease is honoured; covers the slowest agent run
+LEASE_SECONDS = float(os.environ.get("STARTUP_MATE_SINGLEFLIGHT_LEASE", "300"))
+POLL_SECONDS = 0.25
+
+
+class LeaseStore(SQLiteStore):
+    """Cross-process ownership of in-flight keys, with expiry for crashed owners."""
+
+    def __init__(self, path: str):
+        super().__init__(path, isolation_level=None)
+        self._lock = threading.Lock()
+
+    def _setup(self, conn):
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS leases (
+                key TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+
+    def acquire(self, key: str, owner: str, seconds: float) -> bool:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM leases WHERE key = ? AND expires_at < ?", (key, now))
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO leases (key, owner, expires_at) VALUES (?, ?, ?)",
+                    (key, owner, now + seconds),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return cursor.rowcount == 1
+
+    def held(self, key: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM leases WHERE key = ? AND expires_at >= ?", (key, time.time())
+            ).fetchone()
+        return row is not None
+
+    def release(self, key: str, owner: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner))
+
+
+class _Abandoned(Exception):
+    """The leader stopped before producing a result (e.g. a closed stream)."""
+
+
+# Another process still holds the lease and has not stored a result yet
+_PENDING = object()
+
+
+class SingleFlight:
+    def __init__(self, leases: LeaseStore = None):
+        self.leases = leases
+        self._owner = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._stats = {"leaders": 0, "coalesced": 0, "remote": 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        # Every call is a leader or coalesced; remote ones are leaders that waited on another process
+        calls = stats["leaders"] + stats["coalesced"]
+        stats["coalescing_rate"] = round((stats["coalesced"] + stats["remote"]) / calls, 4) if calls else 0.0
+        return stats
+
+    def _join(self, key: str):
+        """(future, is_leader) for `key`."""
+        with self._lock:
+            future = self._flights.get(key)
+            if future is not None:
+                self._stats["coalesced"] += 1
+                return future, False
+            future = self._flights[key] = Future()
+            self._stats["leaders"] += 1
+            return future, True
+
+    def _finish(self, key: str, future: Future, value=None, error: BaseException = None):
+        with self._lock:
+            if self._flights.get(key) is future:
+                del self._flights[key]
+        if future.done():
+            return
+        try:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(value)
+        except InvalidStateError:
+            # Settled concurrently (e.g. cancelled); the remaining waiters already woke up
+            pass
+
+    def _lease(self, key: str, lookup) -> bool:
+        """Takes the cross-process lease; False when another process holds it."""
+        if self.leases is None or lookup is None:
+            return True
+        return self.leases.acquire(key, self._owner, LEASE_SECONDS)
+
+    def _release(self, key: str, lookup):
+        if self.leases is not None and lookup is not None:
+            self.leases.release(key, self._owner)
+
+    def _remote_result(self, key: str, lookup):
+        """The other process's result, _PENDING while it runs, or None once we may take over."""
+        # Check the lease before the result: a leader stores its result before releasing
+        held = self.leases.held(key)
+        value = lookup()
+        if value is not None:
+            self._count("remote")
+            return value
+        return _PENDING if held else None
+
+    def _stored(self, key: str, lookup):
+        """A result another process stored just before we took the lease, else None."""
+        if self.leases is None or lookup is None:
+            return None
+        value = lookup()
+        if value is not None:
+            self._release(key, lookup)
+            self._count("remote")
+        return value
+
+    def _lead(self, key: str, future: Future, compute, lookup):
+        while not self._lease(key, lookup):
+            value = self._remote_result(key, lookup)
+            if value is _PENDING:
+                time.sleep(POLL_SECONDS)
+                continue
+            if value is not None:
+                self._finish(key, future, value)
+                return value
+        value = self._stored(key, lookup)
+        if value is not None:
+            self._finish(key, future, value)
+            return value
+        try:
+            value = compute()
+        except BaseException as e:
+            # Cancellation or interpreter exit: let a follower run it instead
+            self._finish(key, future, error=e if isinstance(e, Exception) else _Abandoned())
+            raise
+        finally:
+            self._release(key, lookup)
+        self._finish(key, future, value)
+        return value
+
+    def do(self, key: str, compute, lookup=None):
+        """Runs `compute()` once for concurrent callers with the same `key`.
+
+        `lookup()` reads the stored result; passing it enables cross-process
+        coalescing when shared mode is on.
+        """
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                return self._lead(key, future, compute, lookup)
+            try:
+                return future.result()
+            except _Abandoned:
+                continue
+
+    async def _off_loop(self, lookup, method, *args):
+        # Lease and lookup calls hit SQLite only in shared mode; run those on a worker thread
+        if self.leases is None or lookup is None:
+            return method(*args)
+        return await asyncio.to_thread(method, *args)
+
+    async def ado(self, key: str, acompute, lookup=None):
+        """Async variant of `do`; followers may be threads or coroutines."""
+        while True:
+            future, leader = self._join(key)
+            if not leader:
+                try:
+                    # Shielded: a cancelled follower must not cancel the flight the others wait on
+                    return await asyncio.shield(asyncio.wrap_future(future))
+                except _Abandoned:
+                    continue
+            while not await self._off_loop(lookup, self._lease, key, lookup):
+                value = await self._off_loop(lookup, self._remote_result, key, lookup)
+                if value is _PENDING:
+                    await asyncio.sleep(POLL_SECONDS)
+                    continue
+                if value is not None:
+                    self._finish(key, future, value)
+                    return value
+            value = await self._off_loop(lookup, self._stored, key, lookup)
+            if value is not None:
+                self._finish(key, future, value)
+                return value
+            try:
+                value = await acompute()
+            except BaseException as e:
+                self._finish(key, future, error=e if isinstance(e, Exception) else _Abandoned())
+                raise
+            finally:
+                await self._off_loop(lookup, self._release, key, lookup)
+            self._finish(key, future, value)
+            return value
+
+    def stream(self, key: str, iterate, lookup=None):
+        """Streams `iterate()`'s text chunks once per key.
+
+        The leader yields chunks as they arrive. Followers get the assembled
+        text as one chunk when the leader finishes. If the leader's consumer
+        goes away early, a waiting follower runs the stream itself.
+        """
+        while True:
+            future, leader = self._join(key)
+            if not leader:
+                try:
+                    yield future.result()
+                    return
+                except _Abandoned:
+                    continue
+            while not self._lease(key, lookup):
+                value = self._remote_result(key, lookup)
+                if value is _PENDING:
+                    time.sleep(POLL_SECONDS)
+                    continue
+                if value is not None:
+                    self._finish(key, future, value)
+                    yield value
+                    return
+            value = self._stored(key, lookup)
+            if value is not None:
+                self._finish(key, future, value)
+                yield value
+                return
+            chunks, finished = [], False
+            try:
+                for chunk in iterate():
+                    chunks.append(chunk)
+                    yield chunk
+                finished = True
+            except Exception as e:
+                self._finish(key, future, error=e)
+                raise
+            finally:
+                self._release(key, lookup)
+                if not finished and not future.done():
+                    self._finish(key, future, error=_Abandoned())
+            self._finish(key, future, "".join(chunks))
+            return
+
+
+single_flight = SingleFlight(LeaseStore(SINGLEFLIGHT_PATH) if SINGLEFLIGHT_SHARED else None)
+
+registry.register_collector(lambda: [
+    ("startup_mate_singleflight_total", {"result": result}, count)
+    for result, count in single_flight.stats().items() if result != "coalescing_rate"
+])
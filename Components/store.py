@@ -0,0 +1,34 @@
+import os
+import sqlite3
+import threading
+
+
+class SQLiteStore:
+    """Base for the SQLite-backed stores: the file is created and opened on first use.
+
+    Stores are module-level singletons, so opening them at construction would
+    create `.cache/` and its databases whenever the app is imported, which
+    fails on a read-only filesystem.
+    """
+
+    def __init__(self, path: str, **connect_args):
+        self.path = path
+        self._connect_args = connect_args
+        self._db = None
+        self._open_lock = threading.Lock()
+
+    def _setup(self, conn: sqlite3.Connection):
+        """Creates the schema; runs once, when the file is first opened."""
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            with self._open_lock:
+                if self._db is None:
+                    directory = os.path.dirname(self.path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30, **self._connect_args)
+                    self._setup(conn)
+                    self._db = conn
+        return self._db
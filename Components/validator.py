@@ -1,63 +1,60 @@
-import os
-from dotenv import load_dotenv
-from langchain_groq import ChatGroq
-from langchain.agents import initialize_agent, Tool, AgentType
-from langchain_community.utilities import GoogleSerperAPIWrapper
-from langchain_core.prompts import PromptTemplate
-from langchain_core.runnables import RunnableSequence
-import streamlit as st
-from openai import OpenAI
-from langchain.chat_models import ChatOpenAI
-
-# Load env vars
-load_dotenv()
-
-# Set keys
-os.environ["SERPER_API_KEY"] = st.secrets["SERPER_API_KEY"]
-os.environ["GROQ_API_KEY"] = st.secrets["GROQ_API_KEY"]
-os.environ["NOVITA_API_KEY"] = st.secrets["NOVITA_API_KEY"]
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from Components.llm import get_llm, make_chain, resolve_model
+from Components.cache import acached_call, acached_invoke, cached_call, cached_invoke, cached_stream
+from Components.search import search_service
+from Components.metrics import registry, run_config
+from Components.agent_budget import AgentBudget, BudgetExceeded, budget_tracker
+from Components.semantic_cache import semantic_cache, use_semantic_cache
+
+# API keys are loaded by Components.settings on first use, without importing Streamlit.
+# LLM, chains and the agent are built lazily on first use and memoized, so
+# importing this module stays cheap for the Flask app and Streamlit reruns.
 
 # Initialize LLM
 # llm = ChatGroq(
 #     groq_api_key=os.environ["GROQ_API_KEY"],
 #     model_name="meta-llama/llama-4-scout-17b-16e-instruct"
 # )
-client = OpenAI(
-    base_url="https://api.novita.ai/v3/openai",
-    api_key=os.environ["NOVITA_API_KEY"],
-)
-
-# LangChain-compatible wrapper using Novita model
-llm = ChatOpenAI(
-    openai_api_base="https://api.novita.ai/v3/openai",
-    openai_api_key=os.environ["NOVITA_API_KEY"],
-    model="meta-llama/llama-4-maverick-17b-128e-instruct-fp8",
-    temperature=0.2
-)
-# Google search tool
-search_tool = GoogleSerperAPIWrapper()
+# LangChain-compatible wrapper using Novita model (shared connection pool)
+def _llm():
+    tier, model = resolve_model("research_agent")
+    return get_llm(temperature=0.2, model=model, tier=tier)
+
+# Google search tool (shared, cached and deduplicated)
+search_tool = search_service
 
 # Agent setup
-tools = [
-    Tool(
-        name="Google Search",
-        func=search_tool.run,
-        description="Use to find competitors, market need, and trends for a startup idea."
-    )
-]
+def _agent():
+    """The agent on the model the current request routes it to (see resolve_model)."""
+    return _agent_for(*resolve_model("research_agent"))
 
-agent = initialize_agent(
-    tools=tools,
-    llm=llm,
-    agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-    handle_parsing_errors=True,
-    verbose=True
-)
+@lru_cache(maxsize=8)
+def _agent_for(tier: str, model: str):
+    from langchain.agents import initialize_agent, Tool, AgentType
+    tools = [
+        Tool(
+            name="Google Search",
+            func=search_tool.compact,
+            coroutine=search_tool.acompact,
+            description="Use to find competitors, market need, and trends for a startup idea."
+        )
+    ]
+
+    return initialize_agent(
+        tools=tools,
+        llm=get_llm(temperature=0.2, model=model, tier=tier),
+        agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+        handle_parsing_errors=True,
+        verbose=False,
+        **AgentBudget().executor_kwargs()
+    )
 
 # Prompt for generating refined ideas
-idea_prompt = PromptTemplate(
-    input_variables=["idea"],
-    template="""
+IDEA_TEMPLATE = """
 You are a startup idea generator.
 
 A user gave this rough startup idea: "{idea}"
@@ -73,18 +70,26 @@ Format:
 ### Idea 2
 ...
 """
-)
 
-idea_chain = idea_prompt | llm
+@lru_cache(maxsize=None)
+def _idea_chain():
+    return make_chain(IDEA_TEMPLATE, temperature=0.2, name="idea_chain")
 
 # -----------------------------
 # FUNCTIONS
 # -----------------------------
 
-def generate_ideas(user_idea: str) -> str:
+def generate_ideas(user_idea: str, bypass_cache: bool = False) -> str:
     """Generates 3 refined startup ideas using the idea_chain."""
-    response = idea_chain.invoke({"idea": user_idea})
-    return response.content
+    return cached_invoke(_idea_chain(), {"idea": user_idea}, bypass_cache=bypass_cache)
+
+def stream_ideas(user_idea: str, bypass_cache: bool = False):
+    """Streams the refined ideas chunk by chunk; join them before extract_idea_names."""
+    yield from cached_stream(_idea_chain(), {"idea": user_idea}, bypass_cache=bypass_cache)
+
+async def agenerate_ideas(user_idea: str, bypass_cache: bool = False) -> str:
+    """Async variant of generate_ideas."""
+    return await acached_invoke(_idea_chain(), {"idea": user_idea}, bypass_cache=bypass_cache)
 
 def extract_idea_names(text: str) -> list:
     """Parses idea names from the generated text."""
@@ -95,13 +100,8 @@ def extract_idea_names(text: str) -> list:
             names.append(name)
     return names
 
-def research_idea_with_agent(idea: str) -> str:
-    """Uses agent to fetch real-time researched markdown report."""
-    agent_prompt = f"""
-You are a startup researcher.
-
-Startup Idea: {idea}
-
+# Report layout shared by the agent and the parallel research mode
+REPORT_FORMAT = """
 Create a professional report in Markdown format including:
 
 Project Summary according to the idea 
@@ -123,6 +123,289 @@ Project Summary according to the idea
 - How can this idea fill the gap?
 
 Keep it clean and structured.
+"""
+
+# Searches planned up front by the parallel research mode, one per report section
+RESEARCH_QUERIES = {
+    "Competitors": "{idea} competitors startups companies",
+    "Market Need": "{idea} market demand size statistics",
+    "Trends": "{idea} industry trends 2025",
+    "Gaps": "{idea} customer complaints problems with existing solutions",
+}
+
+RESEARCH_MODES = ("agent", "parallel")
+
+SYNTHESIS_TEMPLATE = """
+You are a startup researcher.
+
+Startup Idea: {idea}
+
+Use only the Google search findings below:
+
+{findings}
+{report_format}
+"""
+
+@lru_cache(maxsize=None)
+def _synthesis_chain():
+    return make_chain(SYNTHESIS_TEMPLATE, temperature=0.2, name="synthesis_chain")
+
+# Chains and the agent stay reachable as module attributes, built on first access
+_LAZY_ATTRIBUTES = {
+    "llm": _llm,
+    "agent": _agent,
+    "tools": lambda: _agent().tools,
+    "idea_chain": _idea_chain,
+    "synthesis_chain": _synthesis_chain,
+}
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _agent_prompt(idea: str) -> str:
+    return f"""
+You are a startup researcher.
 
+Startup Idea: {idea}
+{REPORT_FORMAT}
 """
-    return agent.run(agent_prompt)
+
+def _agent_cache_parts(agent_prompt: str) -> dict:
+    llm = _llm()
+    return {"prompt": agent_prompt, "model": llm.model_name, "temperature": llm.temperature}
+
+class _PartialReport(Exception):
+    """A budget-stopped agent run. Its best-effort report is returned but never cached."""
+
+    def __init__(self, report: str):
+        super().__init__("agent stopped by its budget")
+        self.report = report
+
+def _agent_run(budget: AgentBudget):
+    """(executor, tracker, config) for one budgeted agent run."""
+    from langchain.agents import AgentExecutor
+    agent = _agent()
+    executor = AgentExecutor(agent=agent.agent, tools=agent.tools, handle_parsing_errors=True,
+                             **budget.executor_kwargs())
+    tracker = budget_tracker(budget)
+    config = run_config("research_agent")
+    config["callbacks"].append(tracker)
+    return executor, tracker, config
+
+def _agent_findings(tracker) -> str:
+    if not tracker.observations:
+        return "No searches finished before the research budget ran out."
+    return "\n\n".join(f"#### {tool} ({query})\n{observation}" for tool, query, observation in tracker.observations)
+
+def _stop_reason(tracker, output, trace: dict) -> str:
+    reason = tracker.stop_reason(output)
+    registry.inc("startup_mate_agent_stops_total", {"agent": "research_agent", "reason": reason})
+    if trace is not None:
+        trace.update(tracker.trace(output))
+    return reason
+
+def _run_agent(idea: str, agent_prompt: str, budget: AgentBudget, trace: dict) -> str:
+    executor, tracker, config = _agent_run(budget)
+    output = None
+    try:
+        with search_service.session(context=idea):
+            output = executor.invoke({"input": agent_prompt}, config=config)["output"]
+    except BudgetExceeded:
+        pass
+    if _stop_reason(tracker, output, trace) == "completed":
+        return output
+    # Best effort: write the report from the searches the agent did finish
+    raise _PartialReport(cached_invoke(_synthesis_chain(), _synthesis_inputs(idea, _agent_findings(tracker))))
+
+async def _arun_agent(idea: str, agent_prompt: str, budget: AgentBudget, trace: dict) -> str:
+    executor, tracker, config = _agent_run(budget)
+    output = None
+    try:
+        with search_service.session(context=idea):
+            output = (await executor.ainvoke({"input": agent_prompt}, config=config))["output"]
+    except BudgetExceeded:
+        pass
+    if _stop_reason(tracker, output, trace) == "completed":
+        return output
+    raise _PartialReport(await acached_invoke(_synthesis_chain(), _synthesis_inputs(idea, _agent_findings(tracker))))
+
+def research_idea_with_agent(idea: str, bypass_cache: bool = False, budget: AgentBudget = None,
+                             trace: dict = None) -> str:
+    """Uses agent to fetch real-time researched markdown report.
+
+    The run stops at the `budget` (steps, deadline, tokens); the report is then
+    written from the searches finished so far and is not cached. `trace`, if
+    given, receives the stop reason and per-step timing of a run made by this call.
+    """
+    budget = budget or AgentBudget()
+    agent_prompt = _agent_prompt(idea)
+    if trace is not None:
+        trace.update(stopped="reused", steps=[])
+    try:
+        return cached_call(
+            "agent",
+            _agent_cache_parts(agent_prompt),
+            lambda: _run_agent(idea, agent_prompt, budget, trace),
+            bypass_cache=bypass_cache,
+        )
+    except _PartialReport as partial:
+        if trace is not None and trace["stopped"] == "reused":
+            trace["stopped"] = "reused_partial"
+        return partial.report
+
+async def aresearch_idea_with_agent(idea: str, bypass_cache: bool = False, budget: AgentBudget = None,
+                                    trace: dict = None) -> str:
+    """Async variant of research_idea_with_agent."""
+    budget = budget or AgentBudget()
+    agent_prompt = _agent_prompt(idea)
+    if trace is not None:
+        trace.update(stopped="reused", steps=[])
+    try:
+        return await acached_call(
+            "agent",
+            _agent_cache_parts(agent_prompt),
+            lambda: _arun_agent(idea, agent_prompt, budget, trace),
+            bypass_cache=bypass_cache,
+        )
+    except _PartialReport as partial:
+        if trace is not None and trace["stopped"] == "reused":
+            trace["stopped"] = "reused_partial"
+        return partial.report
+
+def plan_research_queries(idea: str) -> dict:
+    """Returns the competitor, market-need, trend and gap searches for an idea."""
+    return {section: query.format(idea=idea) for section, query in RESEARCH_QUERIES.items()}
+
+def _format_findings(queries: dict, results: dict) -> str:
+    return "\n\n".join(
+        f"#### {section} ({queries[section]})\n{results[section]}" for section in queries
+    )
+
+def _synthesis_inputs(idea: str, findings: str) -> dict:
+    return {"idea": idea, "findings": findings, "report_format": REPORT_FORMAT}
+
+def _gather_findings(idea: str) -> str:
+    queries = plan_research_queries(idea)
+    with search_service.session(context=idea):
+        with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+            futures = {
+                section: pool.submit(contextvars.copy_context().run, search_service.compact, query)
+                for section, query in queries.items()
+            }
+            results = {section: future.result() for section, future in futures.items()}
+    return _format_findings(queries, results)
+
+def research_idea_parallel(idea: str, bypass_cache: bool = False) -> str:
+    """Runs all planned searches concurrently, then writes the report in one LLM call."""
+    findings = _gather_findings(idea)
+    return cached_invoke(_synthesis_chain(), _synthesis_inputs(idea, findings), bypass_cache=bypass_cache)
+
+async def aresearch_idea_parallel(idea: str, bypass_cache: bool = False) -> str:
+    """Async variant of research_idea_parallel."""
+    queries = plan_research_queries(idea)
+    with search_service.session(context=idea):
+        answers = await asyncio.gather(*(search_service.acompact(query) for query in queries.values()))
+    findings = _format_findings(queries, dict(zip(queries, answers)))
+    return await acached_invoke(_synthesis_chain(), _synthesis_inputs(idea, findings), bypass_cache=bypass_cache)
+
+def _check_research_mode(mode: str):
+    if mode not in RESEARCH_MODES:
+        raise ValueError(f"Unknown research mode: {mode}")
+
+def _similar_research(idea: str, started: float) -> dict:
+    """A stored report for a near-duplicate idea, shaped like research_idea's result, or None."""
+    match = semantic_cache.lookup("research", idea)
+    if match is None:
+        return None
+    report, similar_to, score = match
+    return {
+        "report": report,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+        "llm_calls": 0,
+        "similar_to": similar_to,
+        "similarity": score,
+    }
+
+def _research_result(idea: str, report: str, mode: str, started: float, llm_calls: int, trace: dict,
+                     semantic: bool) -> dict:
+    # Budget-stopped reports are best effort; do not serve them for similar ideas
+    if semantic and trace.get("stopped", "completed") in ("completed", "reused"):
+        semantic_cache.add("research", idea, report)
+    result = {
+        "report": report,
+        "mode": mode,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+        "llm_calls": llm_calls,
+    }
+    if trace:
+        result["agent"] = trace
+    return result
+
+def research_idea(idea: str, mode: str = "agent", bypass_cache: bool = False, allow_similar: bool = True,
+                  budget: AgentBudget = None) -> dict:
+    """Researches an idea with the chosen mode and reports wall-clock time and LLM calls.
+
+    With `allow_similar`, a report for a near-duplicate idea is served instead
+    (the result then names it in `similar_to`). In agent mode the result
+    carries the agent's stop reason and per-step timing under `agent`.
+    """
+    _check_research_mode(mode)
+    started = time.perf_counter()
+    semantic = use_semantic_cache(allow_similar, bypass_cache)
+    similar = _similar_research(idea, started) if semantic else None
+    if similar:
+        return dict(similar, mode=mode)
+    trace = {}
+    from langchain_community.callbacks import get_openai_callback
+    with get_openai_callback() as usage:
+        if mode == "parallel":
+            report = research_idea_parallel(idea, bypass_cache=bypass_cache)
+        else:
+            report = research_idea_with_agent(idea, bypass_cache=bypass_cache, budget=budget, trace=trace)
+    return _research_result(idea, report, mode, started, usage.successful_requests, trace, semantic)
+
+async def aresearch_idea(idea: str, mode: str = "agent", bypass_cache: bool = False, allow_similar: bool = True,
+                         budget: AgentBudget = None) -> dict:
+    """Async variant of research_idea."""
+    _check_research_mode(mode)
+    started = time.perf_counter()
+    semantic = use_semantic_cache(allow_similar, bypass_cache)
+    # The semantic cache is SQLite: query and update it off the event loop
+    similar = await asyncio.to_thread(_similar_research, idea, started) if semantic else None
+    if similar:
+        return dict(similar, mode=mode)
+    trace = {}
+    from langchain_community.callbacks import get_openai_callback
+    with get_openai_callback() as usage:
+        if mode == "parallel":
+            report = await aresearch_idea_parallel(idea, bypass_cache=bypass_cache)
+        else:
+            report = await aresearch_idea_with_agent(idea, bypass_cache=bypass_cache, budget=budget, trace=trace)
+    return await asyncio.to_thread(_research_result, idea, report, mode, started, usage.successful_requests, trace,
+                                   semantic)
+
+def stream_research(idea: str, mode: str = "parallel", bypass_cache: bool = False, allow_similar: bool = True,
+                    budget: AgentBudget = None):
+    """Streams the research report. The agent mode cannot stream tokens, so it yields the finished report once."""
+    _check_research_mode(mode)
+    semantic = use_semantic_cache(allow_similar, bypass_cache)
+    match = semantic_cache.lookup("research", idea) if semantic else None
+    if match:
+        yield match[0]
+        return
+    if mode == "agent":
+        trace = {}
+        chunks = [research_idea_with_agent(idea, bypass_cache=bypass_cache, budget=budget, trace=trace)]
+        yield chunks[0]
+        if trace["stopped"] not in ("completed", "reused"):
+            return
+    else:
+        findings = _gather_findings(idea)
+        chunks = []
+        for chunk in cached_stream(_synthesis_chain(), _synthesis_inputs(idea, findings), bypass_cache=bypass_cache):
+            chunks.append(chunk)
+            yield chunk
+    if semantic:
+        semantic_cache.add("research", idea, "".join(chunks))
@@ -1,7 +1,10 @@
+import itertools
+import time
 import streamlit as st
-from Components.validator import generate_ideas, extract_idea_names, research_idea_with_agent
-from Components.business_plan import generate_problem_statements, generate_solution, create_pitch_deck
-from Components.funding_advisor import find_investors, generate_investor_email
+from Components.validator import extract_idea_names, stream_ideas, stream_research, RESEARCH_MODES
+from Components.business_plan import generate_problem_statements, generate_solution, render_pitch_deck
+from Components.funding_advisor import find_investors, generate_investor_email, generate_investor_emails, stream_investors
+from Components.prefetch import Prefetcher, consume
 from Components.funding_advisor import (
         extract_domain,
         find_investors,
@@ -16,11 +19,33 @@ main_section = st.sidebar.radio(
     "Choose a Module",
     ["🚀 Idea Creation", "📊 Pitch Deck Creation", "🛠 MVP Builder", "💰 Funding Advisor"]
 )
+allow_similar = st.sidebar.checkbox(
+    "♻️ Reuse results for similar ideas", value=True,
+    help="Serve research and investor lists saved for a near-identical idea instead of running them again."
+)
+speculate = st.sidebar.checkbox(
+    "⚡ Prefetch likely next steps", value=False,
+    help="While you choose, research every candidate idea and draft solutions for every problem in the background."
+)
+
+# Debug panel with the same numbers /metrics exports
+with st.sidebar.expander("📈 Debug metrics"):
+    from Components.metrics import registry
+    snapshot = registry.snapshot()
+    st.markdown("**Latency (seconds)**")
+    st.json(snapshot["latency"], expanded=False)
+    st.markdown("**Tokens, cost, searches, cache**")
+    st.json(snapshot["counters"], expanded=False)
 
 # Session state init
 for key in ["refined_text", "ideas_list", "selected_idea", "research_report", "selected_problem"]:
     if key not in st.session_state:
         st.session_state[key] = ""
+if "prefetcher" not in st.session_state:
+    st.session_state.prefetcher = Prefetcher()
+prefetcher = st.session_state.prefetcher
+if speculate:
+    st.sidebar.caption(f"Prefetch budget left: {prefetcher.remaining()} / {prefetcher.budget}")
 
 # --------------------------
 # 🚀 Idea Creation Module
@@ -32,11 +57,10 @@ if main_section == "🚀 Idea Creation":
 
     if idea_input:
         if st.button("✨ Generate Refined Startup Ideas"):
-            with st.spinner("Generating..."):
-                refined = generate_ideas(idea_input)
-                st.session_state.refined_text = refined
-                st.markdown(refined)
-                st.session_state.ideas_list = extract_idea_names(refined)
+            prefetcher.cancel()
+            refined = st.write_stream(stream_ideas(idea_input))
+            st.session_state.refined_text = refined
+            st.session_state.ideas_list = extract_idea_names(refined)
 
     if st.session_state.ideas_list:
         st.session_state.selected_idea = st.radio(
@@ -45,11 +69,34 @@ if main_section == "🚀 Idea Creation":
             key="selected_idea_radio"
         )
 
+        research_mode = st.radio(
+            "🧪 Research mode:",
+            RESEARCH_MODES,
+            format_func=lambda mode: "Agent (step by step)" if mode == "agent" else "Parallel searches (faster)",
+            horizontal=True,
+        )
+
+        if speculate:
+            # The selected idea first, then the other candidates while budget lasts
+            candidates = [st.session_state.selected_idea] + st.session_state.ideas_list
+            for idea in dict.fromkeys(candidates):
+                prefetcher.speculate(f"research:{research_mode}", idea, consume, stream_research, idea,
+                                     mode=research_mode, allow_similar=allow_similar)
+
         if st.button("🔍 Run Market Research"):
+            prefetcher.claim(f"research:{research_mode}", st.session_state.selected_idea)
+            prefetcher.cancel(f"research:{research_mode}")
+            started = time.perf_counter()
             with st.spinner("Researching..."):
-                report = research_idea_with_agent(st.session_state.selected_idea)
-                st.session_state.research_report = report
-                st.markdown(report)
+                chunks = stream_research(st.session_state.selected_idea, mode=research_mode, allow_similar=allow_similar)
+                first_chunk = next(chunks, "")
+            report = st.write_stream(itertools.chain([first_chunk], chunks))
+            st.session_state.research_report = report
+            st.session_state.pop("problem_options", None)
+            st.caption(f"⏱ {time.perf_counter() - started:.1f}s ({research_mode} mode)")
+            if speculate:
+                prefetcher.speculate("problems", report, generate_problem_statements, report)
+                prefetcher.speculate("domain", report, extract_domain, report)
 
 # --------------------------
 # 📊 Pitch Deck Creation
@@ -62,8 +109,13 @@ elif main_section == "📊 Pitch Deck Creation":
 
         # Generate problem statements once and save to session (avoid regenerating every rerun)
         if "problem_options" not in st.session_state:
+            prefetcher.claim("problems", st.session_state.research_report)
             st.session_state.problem_options = generate_problem_statements(st.session_state.research_report)
 
+        if speculate:
+            for problem in st.session_state.problem_options:
+                prefetcher.speculate("solution", problem, generate_solution, problem)
+
         # Display radio with saved key
         st.radio(
             "🎯 Select a problem statement:",
@@ -80,17 +132,18 @@ elif main_section == "📊 Pitch Deck Creation":
 
         # Button to create PPT
         if st.button("🎯 Create PPT"):
+            prefetcher.claim("solution", selected_problem)
+            prefetcher.cancel("solution")
             with st.spinner("Generating solution and pitch deck..."):
                 solution = generate_solution(selected_problem)
-                ppt_path = create_pitch_deck(
+                deck = render_pitch_deck(
                     startup_name=st.session_state.selected_idea or "My Startup",
                     problem=selected_problem,
                     solution=solution,
                     report=st.session_state.research_report,
                     # unique_angle="We'll use AI + community + virtual events to dominate this space."
                 )
-                with open(ppt_path, "rb") as f:
-                    st.download_button("📥 Download Pitch Deck", f, file_name="pitch_deck.pptx")
+                st.download_button("📥 Download Pitch Deck", deck, file_name="pitch_deck.pptx")
     else:
         st.warning("Please complete the 'Idea Creation' module first.")
 
@@ -105,15 +158,15 @@ elif main_section == "🛠 MVP Builder":
     if st.session_state.selected_problem and st.session_state.research_report:
         if st.button("⚙️ Generate MVP Plan"):
             with st.spinner("Generating MVP Plan..."):
-                from Components.mvp_builder import generate_mvp_plan
-                mvp_report = generate_mvp_plan(
-                    startup_name=st.session_state.selected_idea or "My Startup",
-                    problem=st.session_state.selected_problem,
-                    solution=generate_solution(st.session_state.selected_problem),
-                    report=st.session_state.research_report
-                )
-                st.session_state.mvp_report = mvp_report
-                st.markdown(mvp_report)
+                from Components.mvp_builder import stream_mvp_plan
+                solution = generate_solution(st.session_state.selected_problem)
+            mvp_report = st.write_stream(stream_mvp_plan(
+                startup_name=st.session_state.selected_idea or "My Startup",
+                problem=st.session_state.selected_problem,
+                solution=solution,
+                report=st.session_state.research_report
+            ))
+            st.session_state.mvp_report = mvp_report
 
         # if st.session_state.get("mvp_report"):
         #     st.markdown(st.session_state.mvp_report)
@@ -136,6 +189,7 @@ elif main_section == "💰 Funding Advisor":
         st.warning("Please generate your startup idea first using the Idea Generator or MVP Builder.")
     else:
         if not domain:
+            prefetcher.claim("domain", startup_idea)
             with st.spinner("Extracting domain..."):
                 domain = extract_domain(startup_idea)
                 st.session_state["startup_domain"] = domain
@@ -145,9 +199,18 @@ elif main_section == "💰 Funding Advisor":
 
 
         if st.button("🔍 Find Investors / Funding Sources"):
+            # Show each investor as soon as the extraction has written it out
+            live = st.empty()
+            investors = []
             with st.spinner(f"Searching using Google..."):
-                investors = find_investors(startup_idea, domain)
-                st.session_state["funding_investors"] = investors
+                for investor in stream_investors(startup_idea, domain, allow_similar=allow_similar):
+                    investors.append(investor)
+                    with live.container():
+                        for found in investors:
+                            st.markdown(f"**{found['name']}**")
+                            st.write(found['intro'])
+            live.empty()
+            st.session_state["funding_investors"] = investors
 
         if "funding_investors" in st.session_state:
             investors = st.session_state["funding_investors"]
@@ -159,9 +222,13 @@ elif main_section == "💰 Funding Advisor":
                     st.markdown(f"[🔗 Profile]({investor['Website-link']})")
 
                 if st.button("✉️ Generate Cold Emails"):
-                    for investor in investors:
-                        email = generate_investor_email(startup_idea, investor["name"])
-                        st.markdown(f"#### Email to {investor['name']}")
-                        st.code(email)
+                    with st.spinner("Writing emails..."):
+                        names = [investor["name"] for investor in investors]
+                        for result in generate_investor_emails(startup_idea, names):
+                            st.markdown(f"#### Email to {result['investor_name']}")
+                            if "error" in result:
+                                st.error(result["error"])
+                            else:
+                                st.code(result["email"])
             else:
                 st.info("No investors were found or parsing failed.")
@@ -1,18 +1,93 @@
-from flask import Flask, request, jsonify
-from Components.validator import generate_ideas, extract_idea_names, research_idea_with_agent
-from Components.business_plan import generate_problem_statements, generate_solution
-from Components.funding_advisor import extract_domain, find_investors, generate_investor_email
-from Components.mvp_builder import generate_mvp_plan
+import itertools
+import json
+import time
+from contextlib import ExitStack
+from io import BytesIO
+from flask import Flask, Response, g, request, jsonify, send_file, stream_with_context
+from werkzeug.exceptions import HTTPException
+from Components.validator import generate_ideas, extract_idea_names, research_idea, stream_ideas, stream_research, RESEARCH_MODES
+from Components.business_plan import generate_problem_statements, generate_solution, render_pitch_deck
+from Components.funding_advisor import extract_domain, find_investors, generate_investor_email, generate_investor_emails, investor_names, stream_investors
+from Components.mvp_builder import generate_mvp_plan, stream_mvp_plan
+from Components.pipeline import pipeline_options, run_pipeline
+from Components.report import parse_report
+from Components.jobs import job_queue, check_job
+from Components.agent_budget import AgentBudget
+from Components.llm import model_overrides
+from Components.metrics import registry
+from Components.ratelimit import is_rate_limit_error, retry_after_seconds
 
 app = Flask(__name__)
 
+# Longest a single GET /jobs/<id>?wait=... request may block
+MAX_JOB_WAIT_SECONDS = 30
+
+@app.before_request
+def start_timer():
+    g.started = time.perf_counter()
+
+@app.before_request
+def route_models():
+    # Per-request model routing, e.g. {"models": {"email_chain": "heavy", "*": "fast"}}
+    data = request.get_json(silent=True) if request.is_json else None
+    models = data.get("models") if isinstance(data, dict) else None
+    if models is not None:
+        g.model_routing = ExitStack()
+        try:
+            g.model_routing.enter_context(model_overrides(models))
+        except ValueError as e:
+            return jsonify({"error": f"Invalid models: {e}"}), 400
+
+@app.teardown_request
+def reset_models(error=None):
+    if "model_routing" in g:
+        g.model_routing.close()
+
+@app.after_request
+def record_latency(response):
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    if endpoint != "/metrics" and "started" in g:
+        registry.observe(
+            "startup_mate_endpoint_latency_seconds",
+            {"endpoint": endpoint, "method": request.method, "status": response.status_code},
+            time.perf_counter() - g.started,
+        )
+    return response
+
+@app.errorhandler(Exception)
+def rate_limit_error_api(e):
+    # Provider quota exhausted after retries: answer 503 with Retry-After instead of a bare 500
+    if isinstance(e, HTTPException):
+        return e
+    if not is_rate_limit_error(e):
+        raise e
+    return jsonify({"error": "Upstream rate limit reached, please retry later"}), 503, {"Retry-After": str(retry_after_seconds(e))}
+
+@app.route("/metrics", methods=["GET"])
+def metrics_api():
+    return Response(registry.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+def sse(event: str, payload: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+def sse_response(chunks, done):
+    """Sends each chunk as a `token` event, then `done(full_text)` as the final `done` event."""
+    def events():
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk)
+            yield sse("token", {"token": chunk})
+        yield sse("done", done("".join(parts)))
+    return Response(stream_with_context(events()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.route("/generate-ideas", methods=["POST"])
 def generate_ideas_api():
     data = request.get_json()
     idea = data.get("idea")
     if not idea:
         return jsonify({"error": "Missing idea"}), 400
-    refined = generate_ideas(idea)
+    refined = generate_ideas(idea, bypass_cache=bool(data.get("bypass_cache")))
     names = extract_idea_names(refined)
     return jsonify({"refined": refined, "idea_names": names})
 
@@ -22,8 +97,50 @@ def research_api():
     idea = data.get("idea")
     if not idea:
         return jsonify({"error": "Missing idea"}), 400
-    report = research_idea_with_agent(idea)
-    return jsonify({"report": report})
+    mode = data.get("mode", "agent")
+    if mode not in RESEARCH_MODES:
+        return jsonify({"error": f"Unknown mode, expected one of {list(RESEARCH_MODES)}"}), 400
+    try:
+        budget = AgentBudget.from_request(data.get("budget"))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid budget: {e}"}), 400
+    result = research_idea(idea, mode=mode, bypass_cache=bool(data.get("bypass_cache")),
+                           allow_similar=data.get("allow_similar", True), budget=budget)
+    return jsonify(result)
+
+@app.route("/generate-ideas/stream", methods=["POST"])
+def generate_ideas_stream_api():
+    data = request.get_json()
+    idea = data.get("idea")
+    if not idea:
+        return jsonify({"error": "Missing idea"}), 400
+    chunks = stream_ideas(idea, bypass_cache=bool(data.get("bypass_cache")))
+    return sse_response(chunks, lambda refined: {"refined": refined, "idea_names": extract_idea_names(refined)})
+
+@app.route("/research/stream", methods=["POST"])
+def research_stream_api():
+    data = request.get_json()
+    idea = data.get("idea")
+    if not idea:
+        return jsonify({"error": "Missing idea"}), 400
+    mode = data.get("mode", "parallel")
+    if mode not in RESEARCH_MODES:
+        return jsonify({"error": f"Unknown mode, expected one of {list(RESEARCH_MODES)}"}), 400
+    try:
+        budget = AgentBudget.from_request(data.get("budget"))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid budget: {e}"}), 400
+    chunks = stream_research(idea, mode=mode, bypass_cache=bool(data.get("bypass_cache")),
+                             allow_similar=data.get("allow_similar", True), budget=budget)
+    return sse_response(chunks, lambda report: {"report": report, "mode": mode})
+
+@app.route("/report/parse", methods=["POST"])
+def parse_report_api():
+    data = request.get_json()
+    report = data.get("report")
+    if not report:
+        return jsonify({"error": "Missing report"}), 400
+    return jsonify(parse_report(report).to_dict())
 
 @app.route("/problem-statements", methods=["POST"])
 def problem_statements_api():
@@ -31,7 +148,7 @@ def problem_statements_api():
     report = data.get("report")
     if not report:
         return jsonify({"error": "Missing report"}), 400
-    problems = generate_problem_statements(report)
+    problems = generate_problem_statements(report, bypass_cache=bool(data.get("bypass_cache")))
     return jsonify({"problems": problems})
 
 @app.route("/generate-solution", methods=["POST"])
@@ -40,9 +157,26 @@ def solution_api():
     problem = data.get("problem")
     if not problem:
         return jsonify({"error": "Missing problem"}), 400
-    solution = generate_solution(problem)
+    solution = generate_solution(problem, bypass_cache=bool(data.get("bypass_cache")))
     return jsonify({"solution": solution})
 
+@app.route("/pitch-deck", methods=["POST"])
+def pitch_deck_api():
+    data = request.get_json()
+    name = data.get("startup_name", "My Startup")
+    problem = data.get("problem")
+    solution = data.get("solution")
+    report = data.get("report")
+    if not problem or not solution or not report:
+        return jsonify({"error": "Missing fields"}), 400
+    deck = render_pitch_deck(name, problem, solution, report)
+    return send_file(
+        BytesIO(deck),
+        mimetype="application/vnd.openxmlformats-officedocument.presentationml.presentation",
+        as_attachment=True,
+        download_name="pitch_deck.pptx",
+    )
+
 @app.route("/mvp", methods=["POST"])
 def mvp_api():
     data = request.get_json()
@@ -52,18 +186,49 @@ def mvp_api():
     report = data.get("report")
     if not problem or not solution or not report:
         return jsonify({"error": "Missing fields"}), 400
-    plan = generate_mvp_plan(name, problem, solution, report)
+    plan = generate_mvp_plan(name, problem, solution, report, bypass_cache=bool(data.get("bypass_cache")))
     return jsonify({"mvp_plan": plan})
 
+@app.route("/mvp/stream", methods=["POST"])
+def mvp_stream_api():
+    data = request.get_json()
+    name = data.get("startup_name", "My Startup")
+    problem = data.get("problem")
+    solution = data.get("solution")
+    report = data.get("report")
+    if not problem or not solution or not report:
+        return jsonify({"error": "Missing fields"}), 400
+    chunks = stream_mvp_plan(name, problem, solution, report, bypass_cache=bool(data.get("bypass_cache")))
+    return sse_response(chunks, lambda plan: {"mvp_plan": plan.strip()})
+
 @app.route("/investors", methods=["POST"])
 def investors_api():
     data = request.get_json()
     idea = data.get("idea")
     if not idea:
         return jsonify({"error": "Missing idea"}), 400
-    domain = extract_domain(idea)
-    investors = find_investors(idea, domain)
-    return jsonify({"domain": domain, "investors": investors})
+    bypass_cache = bool(data.get("bypass_cache"))
+    domain = extract_domain(idea, bypass_cache=bypass_cache)
+    match = {}
+    investors = find_investors(idea, domain, bypass_cache=bypass_cache, allow_similar=data.get("allow_similar", True),
+                               match=match)
+    return jsonify({"domain": domain, "investors": investors, **match})
+
+@app.route("/investors/stream", methods=["POST"])
+def investors_stream_api():
+    data = request.get_json()
+    idea = data.get("idea")
+    if not idea:
+        return jsonify({"error": "Missing idea"}), 400
+    bypass_cache = bool(data.get("bypass_cache"))
+    domain = extract_domain(idea, bypass_cache=bypass_cache)
+    investors = stream_investors(idea, domain, bypass_cache=bypass_cache, allow_similar=data.get("allow_similar", True))
+    # NDJSON: the domain first, then one line per investor as soon as it is extracted
+    lines = itertools.chain(
+        [json.dumps({"domain": domain}) + "\n"],
+        (json.dumps({"investor": investor}) + "\n" for investor in investors),
+    )
+    return Response(stream_with_context(lines), mimetype="application/x-ndjson")
 
 @app.route("/cold-email", methods=["POST"])
 def cold_email_api():
@@ -72,12 +237,77 @@ def cold_email_api():
     investor_name = data.get("investor_name")
     if not idea or not investor_name:
         return jsonify({"error": "Missing data"}), 400
-    email = generate_investor_email(idea, investor_name)
+    email = generate_investor_email(idea, investor_name, bypass_cache=bool(data.get("bypass_cache")))
     return jsonify({"email": email})
 
+@app.route("/cold-email/batch", methods=["POST"])
+def cold_email_batch_api():
+    data = request.get_json()
+    idea = data.get("idea")
+    investors = data.get("investors")
+    if not idea or not investors:
+        return jsonify({"error": "Missing data"}), 400
+    try:
+        names = investor_names(investors)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    emails = generate_investor_emails(idea, names, bypass_cache=bool(data.get("bypass_cache")))
+    # One JSON object per line, flushed as each email finishes
+    lines = (json.dumps(email) + "\n" for email in emails)
+    return Response(stream_with_context(lines), mimetype="application/x-ndjson")
+
+@app.route("/pipeline", methods=["POST"])
+def pipeline_api():
+    data = request.get_json()
+    try:
+        options = pipeline_options(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    result = run_pipeline(**options)
+    return jsonify(result)
+
+@app.before_request
+def start_jobs():
+    # Job workers start (and resume unfinished jobs) on the first /jobs request,
+    # not at import, so importing the app has no side effects
+    if request.path.startswith("/jobs"):
+        job_queue.start()
+
+@app.route("/jobs", methods=["POST"])
+def submit_job_api():
+    data = request.get_json()
+    kind = data.get("kind")
+    params = data.get("params") or {}
+    # Rejected here rather than as a failed job; the job reads the same params again
+    try:
+        check_job(kind, params)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    job_id = job_queue.submit(kind, params)
+    return jsonify({"job_id": job_id, "status": "queued"}), 202
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status_api(job_id):
+    try:
+        wait = min(float(request.args.get("wait", 0)), MAX_JOB_WAIT_SECONDS)
+    except ValueError:
+        return jsonify({"error": "wait must be a number of seconds"}), 400
+    job = job_queue.wait(job_id, wait) if wait > 0 else job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job)
+
+@app.route("/jobs/<job_id>", methods=["DELETE"])
+def cancel_job_api(job_id):
+    if job_queue.get(job_id) is None:
+        return jsonify({"error": "Unknown job"}), 404
+    cancelled = job_queue.cancel(job_id)
+    return jsonify({"job_id": job_id, "cancelled": cancelled})
+
 # Required for Vercel
 def handler(request, context):
     return app(request, context)
 
 if __name__ == "__main__":
+    job_queue.start()
     app.run(debug=True)
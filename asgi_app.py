@@ -0,0 +1,183 @@
+import asyncio
+import json
+import os
+from functools import wraps
+
+from quart import Quart, Response, request, jsonify
+from werkzeug.exceptions import HTTPException
+from Components.validator import agenerate_ideas, extract_idea_names, aresearch_idea, RESEARCH_MODES
+from Components.business_plan import agenerate_problem_statements, agenerate_solution
+from Components.funding_advisor import aextract_domain, afind_investors, agenerate_investor_email, agenerate_investor_emails, investor_names
+from Components.mvp_builder import agenerate_mvp_plan
+from Components.llm import check_overrides, model_overrides
+from Components.agent_budget import AgentBudget
+from Components.metrics import registry
+from Components.ratelimit import is_rate_limit_error, retry_after_seconds
+
+# Async serving mode: same routes and JSON contracts as app.py, but every LLM
+# and search call is awaited, so one process can hold many slow requests.
+# Run with: hypercorn asgi_app:app  (or uvicorn asgi_app:app)
+MAX_CONCURRENCY = int(os.environ.get("STARTUP_MATE_MAX_CONCURRENCY", "200"))
+
+app = Quart(__name__)
+_slots = asyncio.Semaphore(MAX_CONCURRENCY)
+
+
+def _models(data) -> dict:
+    # Per-request model routing, e.g. {"models": {"email_chain": "heavy", "*": "fast"}}; raises ValueError
+    return check_overrides(data.get("models") if isinstance(data, dict) else None)
+
+
+def limited(view):
+    """Caps the number of requests that are generating at the same time and applies their model overrides."""
+    @wraps(view)
+    async def wrapper(*args, **kwargs):
+        data = await request.get_json(silent=True) if request.is_json else None
+        try:
+            models = _models(data)
+        except ValueError as e:
+            return jsonify({"error": f"Invalid models: {e}"}), 400
+        async with _slots:
+            with model_overrides(models):
+                return await view(*args, **kwargs)
+    return wrapper
+
+
+async def limited_stream(chunks, models: dict):
+    """Iterates `chunks` inside a concurrency slot and the request's model overrides.
+
+    A streamed body is consumed after the view has returned, so `limited`
+    no longer covers it.
+    """
+    async with _slots:
+        with model_overrides(models):
+            async for chunk in chunks:
+                yield chunk
+
+
+@app.errorhandler(Exception)
+async def rate_limit_error_api(e):
+    # Provider quota exhausted after retries: answer 503 with Retry-After instead of a bare 500
+    if isinstance(e, HTTPException):
+        return e
+    if not is_rate_limit_error(e):
+        raise e
+    return jsonify({"error": "Upstream rate limit reached, please retry later"}), 503, {"Retry-After": str(retry_after_seconds(e))}
+
+
+@app.route("/metrics", methods=["GET"])
+async def metrics_api():
+    return Response(registry.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/generate-ideas", methods=["POST"])
+@limited
+async def generate_ideas_api():
+    data = await request.get_json()
+    idea = data.get("idea")
+    if not idea:
+        return jsonify({"error": "Missing idea"}), 400
+    refined = await agenerate_ideas(idea, bypass_cache=bool(data.get("bypass_cache")))
+    names = extract_idea_names(refined)
+    return jsonify({"refined": refined, "idea_names": names})
+
+@app.route("/research", methods=["POST"])
+@limited
+async def research_api():
+    data = await request.get_json()
+    idea = data.get("idea")
+    if not idea:
+        return jsonify({"error": "Missing idea"}), 400
+    mode = data.get("mode", "agent")
+    if mode not in RESEARCH_MODES:
+        return jsonify({"error": f"Unknown mode, expected one of {list(RESEARCH_MODES)}"}), 400
+    try:
+        budget = AgentBudget.from_request(data.get("budget"))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid budget: {e}"}), 400
+    result = await aresearch_idea(idea, mode=mode, bypass_cache=bool(data.get("bypass_cache")),
+                                  allow_similar=data.get("allow_similar", True), budget=budget)
+    return jsonify(result)
+
+@app.route("/problem-statements", methods=["POST"])
+@limited
+async def problem_statements_api():
+    data = await request.get_json()
+    report = data.get("report")
+    if not report:
+        return jsonify({"error": "Missing report"}), 400
+    problems = await agenerate_problem_statements(report, bypass_cache=bool(data.get("bypass_cache")))
+    return jsonify({"problems": problems})
+
+@app.route("/generate-solution", methods=["POST"])
+@limited
+async def solution_api():
+    data = await request.get_json()
+    problem = data.get("problem")
+    if not problem:
+        return jsonify({"error": "Missing problem"}), 400
+    solution = await agenerate_solution(problem, bypass_cache=bool(data.get("bypass_cache")))
+    return jsonify({"solution": solution})
+
+@app.route("/mvp", methods=["POST"])
+@limited
+async def mvp_api():
+    data = await request.get_json()
+    name = data.get("startup_name", "My Startup")
+    problem = data.get("problem")
+    solution = data.get("solution")
+    report = data.get("report")
+    if not problem or not solution or not report:
+        return jsonify({"error": "Missing fields"}), 400
+    plan = await agenerate_mvp_plan(name, problem, solution, report, bypass_cache=bool(data.get("bypass_cache")))
+    return jsonify({"mvp_plan": plan})
+
+@app.route("/investors", methods=["POST"])
+@limited
+async def investors_api():
+    data = await request.get_json()
+    idea = data.get("idea")
+    if not idea:
+        return jsonify({"error": "Missing idea"}), 400
+    bypass_cache = bool(data.get("bypass_cache"))
+    domain = await aextract_domain(idea, bypass_cache=bypass_cache)
+    match = {}
+    investors = await afind_investors(idea, domain, bypass_cache=bypass_cache,
+                                      allow_similar=data.get("allow_similar", True), match=match)
+    return jsonify({"domain": domain, "investors": investors, **match})
+
+@app.route("/cold-email", methods=["POST"])
+@limited
+async def cold_email_api():
+    data = await request.get_json()
+    idea = data.get("idea")
+    investor_name = data.get("investor_name")
+    if not idea or not investor_name:
+        return jsonify({"error": "Missing data"}), 400
+    email = await agenerate_investor_email(idea, investor_name, bypass_cache=bool(data.get("bypass_cache")))
+    return jsonify({"email": email})
+
+@app.route("/cold-email/batch", methods=["POST"])
+async def cold_email_batch_api():
+    data = await request.get_json()
+    idea = data.get("idea")
+    investors = data.get("investors")
+    if not idea or not investors:
+        return jsonify({"error": "Missing data"}), 400
+    try:
+        names = investor_names(investors)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        models = _models(data)
+    except ValueError as e:
+        return jsonify({"error": f"Invalid models: {e}"}), 400
+
+    async def lines():
+        async for email in agenerate_investor_emails(idea, names, bypass_cache=bool(data.get("bypass_cache"))):
+            yield json.dumps(email) + "\n"
+
+    return Response(limited_stream(lines(), models), mimetype="application/x-ndjson")
+
+if __name__ == "__main__":
+    app.run(debug=True)
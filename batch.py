@@ -0,0 +1,46 @@
+"""Runs a CSV or JSONL file of startup ideas through the full pipeline.
+
+Each record goes through idea refinement, research, problem statements,
+solution, MVP plan, domain and investors, plus a rendered pitch deck. One
+JSON line per record is appended to the output as soon as that record is
+done. Stage results are checkpointed, so running the same command again after
+a crash or Ctrl-C continues where it stopped.
+
+    python batch.py ideas.csv results.jsonl --decks decks/ --workers 8
+    python batch.py ideas.jsonl results.jsonl --research-mode parallel --retry-failed
+
+CSV files need a header row with an `idea` column (see --idea-field). JSONL
+lines may be objects or plain strings. An optional `id` column/field names the
+record; otherwise it is identified by its idea text. An optional `name` sets
+the startup name on the deck.
+"""
+import argparse
+import json
+
+from Components.batch import BATCH_WORKERS, run_batch
+from Components.validator import RESEARCH_MODES
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input_path", metavar="INPUT", help="ideas as .csv (with header) or .jsonl")
+    parser.add_argument("output_path", metavar="OUTPUT", help="JSONL file results are appended to")
+    parser.add_argument("--decks", dest="decks_dir", help="directory for <record id>.pptx pitch decks")
+    parser.add_argument("--checkpoint", dest="checkpoint_path", help="checkpoint database (default: OUTPUT.checkpoint.sqlite3)")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="records processed at the same time")
+    parser.add_argument("--stage-workers", type=int, default=4, help="concurrent stages within one record")
+    parser.add_argument("--research-mode", choices=RESEARCH_MODES, default="agent")
+    parser.add_argument("--idea-field", default="idea", help="column or field holding the idea")
+    parser.add_argument("--no-refine", dest="refine_idea", action="store_false", help="research the input idea as is")
+    parser.add_argument("--bypass-cache", action="store_true", help="regenerate instead of reusing cached answers")
+    parser.add_argument("--no-similar", dest="allow_similar", action="store_false",
+                        help="do not reuse results stored for near-identical ideas")
+    parser.add_argument("--retry-failed", action="store_true", help="run records that had stage errors again")
+    parser.add_argument("--limit", type=int, help="process at most this many input records")
+    args = parser.parse_args()
+    summary = run_batch(**vars(args))
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Cold-start import benchmark for the app entry points.
+
+Each entry point is imported in a fresh interpreter several times and the
+median import time is reported, together with the number of loaded modules.
+With --baseline the same measurement runs against another git revision
+(checked out in a temporary worktree) to show the cold-start reduction.
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --baseline HEAD~1 --runs 7
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_POINTS = [
+    "app",
+    "asgi_app",
+    "Components.validator",
+    "Components.funding_advisor",
+    "Components.business_plan",
+    "Components.mvp_builder",
+]
+
+# Dummy keys: older revisions read them at import time
+DUMMY_SECRETS = {"SERPER_API_KEY": "benchmark", "GROQ_API_KEY": "benchmark", "NOVITA_API_KEY": "benchmark"}
+
+PROBE = (
+    "import sys, time\n"
+    "started = time.perf_counter()\n"
+    "import {module}\n"
+    "print(time.perf_counter() - started, len(sys.modules))\n"
+)
+
+
+def measure(root: str, module: str, runs: int):
+    """Returns (median seconds, module count) or an error string."""
+    env = dict(os.environ, PYTHONPATH=root, PYTHONDONTWRITEBYTECODE="1", **DUMMY_SECRETS)
+    # Every store lives in a temp dir, also for older refs that open their stores at import
+    workdir = os.path.join(tempfile.gettempdir(), "startup_mate_bench")
+    env.update(
+        STARTUP_MATE_CACHE_DIR=workdir,
+        STARTUP_MATE_CACHE_PATH=os.path.join(workdir, "responses.sqlite3"),
+        STARTUP_MATE_SEARCH_CACHE_PATH=os.path.join(workdir, "search.sqlite3"),
+        STARTUP_MATE_SEARCH_RECORDINGS=os.path.join(workdir, "search_recordings.jsonl"),
+        STARTUP_MATE_JOBS_PATH=os.path.join(workdir, "jobs.sqlite3"),
+        STARTUP_MATE_SEMANTIC_CACHE_PATH=os.path.join(workdir, "semantic.sqlite3"),
+        STARTUP_MATE_INVESTOR_DIRECTORY_PATH=os.path.join(workdir, "investors.sqlite3"),
+        STARTUP_MATE_RATELIMIT_PATH=os.path.join(workdir, "ratelimit.sqlite3"),
+        STARTUP_MATE_SINGLEFLIGHT_PATH=os.path.join(workdir, "singleflight.sqlite3"),
+    )
+    timings, modules = [], 0
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module)],
+            cwd=root, env=env, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            return proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"
+        seconds, count = proc.stdout.split()[-2:]
+        timings.append(float(seconds))
+        modules = int(count)
+    return statistics.median(timings), modules
+
+
+def checkout(ref: str) -> str:
+    path = tempfile.mkdtemp(prefix="startup_mate_baseline_")
+    subprocess.run(["git", "worktree", "add", "--detach", path, ref], cwd=ROOT, check=True, capture_output=True)
+    os.makedirs(os.path.join(path, ".streamlit"), exist_ok=True)
+    with open(os.path.join(path, ".streamlit", "secrets.toml"), "w") as f:
+        f.writelines(f'{name} = "{value}"\n' for name, value in DUMMY_SECRETS.items())
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--baseline", help="git revision to compare against")
+    parser.add_argument("modules", nargs="*", default=ENTRY_POINTS)
+    args = parser.parse_args()
+
+    baseline_root = checkout(args.baseline) if args.baseline else None
+    try:
+        print(f"{'entry point':<28} {'current':>12} {'modules':>8}" + (f" {'baseline':>12} {'modules':>8} {'change':>8}" if baseline_root else ""))
+        for module in args.modules:
+            current = measure(ROOT, module, args.runs)
+            row = f"{module:<28} " + (f"{current[0] * 1000:>10.0f}ms {current[1]:>8}" if isinstance(current, tuple) else f"{current[:21]:>21}")
+            if baseline_root:
+                before = measure(baseline_root, module, args.runs)
+                if isinstance(before, tuple):
+                    row += f" {before[0] * 1000:>10.0f}ms {before[1]:>8}"
+                    if isinstance(current, tuple):
+                        row += f" {(current[0] - before[0]) / before[0] * 100:>+7.0f}%"
+                else:
+                    row += f" {before[:21]:>21}"
+            print(row)
+    finally:
+        if baseline_root:
+            subprocess.run(["git", "worktree", "remove", "--force", baseline_root], cwd=ROOT, capture_output=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""Offline load test for the Flask API.
+
+Starts benchmarks/mock_server.py as the LLM (OpenAI-compatible) and Serper
+backend, starts app.py against it in a subprocess with throwaway cache and job
+databases, then drives every route at the given concurrency and reports
+p50/p95/p99 latency, time to first byte and requests per second per route.
+No API keys or network access are needed.
+
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --requests 50 --concurrency 10 --bypass-cache
+    python benchmarks/load_test.py --routes research research_stream --latency 0.5 --json results.json
+    python benchmarks/load_test.py --target http://127.0.0.1:5000   # an already running server
+
+With --bypass-cache every request reaches the (mock) LLM; without it the
+response cache answers repeats, which measures the cached path instead.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import mock_server  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IDEA = "AI tutor for primary school kids"
+PROBLEM = "Children learn at different speeds but most apps follow a fixed path."
+SOLUTION = mock_server.SOLUTION
+REPORT = mock_server.REPORT
+INVESTORS = [{"name": "Reach Capital"}, {"name": "Owl Ventures"}, {"name": "Learn Capital"}]
+
+# name -> (method, path, JSON body)
+ROUTES = {
+    "generate_ideas": ("POST", "/generate-ideas", {"idea": IDEA}),
+    "generate_ideas_stream": ("POST", "/generate-ideas/stream", {"idea": IDEA}),
+    "research": ("POST", "/research", {"idea": IDEA, "mode": "parallel"}),
+    "research_agent": ("POST", "/research", {"idea": IDEA, "mode": "agent"}),
+    "research_stream": ("POST", "/research/stream", {"idea": IDEA, "mode": "parallel"}),
+    "report_parse": ("POST", "/report/parse", {"report": REPORT}),
+    "problem_statements": ("POST", "/problem-statements", {"report": REPORT}),
+    "generate_solution": ("POST", "/generate-solution", {"problem": PROBLEM}),
+    "pitch_deck": ("POST", "/pitch-deck", {"startup_name": "TutorPal", "problem": PROBLEM, "solution": SOLUTION, "report": REPORT}),
+    "mvp": ("POST", "/mvp", {"startup_name": "TutorPal", "problem": PROBLEM, "solution": SOLUTION, "report": REPORT}),
+    "mvp_stream": ("POST", "/mvp/stream", {"startup_name": "TutorPal", "problem": PROBLEM, "solution": SOLUTION, "report": REPORT}),
+    "investors": ("POST", "/investors", {"idea": IDEA}),
+    "cold_email": ("POST", "/cold-email", {"idea": IDEA, "investor_name": "Reach Capital"}),
+    "cold_email_batch": ("POST", "/cold-email/batch", {"idea": IDEA, "investors": INVESTORS}),
+    "pipeline": ("POST", "/pipeline", {"idea": IDEA, "startup_name": "TutorPal"}),
+    "metrics": ("GET", "/metrics", None),
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_until_up(url: str, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=2).read()
+            return
+        except (urllib.error.URLError, ConnectionError, OSError):
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+def start_app(mock_url: str, port: int, workdir: str) -> subprocess.Popen:
+    """Runs app.py against the mock backend with every store in `workdir`.
+
+    Canned mock answers must never reach the real caches, investor directory
+    or similar-idea store, and the benchmark must not draw from (or be
+    throttled by) the production rate-limit buckets, which are disabled here.
+    """
+    env = dict(
+        os.environ,
+        NOVITA_BASE_URL=f"{mock_url}/v1",
+        SERPER_BASE_URL=mock_url,
+        NOVITA_API_KEY="mock",
+        SERPER_API_KEY="mock",
+        GROQ_API_KEY="mock",
+        STARTUP_MATE_CACHE_PATH=os.path.join(workdir, "responses.sqlite3"),
+        STARTUP_MATE_SEARCH_CACHE_PATH=os.path.join(workdir, "search.sqlite3"),
+        STARTUP_MATE_SEARCH_RECORDINGS=os.path.join(workdir, "search_recordings.jsonl"),
+        STARTUP_MATE_JOBS_PATH=os.path.join(workdir, "jobs.sqlite3"),
+        STARTUP_MATE_SEMANTIC_CACHE_PATH=os.path.join(workdir, "semantic.sqlite3"),
+        STARTUP_MATE_INVESTOR_DIRECTORY_PATH=os.path.join(workdir, "investors.sqlite3"),
+        STARTUP_MATE_RATELIMIT_PATH=os.path.join(workdir, "ratelimit.sqlite3"),
+        STARTUP_MATE_SINGLEFLIGHT_PATH=os.path.join(workdir, "singleflight.sqlite3"),
+        STARTUP_MATE_LLM_RPM="0",
+        STARTUP_MATE_LLM_TPM="0",
+        STARTUP_MATE_SEARCH_RPM="0",
+        STARTUP_MATE_SEARCH_MODE="live",
+    )
+    code = f"from app import app; app.run(host='127.0.0.1', port={port}, threaded=True)"
+    return subprocess.Popen([sys.executable, "-c", code], cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=open(os.path.join(workdir, "app.log"), "w"))
+
+
+def call(base_url: str, method: str, path: str, body, timeout: float) -> dict:
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(base_url + path, data=data, method=method,
+                                 headers={"Content-Type": "application/json"} if data else {})
+    started = time.perf_counter()
+    first_byte = None
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            while True:
+                chunk = response.read1(65536)
+                if first_byte is None:
+                    first_byte = time.perf_counter() - started
+                if not chunk:
+                    break
+            ok = 200 <= response.status < 300
+    except (urllib.error.URLError, ConnectionError, OSError):
+        ok = False
+    elapsed = time.perf_counter() - started
+    return {"ok": ok, "seconds": elapsed, "ttfb": first_byte if first_byte is not None else elapsed}
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def run_route(base_url: str, name: str, requests: int, concurrency: int, bypass_cache: bool, timeout: float) -> dict:
+    method, path, body = ROUTES[name]
+    if body is not None and bypass_cache:
+        body = dict(body, bypass_cache=True)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: call(base_url, method, path, body, timeout), range(requests)))
+    wall = time.perf_counter() - started
+    latencies = [r["seconds"] for r in results if r["ok"]]
+    ttfbs = [r["ttfb"] for r in results if r["ok"]]
+    return {
+        "route": name,
+        "requests": requests,
+        "errors": sum(1 for r in results if not r["ok"]),
+        "rps": round(requests / wall, 2) if wall else 0.0,
+        "p50": round(percentile(latencies, 50), 4),
+        "p95": round(percentile(latencies, 95), 4),
+        "p99": round(percentile(latencies, 99), 4),
+        "mean": round(statistics.mean(latencies), 4) if latencies else 0.0,
+        "ttfb_p50": round(percentile(ttfbs, 50), 4),
+    }
+
+
+def print_table(rows: list):
+    print(f"{'route':<24} {'reqs':>5} {'err':>4} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'ttfb50':>8}")
+    for row in rows:
+        print(f"{row['route']:<24} {row['requests']:>5} {row['errors']:>4} {row['rps']:>8.2f} "
+              f"{row['p50'] * 1000:>6.0f}ms {row['p95'] * 1000:>6.0f}ms {row['p99'] * 1000:>6.0f}ms "
+              f"{row['ttfb_p50'] * 1000:>6.0f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--routes", nargs="*", default=list(ROUTES), choices=list(ROUTES))
+    parser.add_argument("--requests", type=int, default=20, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--bypass-cache", action="store_true", help="send bypass_cache=true so every call reaches the mock LLM")
+    parser.add_argument("--latency", type=float, default=0.2, help="mock LLM/search latency in seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="mock LLM generation speed")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request timeout in seconds")
+    parser.add_argument("--target", help="base URL of an already running app; skips starting the mock and app")
+    parser.add_argument("--json", dest="json_path", help="also write the results to this JSON file")
+    parser.add_argument("--fail-on-error", action="store_true", help="exit with status 1 if any request failed")
+    args = parser.parse_args()
+
+    mock, app_proc, workdir = None, None, None
+    try:
+        if args.target:
+            base_url = args.target.rstrip("/")
+        else:
+            mock = mock_server.start(0, args.latency, args.tokens_per_second)
+            workdir = tempfile.mkdtemp(prefix="startup_mate_load_")
+            port = free_port()
+            app_proc = start_app(f"http://127.0.0.1:{mock.server_port}", port, workdir)
+            base_url = f"http://127.0.0.1:{port}"
+        wait_until_up(base_url + "/metrics")
+
+        rows = []
+        for name in args.routes:
+            rows.append(run_route(base_url, name, args.requests, args.concurrency, args.bypass_cache, args.timeout))
+        print_table(rows)
+
+        if args.json_path:
+            with open(args.json_path, "w") as f:
+                json.dump({"concurrency": args.concurrency, "bypass_cache": args.bypass_cache,
+                           "mock_latency": args.latency, "mock_tokens_per_second": args.tokens_per_second,
+                           "routes": rows}, f, indent=2)
+        if args.fail_on_error and any(row["errors"] for row in rows):
+            if workdir:
+                print(f"Errors occurred; see {os.path.join(workdir, 'app.log')}", file=sys.stderr)
+            sys.exit(1)
+    finally:
+        if app_proc:
+            app_proc.terminate()
+            app_proc.wait(timeout=10)
+        if mock:
+            mock.shutdown()
+
+
+if __name__ == "__main__":
+    main()
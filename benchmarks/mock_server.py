@@ -0,0 +1,258 @@
+"""Local stand-in for the OpenAI-compatible chat API (Novita) and for Serper.
+
+Answers with canned outputs in the formats the components parse
+(extract_idea_names, generate_problem_statements, find_investors, the ReAct
+agent), after a configurable latency and at a configurable token rate, so the
+app can be load-tested offline without spending API credits.
+
+    python benchmarks/mock_server.py --port 8900 --latency 0.3 --tokens-per-second 80
+
+Then point the app at it:
+
+    NOVITA_BASE_URL=http://127.0.0.1:8900/v1 SERPER_BASE_URL=http://127.0.0.1:8900 \\
+    NOVITA_API_KEY=mock SERPER_API_KEY=mock python app.py
+"""
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+IDEAS = """### Idea 1
+**Name**: TutorPal
+**Description**: An adaptive AI tutor for primary school kids.
+**Unique Angle**: Voice-first lessons that adapt to each child.
+
+### Idea 2
+**Name**: HomeworkHero
+**Description**: Homework help that explains instead of answering.
+**Unique Angle**: Socratic questioning tuned to the school curriculum.
+
+### Idea 3
+**Name**: ReadBuddy
+**Description**: A reading companion that listens and corrects pronunciation.
+**Unique Angle**: Works offline on low-cost tablets.
+"""
+
+REPORT = """Project Summary: An adaptive AI tutor for children.
+
+### 🏢 Competitors
+
+| Name | Description | Website |
+|------|-------------|---------|
+| Khan Academy Kids | Free learning app for young children | https://learn.khanacademy.org/khan-academy-kids/ |
+| Byju's | Large online learning platform | https://byjus.com |
+| Duolingo ABC | Early literacy app | https://duolingo.com |
+
+### 📈 Market Need
+
+- Parents want personalised learning at home
+- Existing apps are not adaptive to each child's pace
+- Teachers lack time for one-to-one support
+
+### 💡 Unique Angle / Gap
+
+- No voice-first adaptive tutor for early learners
+- Combine curriculum alignment with parent progress reports
+"""
+
+PROBLEMS = """1. Children learn at different speeds but most apps follow a fixed path.
+2. Parents cannot see what their child actually struggles with.
+3. Teachers have no time for individual tutoring in large classes."""
+
+SOLUTION = """- Voice-first AI tutor that adapts every lesson to the child's pace
+- Weekly progress reports for parents
+- Curriculum-aligned exercises teachers can assign"""
+
+MVP_PLAN = """### ✅ MVP Feature Plan
+- Adaptive maths lessons
+- Voice interaction
+- Parent dashboard
+- Progress reports
+
+### 🛠 Tech Stack
+- Frontend: React Native
+- Backend: FastAPI
+- Database: PostgreSQL
+- ML/AI (if needed): LLM API
+- APIs/3rd party services: Speech-to-text
+
+### 📆 Timeline (8-12 weeks)
+| Week | Task |
+|------|------|
+| 1-2  | Design |
+| 3-6  | Build core lessons |
+| 7-8  | Pilot |
+
+### 👥 Team / Resources Needed
+- Full-stack developer, ML engineer, designer
+
+### 🧱 Architecture Diagram (Text-based)
+- App -> API -> Lesson engine -> LLM
+"""
+
+INVESTORS = """```json
+[
+    {"name": "Reach Capital", "intro": "EdTech-focused VC", "Website-link": "https://reachcap.com", "Contact": "hello@reachcap.com"},
+    {"name": "Owl Ventures", "intro": "Largest EdTech VC", "Website-link": "https://owlvc.com", "Contact": "info@owlvc.com"},
+    {"name": "Learn Capital", "intro": "Early-stage education investor", "Website-link": "https://learncapital.com", "Contact": "N/A"}
+]
+```"""
+
+EMAIL = """Hi,
+I'm building TutorPal, a voice-first AI tutor that adapts to each child.
+Your EdTech portfolio makes you a natural fit for our seed round.
+Would you be open to a 20-minute call next week?
+Best,
+Founder"""
+
+PROBLEMS_WITH_SOLUTIONS = json.dumps([
+    {"problem": problem.split(". ", 1)[1], "solution": SOLUTION} for problem in PROBLEMS.splitlines()
+], indent=2)
+
+# (marker in the prompt, canned answer); the first match wins
+CANNED = [
+    ("startup idea generator", IDEAS),
+    ("solution for each", PROBLEMS_WITH_SOLUTIONS),
+    ("problem statements", PROBLEMS),
+    ("innovative solution", SOLUTION),
+    ("MVP plan", MVP_PLAN),
+    ("main domain or industry", "EdTech"),
+    ("ideal investor", "Seed-stage EdTech investors focused on early learning."),
+    ("Extract up to 5 entities", INVESTORS),
+    ("cold email", EMAIL),
+    ("startup researcher", REPORT),
+]
+
+SEARCH_RESULTS = {
+    "organic": [
+        {"title": f"Result {i} for the query", "link": f"https://example.com/{i}",
+         "snippet": "Investors, competitors and market trends for early-learning EdTech startups."}
+        for i in range(1, 9)
+    ]
+}
+
+
+def answer_for(prompt: str) -> str:
+    if "Action Input" in prompt and "Final Answer" in prompt:
+        # ReAct agent: one search step, then the final report. The format
+        # instructions mention "Observation:" once; a second one is a tool result.
+        if prompt.count("Observation:") > 1:
+            return f"Thought: I now know the final answer\nFinal Answer: {REPORT}"
+        return "Thought: I should search for competitors\nAction: Google Search\nAction Input: AI tutor for kids competitors"
+    if "email per investor" in prompt:
+        names = [line[2:] for line in prompt.split("Investors:\n", 1)[-1].split("\n\n", 1)[0].splitlines()
+                 if line.startswith("- ")]
+        return json.dumps([{"investor": name, "email": EMAIL} for name in names], indent=2)
+    for marker, answer in CANNED:
+        if marker.lower() in prompt.lower():
+            return answer
+    return "OK"
+
+
+def tokens(text: str) -> list:
+    """Roughly one token per word, keeping whitespace so chunks join back exactly."""
+    parts, current = [], ""
+    for char in text:
+        current += char
+        if char in " \n":
+            parts.append(current)
+            current = ""
+    if current:
+        parts.append(current)
+    return parts
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    latency = 0.2
+    tokens_per_second = 100.0
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _json(self, payload: dict, status: int = 200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if self.path.rstrip("/").endswith("chat/completions"):
+            self._chat(body)
+        elif self.path.split("?")[0].rstrip("/").endswith(("/search", "/news", "/places", "/images")):
+            time.sleep(self.latency)
+            self._json(SEARCH_RESULTS)
+        else:
+            self._json({"error": "not found"}, status=404)
+
+    def _chat(self, body: dict):
+        prompt = "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+        answer = answer_for(prompt)
+        parts = tokens(answer)
+        usage = {"prompt_tokens": len(prompt.split()), "completion_tokens": len(parts),
+                 "total_tokens": len(prompt.split()) + len(parts)}
+        model = body.get("model", "mock-model")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        time.sleep(self.latency)
+
+        if not body.get("stream"):
+            time.sleep(len(parts) / self.tokens_per_second)
+            self._json({
+                "id": completion_id, "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": answer}, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        def send(payload):
+            self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        base = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model}
+        for part in parts:
+            time.sleep(1 / self.tokens_per_second)
+            send(dict(base, choices=[{"index": 0, "delta": {"content": part}, "finish_reason": None}]))
+        send(dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}]))
+        if (body.get("stream_options") or {}).get("include_usage"):
+            send(dict(base, choices=[], usage=usage))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+
+def start(port: int = 0, latency: float = 0.2, tokens_per_second: float = 100.0):
+    """Starts the mock server on a background thread and returns it; `server.server_port` is the bound port."""
+    handler = type("ConfiguredMockHandler", (MockHandler,), {"latency": latency, "tokens_per_second": tokens_per_second})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds before the first token / search result")
+    parser.add_argument("--tokens-per-second", type=float, default=100.0)
+    args = parser.parse_args()
+    server = start(args.port, args.latency, args.tokens_per_second)
+    print(f"Mock OpenAI/Serper server on http://127.0.0.1:{server.server_port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import pytest
+
+from Components.agent_budget import AGENT_DEADLINE_SECONDS, AGENT_MAX_STEPS, AGENT_MAX_TOKENS, AgentBudget
+
+
+def test_missing_fields_keep_the_defaults():
+    assert AgentBudget.from_request(None).as_dict() == {
+        "max_steps": AGENT_MAX_STEPS, "deadline_seconds": AGENT_DEADLINE_SECONDS, "max_tokens": AGENT_MAX_TOKENS,
+    }
+    assert AgentBudget.from_request({"max_steps": 1}).max_steps == 1
+
+
+@pytest.mark.parametrize("budget", [
+    ["max_steps"],
+    {"max_steps": 0},
+    {"deadline_seconds": "nan"},
+    {"deadline_seconds": "inf"},
+    {"max_steps": AGENT_MAX_STEPS + 1},
+    {"deadline_seconds": AGENT_DEADLINE_SECONDS * 2},
+    {"max_tokens": AGENT_MAX_TOKENS + 1},
+])
+def test_invalid_or_larger_budgets_are_rejected(budget):
+    with pytest.raises(ValueError):
+        AgentBudget.from_request(budget)
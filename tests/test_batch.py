@@ -0,0 +1,51 @@
+import json
+import os
+
+from Components import batch
+from Components.batch import read_records, run_batch
+
+
+def _fake_pipeline(calls):
+    def run_pipeline(idea, completed=None, on_stage=None, deck_path=None, **kwargs):
+        calls.append(dict(completed))
+        if "pitch_deck" not in completed:
+            os.makedirs(os.path.dirname(deck_path), exist_ok=True)
+            with open(deck_path, "wb") as f:
+                f.write(b"deck")
+            on_stage("pitch_deck", deck_path)
+        return {"idea": idea, "errors": {}}
+    return run_pipeline
+
+
+def test_malformed_jsonl_lines_become_failed_items(tmp_path, monkeypatch):
+    source = tmp_path / "ideas.jsonl"
+    source.write_text('{"idea": "AI tutor"}\n{"idea": oops\n"Plain string idea"\n', encoding="utf-8")
+    assert [record_id for record_id, _ in read_records(str(source))][1] == "line-2"
+
+    monkeypatch.setattr(batch, "run_pipeline", _fake_pipeline([]))
+    output = tmp_path / "out.jsonl"
+    counts = run_batch(str(source), str(output), decks_dir=str(tmp_path / "decks"), workers=1)
+    assert counts["done"] == 2
+    assert counts["failed"] == 1
+    failed = [line for line in map(json.loads, output.read_text().splitlines()) if line["errors"]]
+    assert failed[0]["id"] == "line-2"
+    assert "Invalid JSON on line 2" in failed[0]["errors"]["record"]
+
+
+def test_missing_deck_is_rendered_again_on_resume(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(batch, "run_pipeline", _fake_pipeline(calls))
+    decks = tmp_path / "decks"
+    decks.mkdir()
+    checkpoints = batch.CheckpointStore(str(tmp_path / "checkpoints.sqlite3"))
+    options = {"decks_dir": str(decks), "idea_field": "idea", "research_mode": "agent", "refine_idea": True,
+               "bypass_cache": False, "allow_similar": True, "stage_workers": 1}
+
+    batch._process("r1", {"idea": "AI tutor"}, checkpoints, options)
+    batch._process("r1", {"idea": "AI tutor"}, checkpoints, options)
+    assert "pitch_deck" in calls[1]
+
+    (decks / "r1.pptx").unlink()
+    batch._process("r1", {"idea": "AI tutor"}, checkpoints, options)
+    assert "pitch_deck" not in calls[2]
+    assert (decks / "r1.pptx").exists()
@@ -0,0 +1,43 @@
+from Components.compaction import NO_RESULTS, compact_results, estimate_tokens
+
+RESULTS = {
+    "organic": [
+        {"title": "EdTech market report", "link": "https://example.com/edtech",
+         "snippet": "The EdTech tutoring market grows quickly as schools adopt AI tutors."},
+        {"title": "Same page again", "link": "https://www.example.com/edtech/",
+         "snippet": "A repeated URL with different text about something else entirely."},
+        {"title": "Video", "link": "https://youtube.com/watch?v=1", "snippet": "A video about tutoring."},
+        {"title": "Cooking tips", "link": "https://food.example.org/pasta",
+         "snippet": "How to cook pasta al dente every single time."},
+    ],
+}
+
+
+def test_empty_results():
+    text, stats = compact_results({}, "anything")
+    assert text == NO_RESULTS
+    assert stats["kept"] == 0
+
+
+def test_duplicates_and_skipped_domains_are_dropped():
+    text, stats = compact_results(RESULTS, "AI tutoring EdTech", token_budget=500)
+    assert stats["duplicates"] == 1
+    assert stats["skipped_domains"] == 1
+    assert stats["kept"] == 2
+    assert text.splitlines()[0].startswith("- EdTech market report")
+
+
+def test_results_beyond_the_budget_are_dropped():
+    first_line = compact_results(RESULTS, "AI tutoring EdTech", token_budget=500)[0].splitlines()[0]
+    text, stats = compact_results(RESULTS, "AI tutoring EdTech", token_budget=estimate_tokens(first_line) + 1)
+    assert text == first_line
+    assert stats["over_budget"] == 1
+    assert stats["saved_tokens"] == stats["raw_tokens"] - stats["tokens"]
+
+
+def test_best_result_is_truncated_to_a_tiny_budget():
+    text, stats = compact_results(RESULTS, "AI tutoring EdTech", token_budget=5)
+    assert stats["kept"] == 1
+    assert text.endswith("…")
+    assert estimate_tokens(text) <= 5
+
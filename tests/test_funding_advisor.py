@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+from Components import funding_advisor
+from Components.funding_advisor import agenerate_investor_emails, find_investors, generate_investor_emails, investor_names
+from Components.semantic_cache import SemanticCache
+
+
+def test_investor_names_accepts_names_and_objects():
+    assert investor_names([" Acme Ventures ", {"name": "Beta Capital"}]) == ["Acme Ventures", "Beta Capital"]
+
+
+@pytest.mark.parametrize("investors", [
+    "Acme Ventures",
+    ["Acme Ventures", {"intro": "no name"}],
+    ["Acme Ventures", " "],
+    ["Acme Ventures", "acme ventures "],
+])
+def test_investor_names_rejects_bad_or_duplicate_names(investors):
+    with pytest.raises(ValueError):
+        investor_names(investors)
+
+
+def test_empty_batch_generates_nothing():
+    async def collect():
+        return [email async for email in agenerate_investor_emails("idea", [])]
+
+    assert list(generate_investor_emails("idea", [])) == []
+    assert asyncio.run(collect()) == []
+
+
+def test_similar_ideas_share_investors_only_within_a_domain(tmp_path, monkeypatch):
+    monkeypatch.setattr(funding_advisor, "semantic_cache",
+                        SemanticCache(str(tmp_path / "semantic.sqlite3"), 100, 0.85, 3600))
+    investors = [{"name": "Acme Ventures"}]
+    funding_advisor._remember_investors("AI tutor for kids", "EdTech", "vc_firms", investors)
+
+    assert funding_advisor._similar_investors("AI tutor for kids", "FinTech", "vc_firms") is None
+    match = {}
+    assert find_investors("AI tutor for kids", "Ed Tech", match=match) == investors
+    assert match["similar_to"] == "AI tutor for kids"
+    assert match["similarity"] >= 0.85
@@ -0,0 +1,127 @@
+import threading
+import time
+
+import pytest
+
+from Components.jobs import JobQueue, check_job
+
+
+def _queue(tmp_path, kinds, lease_seconds=60.0):
+    return JobQueue(str(tmp_path / "jobs.sqlite3"), 2, kinds, lease_seconds=lease_seconds)
+
+
+def test_job_runs_to_done(tmp_path):
+    queue = _queue(tmp_path, {"echo": lambda params: {"echo": params["value"]}})
+    job_id = queue.submit("echo", {"value": 3})
+    job = queue.wait(job_id, 5)
+    queue.stop()
+    assert job["status"] == "done"
+    assert job["result"] == {"echo": 3}
+
+
+def test_failed_job_keeps_the_error(tmp_path):
+    def fail(params):
+        raise RuntimeError("boom")
+
+    queue = _queue(tmp_path, {"fail": fail})
+    job = queue.wait(queue.submit("fail", {}), 5)
+    queue.stop()
+    assert job["status"] == "failed"
+    assert job["error"] == "boom"
+
+
+def test_cancelled_running_job_drops_its_result(tmp_path):
+    started, release = threading.Event(), threading.Event()
+
+    def slow(params):
+        started.set()
+        release.wait(5)
+        return "late"
+
+    queue = _queue(tmp_path, {"slow": slow})
+    job_id = queue.submit("slow", {})
+    assert started.wait(5)
+    assert queue.cancel(job_id)
+    release.set()
+    queue.stop()
+    job = queue.get(job_id)
+    assert job["status"] == "cancelled"
+    assert job["result"] is None
+    assert not queue.cancel(job_id)
+
+
+def test_queued_jobs_resume_after_a_restart(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    # Stored by a process that stopped before any worker picked the job up
+    stopped = JobQueue(path, 1, {"echo": lambda params: params})
+    now = time.time()
+    stopped._execute(
+        "INSERT INTO jobs (id, kind, params, status, created_at, updated_at) "
+        "VALUES ('queued', 'echo', '{\"value\": 1}', 'queued', ?, ?)",
+        (now, now),
+    )
+
+    queue = JobQueue(path, 1, {"echo": lambda params: params})
+    queue.start()
+    job = queue.wait("queued", 5)
+    queue.stop()
+    assert job["status"] == "done"
+    assert job["result"] == {"value": 1}
+
+
+def test_orphaned_job_is_requeued_once_its_lease_expires(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    dead = JobQueue(path, 1, {"echo": lambda params: params})
+    job_id = "orphan"
+    now = time.time()
+    # Left running by a process that died: same host and pid, but an old lease
+    dead._execute(
+        "INSERT INTO jobs (id, kind, params, status, owner, lease_expires_at, created_at, updated_at) "
+        "VALUES (?, 'echo', '{\"value\": 2}', 'running', ?, ?, ?, ?)",
+        (job_id, dead.owner, now - 1, now, now),
+    )
+
+    queue = JobQueue(path, 1, {"echo": lambda params: params})
+    assert queue.owner != dead.owner
+    queue.start()
+    job = queue.wait(job_id, 5)
+    queue.stop()
+    assert job["status"] == "done"
+    assert job["result"] == {"value": 2}
+
+
+def test_running_job_with_a_live_lease_is_left_alone(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    other = JobQueue(path, 1, {"echo": lambda params: params})
+    now = time.time()
+    other._execute(
+        "INSERT INTO jobs (id, kind, params, status, owner, lease_expires_at, created_at, updated_at) "
+        "VALUES ('busy', 'echo', '{}', 'running', ?, ?, ?, ?)",
+        (other.owner, now + 60, now, now),
+    )
+
+    queue = JobQueue(path, 1, {"echo": lambda params: params})
+    queue.start()
+    assert queue.requeue_expired() == 0
+    queue.stop()
+    assert queue.get("busy")["status"] == "running"
+
+
+@pytest.mark.parametrize("kind, params", [
+    ("unknown", {"idea": "x"}),
+    ("research", {}),
+    ("research", ["idea"]),
+    ("research", {"idea": "x", "mode": "guess"}),
+    ("research", {"idea": "x", "budget": {"max_steps": 0}}),
+    ("investors", {"idea": ""}),
+    ("pipeline", {"idea": "x", "idea_index": -1}),
+])
+def test_check_job_rejects_params_that_would_fail(kind, params):
+    with pytest.raises(ValueError):
+        check_job(kind, params)
+
+
+def test_check_job_accepts_valid_params():
+    check_job("research", {"idea": "x", "mode": "agent", "budget": {"max_steps": 4}})
+    check_job("investors", {"idea": "x"})
+    check_job("pipeline", {"idea": "x"})
@@ -0,0 +1,43 @@
+import json
+
+from Components.json_stream import ObjectStreamParser
+
+
+def _feed_all(chunks):
+    parser = ObjectStreamParser()
+    records = []
+    for chunk in chunks:
+        records.extend(parser.feed(chunk))
+    return parser, records
+
+
+def test_objects_are_returned_as_soon_as_they_close():
+    parser = ObjectStreamParser()
+    assert parser.feed('Here you go:\n```json\n[{"name": "A"}, {"na') == [{"name": "A"}]
+    assert parser.feed('me": "B"}]\n```') == [{"name": "B"}]
+
+
+def test_brackets_and_escaped_quotes_inside_strings():
+    records = [
+        {"name": "A {not} [an] object", "intro": 'says "hi" and }'},
+        {"name": "Backslash \\", "intro": "O'Brien's fund"},
+    ]
+    _, parsed = _feed_all([json.dumps(records)])
+    assert parsed == records
+
+
+def test_objects_split_across_every_chunk_boundary():
+    text = json.dumps([{"name": "A", "nested": {"x": [1, 2]}, "intro": 'a "quoted" } brace'}, {"name": "B"}])
+    _, parsed = _feed_all(list(text))
+    assert parsed == json.loads(text)
+
+
+def test_python_style_objects_and_dropped_records():
+    parser, parsed = _feed_all(["[{'name': 'A'}, {name: B}, {\"name\": \"C\"}"])
+    assert parsed == [{"name": "A"}, {"name": "C"}]
+    assert parser.dropped == 1
+
+
+def test_text_outside_the_array_is_ignored():
+    _, parsed = _feed_all(['{"ignored": 1} [', '{"name": "A"}', '] {"after": 2}'])
+    assert parsed == [{"name": "A"}]
@@ -0,0 +1,25 @@
+import pytest
+
+from Components.llm import MODEL_TIERS, check_overrides, model_overrides, resolve_model
+
+
+def test_overrides_accept_tiers_and_tier_models():
+    assert check_overrides({"*": "fast", "email_chain": MODEL_TIERS["heavy"]})
+    assert check_overrides(None) == {}
+
+
+@pytest.mark.parametrize("models", [
+    ["fast"],
+    {"*": ["x"]},
+    {"*": "some/expensive-model"},
+    {"not_a_chain": "fast"},
+])
+def test_overrides_reject_unknown_chains_and_models(models):
+    with pytest.raises(ValueError):
+        check_overrides(models)
+
+
+def test_model_overrides_route_within_the_block():
+    with model_overrides({"domain_chain": "heavy"}):
+        assert resolve_model("domain_chain") == ("heavy", MODEL_TIERS["heavy"])
+    assert resolve_model("domain_chain")[0] == "fast"
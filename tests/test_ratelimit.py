@@ -0,0 +1,77 @@
+import asyncio
+import time
+
+import pytest
+
+from Components.ratelimit import BucketStore, RateLimiter, _classify_response
+
+
+class _AsyncResponse:
+    """Stands in for an httpx async response: sync close() is not allowed."""
+
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+        self.closed = False
+
+    def close(self):
+        raise RuntimeError("Attempted to call an sync close on an async stream")
+
+    async def aclose(self):
+        self.closed = True
+
+
+def _classify(response, error):
+    if error is not None:
+        return "fatal", None
+    return ("throttled", 0.01) if response.status_code == 429 else ("ok", None)
+
+
+def _limiter(tmp_path) -> RateLimiter:
+    return RateLimiter("test", BucketStore(str(tmp_path / "ratelimit.sqlite3")), rpm=0, tpm=0,
+                       max_concurrency=4, latency_target=5, retry_deadline=5, max_retries=3)
+
+
+def test_acall_retries_a_throttled_async_response(tmp_path):
+    limiter = _limiter(tmp_path)
+    responses = [_AsyncResponse(429), _AsyncResponse(200)]
+    sent = []
+
+    async def asend():
+        sent.append(responses[len(sent)])
+        return sent[-1]
+
+    result = asyncio.run(limiter.acall(asend, classify=_classify))
+    assert result.status_code == 200
+    assert responses[0].closed
+    assert limiter.stats()["retries"] == 1
+
+
+class ReadTimeout(Exception):
+    """Named like httpx.ReadTimeout, which the limiter classifies by name."""
+
+
+def _timing_out_send(calls):
+    def send():
+        calls.append(time.monotonic())
+        raise ReadTimeout("read timed out")
+    return send
+
+
+def test_timeouts_with_a_fallback_are_not_retried(tmp_path):
+    limiter = _limiter(tmp_path)
+    calls = []
+    started = time.monotonic()
+    with pytest.raises(ReadTimeout):
+        limiter.call(_timing_out_send(calls),
+                     classify=lambda response, error: _classify_response(response, error, retry_timeouts=False))
+    # The fallback model can start right away instead of after the retry deadline
+    assert len(calls) == 1
+    assert time.monotonic() - started < 0.5
+
+
+def test_timeouts_without_a_fallback_are_retried(tmp_path):
+    limiter = _limiter(tmp_path)
+    calls = []
+    with pytest.raises(ReadTimeout):
+        limiter.call(_timing_out_send(calls), classify=_classify_response)
+    assert len(calls) > 1
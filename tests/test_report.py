@@ -0,0 +1,50 @@
+from Components.report import parse_report, report_context
+
+REPORT = """# AI Tutor for Kids
+An adaptive tutor for primary school maths.
+
+## Competitors
+| Name | Description | Website |
+|------|-------------|---------|
+| Khanmigo | AI tutor from Khan Academy | khanacademy.org |
+
+## Market Need
+- Parents want affordable tutoring
+
+## Unique Angle / Gap
+1. Offline-first for low-bandwidth schools
+
+## Conclusion
+- Worth pursuing
+
+## Sources
+| Name | Link |
+|------|------|
+| Survey | example.com |
+"""
+
+
+def test_sections_are_parsed():
+    parsed = parse_report(REPORT)
+    assert parsed.summary == ["An adaptive tutor for primary school maths."]
+    assert parsed.competitors == [
+        {"name": "Khanmigo", "description": "AI tutor from Khan Academy", "website": "khanacademy.org"},
+    ]
+    assert parsed.market_need == ["Parents want affordable tutoring"]
+    assert parsed.gaps == ["Offline-first for low-bandwidth schools"]
+
+
+def test_unknown_headings_are_not_merged_into_the_previous_section():
+    parsed = parse_report(REPORT)
+    assert "Worth pursuing" not in parsed.gaps
+    assert len(parsed.competitors) == 1
+
+
+def test_parse_is_cached_by_content():
+    assert parse_report(REPORT) is parse_report(REPORT)
+
+
+def test_unstructured_report_falls_back_to_the_raw_text():
+    text = "Just a paragraph with no sections."
+    assert report_context(text, ("gaps",)) == text
+    assert report_context(REPORT, ("gaps",)) == "### Unique Angle / Gap\n- Offline-first for low-bandwidth schools"
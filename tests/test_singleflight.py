@@ -0,0 +1,38 @@
+import asyncio
+
+from Components.singleflight import SingleFlight
+
+
+def test_cancelled_async_follower_does_not_cancel_the_flight():
+    flight = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "report"
+
+    async def main():
+        leader = asyncio.ensure_future(flight.ado("key", compute))
+        await asyncio.sleep(0)
+        followers = [asyncio.ensure_future(flight.ado("key", compute)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        followers[0].cancel()
+        results = await asyncio.gather(leader, *followers, return_exceptions=True)
+        return results
+
+    leader, cancelled, *others = asyncio.run(main())
+    assert isinstance(cancelled, asyncio.CancelledError)
+    assert leader == "report"
+    assert others == ["report", "report"]
+    assert len(calls) == 1
+    assert flight.stats()["coalesced"] == 3
+
+
+def test_finish_ignores_a_settled_future():
+    flight = SingleFlight()
+    future, leader = flight._join("key")
+    assert leader
+    future.cancel()
+    flight._finish("key", future, "value")
+    assert flight._join("key")[1]
@@ -0,0 +1,11 @@
+from Components.cache import ResponseCache
+
+
+def test_store_is_created_on_first_use(tmp_path):
+    path = tmp_path / "nested" / "responses.sqlite3"
+    cache = ResponseCache(str(path), max_entries=10, ttl_seconds=60)
+    assert not path.parent.exists()
+    assert cache.get("key") is None
+    assert path.exists()
+    cache.set("key", "value")
+    assert cache.get("key") == "value"